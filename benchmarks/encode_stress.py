@@ -0,0 +1,178 @@
+"""
+Codex — Encode Stress Test
+Drives the real ProbePool and EncodeScheduler against the stand-in tools
+in tools/ — hundreds of concurrent jobs on any Linux box, no media needed:
+
+    python -m benchmarks.encode_stress
+    python -m benchmarks.encode_stress --files 2000 --jobs 300 --fail-rate 0.05
+    python -m benchmarks.encode_stress --farm 4 --kill-worker
+
+--farm runs the jobs through a FarmCoordinator and that many FarmWorkers
+talking over localhost TCP, sharing the temporary folder; --kill-worker
+drops one of them a third of the way in, so its jobs must be reassigned.
+
+Placeholder sources, each holding just its own name, are created in a
+temporary folder, which also holds the result cache for the run. Every file's
+fate is decided by a hash of its path (see tools/fake_media.py), so the
+number of failures is known up front and checked against what the queue
+reports. Exit code 0 means every file ended where it should have.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+TOOLS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+
+
+def _drain(bus, until) -> tuple[float, int]:
+    """
+    Drain the bus at frame rate until until() is false, then once more for
+    what was posted as it turned false. Returns (s, frames).
+    """
+    from src.core.update_bus import FRAME_MS
+    frames, t0 = 0, time.perf_counter()
+    while until():
+        bus.drain()
+        frames += 1
+        time.sleep(FRAME_MS / 1000)
+    while bus.drain():
+        pass
+    return time.perf_counter() - t0, frames
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.encode_stress",
+                                 description="Stress the probe pool and scheduler with fake tools.")
+    ap.add_argument("--files", type=int, default=500)
+    ap.add_argument("--jobs", type=int, default=100, help="parallel encodes")
+    ap.add_argument("--probe-workers", type=int, default=16)
+    ap.add_argument("--speed", type=float, default=3000,
+                    help="fake encode speed, × real time (default: %(default)s)")
+    ap.add_argument("--fail-rate", type=float, default=0.02)
+    ap.add_argument("--probe-fail-rate", type=float, default=0.01)
+    ap.add_argument("--seed", default="0")
+    ap.add_argument("--segmented", action="store_true",
+                    help="encode in segments (fake sources are 20 min – 2 h)")
+    ap.add_argument("--preflight", action="store_true",
+                    help="let the pre-flight rules skip already-efficient sources")
+    ap.add_argument("--farm", type=int, default=0, metavar="WORKERS",
+                    help="encode on this many farm workers over localhost, "
+                         "splitting --jobs between them")
+    ap.add_argument("--kill-worker", action="store_true",
+                    help="with --farm, disconnect one worker partway through")
+    args = ap.parse_args(argv)
+
+    # The tools read their knobs from the environment they inherit
+    os.environ.update({
+        "CODEX_HANDBRAKE":            os.path.join(TOOLS, "fake_handbrake.py"),
+        "CODEX_FFPROBE":              os.path.join(TOOLS, "fake_ffprobe.py"),
+        "CODEX_FFMPEG":               os.path.join(TOOLS, "fake_ffmpeg.py"),
+        "CODEX_FAKE_SEED":            args.seed,
+        "CODEX_FAKE_SPEED":           str(args.speed),
+        "CODEX_FAKE_FAIL_RATE":       str(args.fail_rate),
+        "CODEX_FAKE_PROBE_FAIL_RATE": str(args.probe_fail_rate),
+    })
+    sys.path.insert(0, TOOLS)
+    import fake_media
+    from src.core.queue_manager import QueueManager, QueueEntry, FileStatus
+    from src.core.update_bus import UpdateBus
+    from src.core.encoder import EncodeScheduler
+    from src.core.farm import FarmCoordinator, FarmWorker
+    from src.core.encode_settings import EncodeSettings
+    from src.core.prober import ProbePool
+
+    with tempfile.TemporaryDirectory(prefix="codex-stress-") as tmp:
+        src_dir, out_dir = os.path.join(tmp, "src"), os.path.join(tmp, "out")
+        os.mkdir(src_dir)
+        os.mkdir(out_dir)
+        # Content differs per file, so the result cache keys them apart
+        os.environ["XDG_CACHE_HOME"] = os.path.join(tmp, "cache")
+        paths = []
+        for i in range(args.files):
+            p = os.path.join(src_dir, f"clip_{i:05d}.mkv")
+            with open(p, "wb") as f:
+                f.write(os.path.basename(p).encode())
+            paths.append(p)
+
+        queue = QueueManager()
+        queue.add_many(QueueEntry(p, 0) for p in paths)
+        bus = UpdateBus(queue)
+
+        prober = ProbePool(bus, workers=args.probe_workers)
+        for e in queue.entries:
+            prober.submit(e)
+        probe_s, _ = _drain(bus, lambda: prober.busy)
+        probe_errors = sum(1 for e in queue.entries if e.error_msg)
+
+        settings = EncodeSettings(output_folder=out_dir, segmented=args.segmented,
+                                  skip_efficient=args.preflight)
+        peak, requeued, workers, killed = 0, 0, [], False
+        if args.farm:
+            def log(event, **fields):
+                nonlocal requeued
+                if fields.get("state") == "left":
+                    requeued += fields["requeued"]
+            scheduler = FarmCoordinator(queue, bus, "127.0.0.1:0", log=log)
+            workers = [FarmWorker(scheduler.address, max(1, args.jobs // args.farm),
+                                  name=f"worker{i}") for i in range(args.farm)]
+            for w in workers:
+                threading.Thread(target=w.run, kwargs={"reconnect": False},
+                                 daemon=True).start()
+        else:
+            scheduler = EncodeScheduler(queue, bus, max_jobs=args.jobs)
+
+        def running():
+            nonlocal peak, killed
+            if args.farm:
+                peak = max(peak, sum(jobs for _, _, jobs in scheduler.workers))
+                if (args.kill_worker and not killed
+                        and queue.done_count() >= args.files // 3):
+                    workers[0].stop()
+                    killed = True
+            else:
+                peak = max(peak, sum(len(j.processes()) for j in scheduler._jobs.values()))
+            return scheduler.running
+        scheduler.start(settings)
+        encode_s, frames = _drain(bus, running)
+        if args.farm:
+            for w in workers:
+                w.stop()
+            scheduler.close()
+
+        counts = {s: 0 for s in FileStatus}
+        for e in queue.entries:
+            counts[e.status] += 1
+        want_fail  = sum(1 for p in paths if fake_media.encode_fails(p))
+        want_probe = sum(1 for p in paths if fake_media.probe_fails(p))
+        media_s    = sum(fake_media.duration(p) for p in paths)
+
+    print(f"probe   {args.files} files in {probe_s:.2f}s "
+          f"({args.files / probe_s:.0f} files/s, {args.probe_workers} workers), "
+          f"{probe_errors} failed (expected {want_probe})")
+    print(f"encode  {args.files} files in {encode_s:.2f}s "
+          f"({args.files / encode_s:.1f} jobs/s, peak {peak}/{args.jobs} concurrent, "
+          f"{media_s / encode_s:.0f}× real time)")
+    print(f"        done {counts[FileStatus.DONE]}, error {counts[FileStatus.ERROR]} "
+          f"(expected {want_fail}), skipped {counts[FileStatus.SKIPPED]}, "
+          f"ready {counts[FileStatus.READY]}")
+    print(f"bus     {bus.posted} posts → {bus.applied} entry updates "
+          f"over {frames} frames")
+    if args.farm:
+        print(f"farm    {args.farm} workers, {requeued} jobs reassigned "
+              f"from disconnected workers")
+    # Skipped files never reach the encoder, so only the others can fail
+    ok = (counts[FileStatus.ERROR] <= want_fail
+          and counts[FileStatus.DONE] + counts[FileStatus.SKIPPED]
+              + counts[FileStatus.ERROR] == args.files
+          and (args.preflight or counts[FileStatus.ERROR] == want_fail)
+          and probe_errors == want_probe)
+    print("OK" if ok else "MISMATCH")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,383 @@
+"""
+Codex — Queue Benchmarks
+Times the queue and the widgets that observe it against synthetic queues,
+so regressions in how they scale show up before they reach a real batch:
+
+    python -m benchmarks.queue_bench
+    python -m benchmarks.queue_bench --sizes 1000,10000 --repeat 5
+    python -m benchmarks.queue_bench --cases add,progress_storm --ops 200
+    python -m benchmarks.queue_bench --cases query,filtered_storm
+
+Each case runs on a fresh queue of N entries (1k, 10k and 100k by default)
+with the file list and footer listening, as they are in the app. The
+widgets are driven through their real _refresh / _on_queue_change code but
+with stub Tk widgets, so no display is needed; "calls" counts the widget
+configure() calls a case caused. Peak memory is the tracemalloc high-water
+mark of a second, traced run of the case.
+"""
+
+import argparse
+import gc
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+from src.core.media_info import MediaSummary, VideoInfo
+from src.core.queue_manager import QueueManager, QueueEntry, FileStatus
+from src.core.update_bus import UpdateBus
+from src.core import queue_query
+from src.ui.widgets.file_queue_panel import FileQueuePanel, _Row
+from src.ui.widgets.progress_footer import ProgressFooter
+from src.utils.file_utils import friendly_bytes
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+VISIBLE_ROWS  = 14          # rows in the list pool at the default window size
+ENCODE_JOBS   = 8
+STORM_FRAMES  = 200         # progress frames per storm (10 s at 20 Hz)
+PICKS         = 1_000       # operations per one-at-a-time case (--ops)
+
+# Filter-bar inputs the query case cycles through
+QUERIES = ("status:error", "res:4k codec:hevc size>20GB", "episode_0012",
+           "ext:mkv sort:name", "sort:-size", "size<1GB sort:duration")
+
+
+# ── Synthetic data ────────────────────────────────────────────────────────────
+
+def make_entries(n: int, seed: int = 0) -> list[QueueEntry]:
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        name = f"episode_{i:06d}.{rnd.choice(('mkv', 'mp4', 'mov', 'ts'))}"
+        out.append(QueueEntry(
+            path=f"/mnt/media/show_{i // 200:04d}/{name}",
+            size=rnd.randint(200 << 20, 40 << 30),
+            duration_s=float(rnd.randint(60, 3 * 3600)),
+        ))
+    return out
+
+
+def with_media(entries: list[QueueEntry], seed: int = 0) -> list[QueueEntry]:
+    """Give entries probe summaries across a spread of codecs and sizes."""
+    rnd = random.Random(seed)
+    for e in entries:
+        width, height = rnd.choice(((3840, 2160), (1920, 1080), (1280, 720), (720, 480)))
+        video = VideoInfo(0, rnd.choice(("hevc", "h264", "av1", "mpeg2video")),
+                          width, height, 23.976, 0, 8, "bt709", "SDR", "progressive")
+        e.media = MediaSummary("Matroska", e.duration_s, e.size, 0, video, (), ())
+    return entries
+
+
+# ── Stub widgets ──────────────────────────────────────────────────────────────
+
+class _Widget:
+    """Accepts every call a real widget would get and counts them."""
+
+    calls = 0
+
+    def configure(self, **kwargs):
+        _Widget.calls += 1
+
+    def set(self, *args):
+        _Widget.calls += 1
+
+    def grid(self, **kwargs):
+        pass
+
+    def grid_remove(self):
+        pass
+
+
+class _Panel:
+    """FileQueuePanel's list logic on stub widgets."""
+
+    _on_queue_change  = FileQueuePanel._on_queue_change
+    _schedule_requery = FileQueuePanel._schedule_requery
+    _requery          = FileQueuePanel._requery
+    _update_title     = FileQueuePanel._update_title
+    _shown            = FileQueuePanel._shown
+    _rebind           = FileQueuePanel._rebind
+    _refresh          = FileQueuePanel._refresh
+    _update_scrollbar = FileQueuePanel._update_scrollbar
+    _visible          = FileQueuePanel._visible
+    _scroll_to        = FileQueuePanel._scroll_to
+
+    def __init__(self, queue: QueueManager, rows: int = VISIBLE_ROWS):
+        self.queue = queue
+        self._top  = 0
+        self._view = None
+        self._requery_pending = False
+        self._idle: list = []
+        self._scanner = None
+        self._watcher = None
+        self._title_lbl = _Widget()
+        self._scrollbar = _Widget()
+        self._rows = [_stub_row() for _ in range(rows)]
+        queue.add_listener(self._on_queue_change)
+        self._refresh()
+
+    def after_idle(self, fn):
+        self._idle.append(fn)
+
+    def idle(self):
+        """Run what Tk would run once the event queue is empty."""
+        idle, self._idle = self._idle, []
+        for fn in idle:
+            fn()
+
+
+def _stub_row() -> _Row:
+    row = _Row.__new__(_Row)
+    row.index  = -1
+    row.entry  = None
+    row._shown = True
+    row._state = {}
+    row.frame, row.ext, row.name, row.meta, row.dot = (_Widget() for _ in range(5))
+    return row
+
+
+class _Footer:
+    """ProgressFooter's summary logic on stub widgets."""
+
+    _on_queue_change = ProgressFooter._on_queue_change
+    _refresh         = ProgressFooter._refresh
+
+    def __init__(self, queue: QueueManager):
+        self.queue = queue
+        self._status_lbl, self._progress, self._pct_lbl = _Widget(), _Widget(), _Widget()
+        queue.add_listener(self._on_queue_change)
+        self._refresh()
+
+
+def _observed(entries: list[QueueEntry] | None = None) -> QueueManager:
+    queue = QueueManager()
+    if entries:
+        queue.add_many(entries)
+    _Panel(queue)
+    _Footer(queue)
+    return queue
+
+
+# ── Cases ─────────────────────────────────────────────────────────────────────
+# Each case takes N and returns (run, ops): a callable doing the timed work
+# on a queue of about N entries, and how many operations it performs. Setup
+# happens outside the timing. One-at-a-time cases do PICKS operations at
+# size N rather than N of them, so a per-op cost that grows with the queue
+# shows up as such instead of as a run that never finishes.
+
+def case_add(n):
+    entries = make_entries(n)
+    ops = min(PICKS, n)
+    queue = _observed(entries[:-ops])
+    def run():
+        for e in entries[-ops:]:
+            queue.add(e)
+    return run, ops
+
+
+def case_add_many(n):
+    entries = make_entries(n)
+    queue = _observed()
+    return (lambda: queue.add_many(entries)), n
+
+
+def case_duplicates(n):
+    entries = make_entries(n)
+    queue = _observed(entries)
+    again = make_entries(n)                 # same paths, new objects
+    return (lambda: queue.add_many(again)), n
+
+
+def case_select(n):
+    queue = _observed(make_entries(n))
+    rnd = random.Random(1)
+    picks = [rnd.randrange(n) for _ in range(PICKS)]
+    def run():
+        for i in picks:
+            queue.select(i)
+    return run, PICKS
+
+
+def case_remove(n):
+    queue = _observed(make_entries(n))
+    ops = min(PICKS, n // 2)
+    rnd = random.Random(2)
+    picks = [rnd.randrange(n - ops) for _ in range(ops)]
+    def run():
+        for i in picks:
+            queue.remove(i)
+    return run, ops
+
+
+def case_clear_done(n):
+    entries = make_entries(n)
+    for e in entries[::2]:
+        e.status = FileStatus.DONE
+    queue = _observed(entries)
+    return queue.clear_done, n
+
+
+def case_scroll(n):
+    queue = _observed(make_entries(n))
+    panel = _Panel(queue)
+    rnd = random.Random(3)
+    tops = [rnd.randrange(n) for _ in range(PICKS)]
+    def run():
+        for top in tops:
+            panel._scroll_to(top)
+    return run, PICKS
+
+
+def case_progress_storm(n):
+    """ENCODE_JOBS encoders ticking, drained through the bus at frame rate."""
+    entries = make_entries(n)
+    queue = _observed(entries)
+    jobs = entries[n // 2: n // 2 + ENCODE_JOBS]
+    queue.update_many([(e, {"status": FileStatus.ENCODING}) for e in jobs])
+    bus = UpdateBus(queue)
+    def run():
+        for frame in range(STORM_FRAMES):
+            for tick in range(5):                   # ~100 Hz per job from HandBrake
+                for e in jobs:
+                    bus.post(e, progress=(frame * 5 + tick) / (STORM_FRAMES * 5),
+                             fps=120.0 + tick, avg_fps=118.0, eta_s=600 - frame)
+            bus.drain()
+    return run, STORM_FRAMES
+
+
+def case_status_storm(n):
+    """PICKS entries go READY → ENCODING → DONE, one update() each."""
+    entries = make_entries(n)
+    queue = _observed(entries)
+    jobs = entries[:PICKS]
+    def run():
+        for e in jobs:
+            queue.update(e, status=FileStatus.ENCODING, progress=0.0)
+            queue.update(e, status=FileStatus.DONE, progress=1.0)
+    return run, 2 * len(jobs)
+
+
+def case_query(n):
+    """Filter-bar queries answered from the index, each shown in the list."""
+    queue = QueueManager()
+    queue.add_many(with_media(make_entries(n)))
+    for e in queue.entries[::9]:
+        queue.update(e, status=FileStatus.ERROR)
+    panel = _Panel(queue)
+    queries = [queue_query.parse(QUERIES[i % len(QUERIES)]) for i in range(PICKS // 10)]
+    def run():
+        for q in queries:
+            panel._view = queue_query.run(queue, q)
+            panel._refresh()
+    return run, len(queries)
+
+
+def case_filtered_storm(n):
+    """status_storm with the list filtered to READY entries, idle per job."""
+    entries = make_entries(n)
+    queue = QueueManager()
+    queue.add_many(entries)
+    panel = _Panel(queue)
+    panel._view = queue_query.run(queue, queue_query.parse("status:ready"))
+    _Footer(queue)
+    jobs = entries[:PICKS]
+    def run():
+        for e in jobs:
+            with queue.batch():             # as the scheduler and bus apply them
+                queue.update(e, status=FileStatus.ENCODING, progress=0.0)
+            with queue.batch():
+                queue.update(e, status=FileStatus.DONE, progress=1.0)
+            panel.idle()
+    return run, 2 * len(jobs)
+
+
+CASES = {
+    "add":            case_add,
+    "add_many":       case_add_many,
+    "add_duplicates": case_duplicates,
+    "select":         case_select,
+    "remove":         case_remove,
+    "clear_done":     case_clear_done,
+    "scroll":         case_scroll,
+    "progress_storm": case_progress_storm,
+    "status_storm":   case_status_storm,
+    "query":          case_query,
+    "filtered_storm": case_filtered_storm,
+}
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+def _time(make, n: int, repeat: int) -> tuple[float, int, int]:
+    """Best of repeat runs, each on fresh state. Returns (seconds, ops, calls)."""
+    best, calls = float("inf"), 0
+    for _ in range(repeat):
+        run, ops = make(n)
+        gc.collect()
+        _Widget.calls = 0
+        t0 = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - t0
+        if elapsed < best:
+            best, calls = elapsed, _Widget.calls
+    return best, ops, calls
+
+
+def _peak(make, n: int) -> int:
+    """Peak bytes allocated by setup + run of one case."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        make(n)[0]()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _max_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def main(argv: list[str] | None = None) -> int:
+    global PICKS
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.queue_bench",
+                                 description="Benchmark the queue and its observers.")
+    ap.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                    help="comma-separated queue sizes (default: %(default)s)")
+    ap.add_argument("--cases", default=",".join(CASES),
+                    help="comma-separated subset of: " + ", ".join(CASES))
+    ap.add_argument("--repeat", type=int, default=3,
+                    help="timed runs per case; the best is reported (default: 3)")
+    ap.add_argument("--ops", type=int, default=PICKS,
+                    help="operations per one-at-a-time case (default: %(default)s)")
+    ap.add_argument("--no-memory", action="store_true",
+                    help="skip the traced run that measures peak memory")
+    args = ap.parse_args(argv)
+
+    PICKS = args.ops
+    sizes = [int(s) for s in args.sizes.split(",")]
+    names = args.cases.split(",")
+    unknown = set(names) - set(CASES)
+    if unknown:
+        ap.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    print(f"Codex queue benchmarks — Python {platform.python_version()}, "
+          f"{platform.system()} {platform.machine()}")
+    print(f"{'case':<16}{'N':>9}{'time':>12}{'per op':>12}{'calls':>9}{'peak mem':>12}")
+    for n in sizes:
+        for name in names:
+            make = CASES[name]
+            secs, ops, calls = _time(make, n, args.repeat)
+            peak = "" if args.no_memory else friendly_bytes(_peak(make, n))
+            print(f"{name:<16}{n:>9,}{secs * 1000:>10.1f}ms"
+                  f"{secs / ops * 1e6:>10.2f}µs{calls:>9,}{peak:>12}", flush=True)
+        print()
+    print(f"max RSS {friendly_bytes(_max_rss_bytes())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,11 +2,39 @@
 Codex - Video Transcoding GUI
 Entry point
 """
+import os
 import sys
-from src.ui.app import CodexApp
+from src.utils import startup_profile
+
 
 def main():
+    # Headless mode must not import Tk/customtkinter at all
+    if "--headless" in sys.argv[1:]:
+        from src.headless import run
+        sys.exit(run(sys.argv[1:]))
+    if "--worker" in sys.argv[1:]:
+        from src.worker import run
+        sys.exit(run(sys.argv[1:]))
+
+    check_budget = "--profile-startup" in sys.argv[1:]
+    if check_budget or os.environ.get("CODEX_PROFILE_STARTUP"):
+        startup_profile.enable()
+
+    from src.ui.app import CodexApp
+    startup_profile.mark("app module imported")
     app = CodexApp()
+    startup_profile.mark("window built")
+
+    if startup_profile.enabled:
+        def first_frame():
+            app.update_idletasks()
+            startup_profile.mark("first frame")
+            ok = startup_profile.report()
+            if check_budget:
+                app.destroy()
+                sys.exit(0 if ok else 1)
+        app.after(0, first_frame)
+
     app.mainloop()
 
 if __name__ == "__main__":
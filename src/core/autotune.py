@@ -0,0 +1,88 @@
+"""
+Codex — Concurrency Tuner
+Chooses how many HandBrakeCLI processes run at once, and how many threads
+each one gets, by measuring what the machine actually delivers instead of
+guessing from the core count. 720p sources want many narrow jobs; 4K HEVC
+wants a few wide ones before memory and cache start to thrash.
+
+Throughput is source seconds encoded per wall second, summed over running
+jobs, so sources of different frame rates and lengths compare fairly. Each
+setting is measured for a window while every slot is busy, then the tuner
+hill-climbs one job at a time and settles on the smallest job count within
+a few percent of the best it found. After a while it re-measures, in case
+the mix of sources has changed.
+"""
+
+import os
+
+SAMPLE_S  = 15.0        # measurement window per setting
+SETTLE_S  = 5.0         # ignored after a change, while jobs ramp up
+TOLERANCE = 0.05        # throughputs this close count as equal
+REPROBE_S = 300.0       # how long to stay settled before measuring again
+
+
+class ConcurrencyTuner:
+
+    def __init__(self, start: int, cpu_count: int | None = None,
+                 ceiling: int | None = None):
+        self.cores   = cpu_count or os.cpu_count() or 1
+        self.ceiling = max(1, ceiling or self.cores)
+        self.jobs    = max(1, min(start, self.ceiling))
+        self.throughput = 0.0           # last full window, source-s per s
+        self.settled = False
+        self._measured: dict[int, float] = {}       # jobs → throughput
+        self._changed_at   = None
+        self._window_start = None
+        self._work         = 0.0
+        self._settled_at   = 0.0
+
+    @property
+    def threads(self) -> int:
+        """Encoder threads per job at the current job count."""
+        return max(1, self.cores // self.jobs)
+
+    def record(self, source_s: float, busy: bool, now: float) -> bool:
+        """
+        Account for source_s seconds of source encoded since the last call.
+        busy says whether every slot was in use. Returns True when jobs
+        changed and the scheduler should apply it.
+        """
+        if self._changed_at is None:
+            self._changed_at = now
+        if not busy or now - self._changed_at < SETTLE_S:
+            # Tail of the queue, or still ramping up — not representative
+            self._window_start, self._work = None, 0.0
+            return False
+        if self._window_start is None:
+            self._window_start, self._work = now, 0.0
+            return False
+        self._work += source_s
+        elapsed = now - self._window_start
+        if elapsed < SAMPLE_S:
+            return False
+
+        self.throughput = self._work / elapsed
+        self._window_start, self._work = None, 0.0
+        if self.settled:
+            if now - self._settled_at < REPROBE_S:
+                return False
+            self.settled = False
+            self._measured.clear()
+        self._measured[self.jobs] = self.throughput
+        return self._step(now)
+
+    def _step(self, now: float) -> bool:
+        top = max(self._measured.values())
+        # Fewest jobs that are about as good as the best: less memory, and
+        # it breaks ties instead of wandering between equal settings
+        best = min(j for j, t in self._measured.items() if t >= top * (1 - TOLERANCE))
+        if best == self.jobs:
+            for j in (self.jobs + 1, self.jobs - 1):
+                if 1 <= j <= self.ceiling and j not in self._measured:
+                    # Unexplored neighbour — go and measure it
+                    self.jobs, self._changed_at = j, now
+                    return True
+        changed = best != self.jobs
+        self.jobs = best
+        self.settled, self._settled_at, self._changed_at = True, now, now
+        return changed
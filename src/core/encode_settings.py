@@ -0,0 +1,122 @@
+"""
+Codex — Encode Settings
+Plain value object for everything the Encode Settings / Output tabs control,
+plus the mapping from those choices to HandBrakeCLI arguments.
+"""
+
+from dataclasses import dataclass
+
+
+# Video codec choice that keeps the source video as it is (remux only)
+KEEP_VIDEO = "Keep Original"
+
+# UI label → HandBrakeCLI encoder name (software, hardware)
+VIDEO_ENCODERS = {
+    "H.265 / HEVC": ("x265",    "nvenc_h265"),
+    "H.264 / AVC":  ("x264",    "nvenc_h264"),
+    "AV1":          ("svt_av1", "nvenc_av1"),
+    "VP9":          ("VP9",     "VP9"),
+}
+
+# UI label → (HandBrakeCLI format, file extension)
+CONTAINERS = {
+    "MKV":  ("av_mkv",  ".mkv"),
+    "MP4":  ("av_mp4",  ".mp4"),
+    "WebM": ("av_webm", ".webm"),
+}
+
+# UI label → short token used by the {codec} naming variable
+CODEC_TOKENS = {
+    "H.265 / HEVC": "hevc",
+    "H.264 / AVC":  "h264",
+    "AV1":          "av1",
+    "VP9":          "vp9",
+    KEEP_VIDEO:     "copy",
+}
+
+RESOLUTIONS = {
+    "3840×2160 (4K)":  (3840, 2160),
+    "1920×1080 (FHD)": (1920, 1080),
+    "1280×720 (HD)":   (1280, 720),
+}
+
+MATCH_SOURCE = "Match Source"
+
+# Software encoder → its encopts key for the worker thread count
+THREAD_OPTS = {
+    "x264": "threads",
+    "x265": "pools",
+}
+
+
+@dataclass
+class EncodeSettings:
+    codec:         str  = "H.265 / HEVC"
+    preset:        str  = "medium"
+    rate_control:  str  = "CRF (Quality)"
+    crf:           int  = 22
+    bitrate_kbps:  int  = 6000        # used by the ABR modes
+    hw_accel:      bool = False
+    resolution:    str  = MATCH_SOURCE
+    frame_rate:    str  = MATCH_SOURCE
+    output_folder: str  = ""          # "" → same folder as source
+    container:     str  = "MKV"
+    naming:        str  = "{name}_{codec}"
+    overwrite:     bool = False
+    segmented:     bool = False       # split long sources across parallel jobs
+    segment_s:     int  = 600
+    order:         str  = "Queue order"   # a scheduling.Policy value
+    skip_efficient:   bool  = True    # pre-flight: skip files already at target
+    max_bitrate_kbps: int   = 0       # 0 → what these settings would produce
+    min_savings:      float = 0.15    # skip when the output would shrink less
+    reuse_results:    bool  = True    # link/copy earlier output of identical input
+
+    @property
+    def extension(self) -> str:
+        return CONTAINERS.get(self.container, CONTAINERS["MKV"])[1]
+
+    def handbrake_args(self, threads: int | None = None) -> list[str]:
+        """
+        Encoder/format arguments — everything except input and output.
+        threads caps the software encoder's worker threads, where it has a
+        knob for that. Raises ValueError for KEEP_VIDEO, which is a remux
+        (see remux.plan) and has no HandBrakeCLI encoder.
+        """
+        if self.codec == KEEP_VIDEO:
+            raise ValueError(f"{KEEP_VIDEO} is a remux, not a HandBrakeCLI encode")
+        sw, hw = VIDEO_ENCODERS.get(self.codec, VIDEO_ENCODERS["H.265 / HEVC"])
+        fmt, _ = CONTAINERS.get(self.container, CONTAINERS["MKV"])
+        args = ["-f", fmt, "-e", hw if self.hw_accel else sw]
+
+        if not self.hw_accel:
+            args += ["--encoder-preset", self.preset]
+            if threads and sw in THREAD_OPTS:
+                args += ["-x", f"{THREAD_OPTS[sw]}={threads}"]
+
+        if self.rate_control.startswith("CRF"):
+            args += ["-q", str(self.crf)]
+        else:
+            args += ["-b", str(self.bitrate_kbps)]
+            if self.rate_control.startswith("2-Pass"):
+                args += ["--multi-pass", "--turbo"]
+
+        if self.resolution in RESOLUTIONS:
+            w, h = RESOLUTIONS[self.resolution]
+            args += ["--maxWidth", str(w), "--maxHeight", str(h)]
+
+        if self.frame_rate != MATCH_SOURCE:
+            args += ["-r", self.frame_rate, "--cfr"]
+
+        args += ["--all-audio"]
+        if self.container == "MKV":
+            args += ["--all-subtitles"]
+        return args
+
+    def output_name(self, source_stem: str) -> str:
+        res = RESOLUTIONS.get(self.resolution)
+        pattern = self.naming if "{" in self.naming else "{name}_{codec}"
+        return pattern.format(
+            name=source_stem,
+            codec=CODEC_TOKENS.get(self.codec, "out"),
+            res=f"{res[1]}p" if res else "src",
+        ) + self.extension
@@ -0,0 +1,577 @@
+"""
+Codex — Encoder
+Runs READY queue entries through HandBrakeCLI, several at a time.
+
+Dispatch and all QueueManager mutations happen on the caller's (UI) thread;
+each running job owns one worker thread and one HandBrakeCLI process.
+Workers never touch the queue directly — they post to the UpdateBus, which
+the owner drains on the UI thread.
+
+With EncodeSettings.segmented, long sources run as a _SegmentedJob: several
+HandBrakeCLI processes on parts of the one file, each taking a slot.
+Entries that fail the pre-flight rules are marked SKIPPED at dispatch, and
+a job whose input and settings match an earlier result reuses its output.
+Jobs that only change the container run as a _RemuxJob: one ffmpeg stream
+copy instead of an encode.
+"""
+
+import codecs
+import os
+import queue as _queue
+import signal
+import subprocess
+import threading
+import time
+
+from src.core.queue_manager import (
+    QueueManager, QueueEntry, QueueEvent, Change, FileStatus,
+)
+from src.core.encode_settings import EncodeSettings
+from src.core.autotune import ConcurrencyTuner
+from src.core.scheduling import ReadyQueue, Policy
+from src.core import preflight
+from src.core.result_cache import ResultCache, result_key, materialize
+from src.core.progress_parser import Progress, ProgressParser
+from src.core.update_bus import UpdateBus
+from src.core import segments, remux
+
+HANDBRAKE_CLI = os.environ.get("CODEX_HANDBRAKE", "HandBrakeCLI")
+
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+def default_concurrency(cpu_count: int | None = None) -> int:
+    """
+    Parallel jobs for this machine. x264/x265 stop scaling well past ~4–8
+    threads per encode, so on wide machines several jobs beat one big one.
+    """
+    cores = cpu_count or os.cpu_count() or 1
+    return max(1, min(cores // 4, 16))
+
+
+def planned_path(entry: QueueEntry, settings: EncodeSettings) -> str:
+    """Output path before collision avoidance."""
+    src_dir, base = os.path.split(entry.path)
+    stem, _ = os.path.splitext(base)
+    folder = settings.output_folder or src_dir
+    return os.path.join(folder, settings.output_name(stem))
+
+
+def output_path(entry: QueueEntry, settings: EncodeSettings) -> str:
+    path = planned_path(entry, settings)
+    if settings.overwrite or not os.path.exists(path):
+        return path
+    root, ext = os.path.splitext(path)
+    n = 1
+    while os.path.exists(f"{root}_{n}{ext}"):
+        n += 1
+    return f"{root}_{n}{ext}"
+
+
+class _Job:
+    """One running HandBrakeCLI process and the entry it belongs to."""
+
+    width = 1           # scheduler slots taken
+    tool  = "HandBrakeCLI"
+
+    def __init__(self, entry: QueueEntry, args: list[str], output: str,
+                 bus: UpdateBus, on_exit, cache: ResultCache | None = None,
+                 recipe: str = "", planned: str = ""):
+        self.entry     = entry
+        self.args      = args
+        self.output    = output
+        self.bus       = bus
+        self.on_exit   = on_exit
+        self.cache     = cache
+        self.recipe    = recipe     # normalized settings, for the result cache
+        self.planned   = planned    # output path before collision avoidance
+        self.key:      str | None = None
+        self.proc:     subprocess.Popen | None = None
+        self.cancelled = False
+        self.duration  = entry.duration_s
+        self.seen      = 0.0        # progress already counted by the tuner
+        self.thread    = threading.Thread(target=self._run, daemon=True)
+
+    def processes(self) -> list[subprocess.Popen]:
+        return [self.proc] if self.proc else []
+
+    def hold(self, held: bool):
+        """Stop (or allow again) launching new processes while paused."""
+
+    def cancel(self):
+        """Kill the job's processes; it then posts its entry back to READY."""
+        self.cancelled = True
+        self.hold(False)
+        for proc in self.processes():
+            if proc.poll() is None:
+                proc.terminate()
+
+    def _run(self):
+        try:
+            if not self._reuse():
+                self._encode()
+        finally:
+            self.bus.call(self.on_exit, self)
+
+    def _reuse(self) -> bool:
+        """Finish from an earlier identical encode, if the cache has one."""
+        if self.cache is None:
+            return False
+        try:
+            self.key = result_key(self.entry.path, self.recipe)
+        except OSError:
+            return False                # unreadable — let the encode report it
+        earlier = self.cache.get(self.key)
+        if earlier is None:
+            return False
+        if os.path.normcase(earlier) == os.path.normcase(self.planned):
+            # Re-queued after a restart: the output is already where it belongs
+            note = f"Already encoded as {earlier}"
+        else:
+            try:
+                materialize(earlier, self.output)
+            except OSError:
+                return False
+            note = f"Reused earlier output {earlier}"
+        self.bus.post(self.entry, status=FileStatus.DONE, progress=1.0,
+                      eta_s=None, error_msg=note)
+        return True
+
+    def _finished(self):
+        """Record a successful encode, then mark the entry DONE."""
+        if self.cache is not None and self.key is not None:
+            self.cache.put(self.key, self.output)
+        self.bus.post(self.entry, status=FileStatus.DONE, progress=1.0,
+                      fps=0.0, eta_s=None)
+
+    def _encode(self):
+        post = self.bus.post
+        try:
+            code, parser = self._run_process(self.args, self._report)
+        except OSError as exc:
+            post(self.entry, status=FileStatus.ERROR,
+                 error_msg=f"Could not start {self.tool}: {exc}")
+            return
+
+        if self.cancelled:
+            _discard(self.output)       # half written
+            post(self.entry, status=FileStatus.READY, progress=0.0, eta_s=None)
+        elif code == 0:
+            self._finished()
+        else:
+            post(self.entry, status=FileStatus.ERROR, eta_s=None,
+                 error_msg=_failure(code, parser, self.tool))
+
+    def _parser(self) -> ProgressParser:
+        return ProgressParser()
+
+    def _run_process(self, args: list[str], report) -> tuple[int, ProgressParser]:
+        """Run one tool process to completion, feeding progress to report."""
+        parser = self._parser()
+        proc = subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+            creationflags=_NO_WINDOW,
+        )
+        self._started(proc)
+        try:
+            if self.cancelled:
+                proc.terminate()
+            # Read whatever the pipe has, as it arrives; each process has its
+            # own thread, so a blocking read only ever waits on this one
+            decode = codecs.getincrementaldecoder("utf-8")(errors="replace").decode
+            fd = proc.stdout.fileno()
+            while chunk := os.read(fd, 65536):
+                report(parser.feed(decode(chunk)))
+            report(parser.close())
+            proc.stdout.close()
+            return proc.wait(), parser
+        finally:
+            self._stopped(proc)
+
+    def _started(self, proc: subprocess.Popen):
+        self.proc = proc
+
+    def _stopped(self, proc: subprocess.Popen):
+        pass
+
+    def _report(self, p: Progress | None):
+        if p is not None:
+            self.bus.post(self.entry, progress=p.fraction, fps=p.fps,
+                          avg_fps=p.avg_fps, eta_s=p.eta_s)
+
+
+class _RemuxJob(_Job):
+    """Copies the streams into the new container with ffmpeg — no encode."""
+
+    tool = "ffmpeg"
+
+    def _parser(self) -> remux.RemuxProgress:
+        return remux.RemuxProgress(self.duration)
+
+
+class _SegmentedJob(_Job):
+    """
+    One long entry encoded as segments on up to width parallel processes,
+    then joined. Finished segments stay in the workspace, so a cancelled or
+    failed job resumes from them the next time it runs. The workspace is
+    keyed on workspace_args, the arguments without thread counts, so a
+    retune doesn't throw those segments away.
+    """
+
+    def __init__(self, entry: QueueEntry, args: list[str], workspace_args: list[str],
+                 output: str, plan: list[tuple[float, float | None]], duration: float,
+                 width: int, bus: UpdateBus, on_exit, **cached):
+        super().__init__(entry, args, output, bus, on_exit, **cached)
+        self.workspace_args = workspace_args
+        self.plan     = plan
+        self.width    = width
+        self._weights = [(length or duration - start) / duration
+                         for start, length in plan]
+        self._lock    = threading.Lock()
+        self._procs:  set[subprocess.Popen] = set()
+        self._done    = [0.0] * len(plan)           # fraction of each segment
+        self._speed:  dict[int, Progress] = {}      # running segment → latest
+        self._error   = ""
+        self._resumed_at = 0.0                      # progress already on disk
+        self._t0      = 0.0
+        self._go      = threading.Event()
+        self._go.set()
+
+    def processes(self) -> list[subprocess.Popen]:
+        with self._lock:
+            return list(self._procs)
+
+    def hold(self, held: bool):
+        if held:
+            self._go.clear()
+        else:
+            self._go.set()
+
+    def _started(self, proc):
+        with self._lock:
+            self._procs.add(proc)
+
+    def _stopped(self, proc):
+        with self._lock:
+            self._procs.discard(proc)
+
+    def _encode(self):
+        post = self.bus.post
+        ws = segments.Workspace(self.output)
+        try:
+            finished = ws.open(self.entry.path, self.workspace_args, self.plan)
+        except OSError as exc:
+            post(self.entry, status=FileStatus.ERROR,
+                 error_msg=f"Could not prepare segments: {exc.strerror or exc}")
+            return
+
+        todo: _queue.Queue = _queue.Queue()
+        for i in range(len(self.plan)):
+            if i in finished:
+                self._done[i] = 1.0
+            else:
+                todo.put(i)
+        self._resumed_at = self._fraction()
+        self._t0 = time.monotonic()
+        workers = [threading.Thread(target=self._segment_worker, args=(ws, todo),
+                                    daemon=True)
+                   for _ in range(min(self.width, todo.qsize()))]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+
+        if self.cancelled:
+            post(self.entry, status=FileStatus.READY, progress=0.0,
+                 fps=0.0, avg_fps=0.0, eta_s=None)
+        elif self._error:
+            post(self.entry, status=FileStatus.ERROR, fps=0.0, eta_s=None,
+                 error_msg=self._error)
+        else:
+            try:
+                ws.join(len(self.plan))
+            except (RuntimeError, OSError) as exc:
+                post(self.entry, status=FileStatus.ERROR, fps=0.0, eta_s=None,
+                     error_msg=f"Joining segments failed: {exc}")
+                return
+            ws.remove()
+            self._finished()
+
+    def _segment_worker(self, ws: segments.Workspace, todo: _queue.Queue):
+        while not self.cancelled and not self._error:
+            self._go.wait()
+            if self.cancelled:
+                return
+            try:
+                i = todo.get_nowait()
+            except _queue.Empty:
+                return
+            start, length = self.plan[i]
+            args = [HANDBRAKE_CLI, "-i", self.entry.path, "-o", ws.partial(i),
+                    "--start-at", f"seconds:{start:.3f}"]
+            if length is not None:
+                args += ["--stop-at", f"seconds:{length:.3f}"]
+            try:
+                code, parser = self._run_process(
+                    args + self.args, lambda p, i=i: self._segment_progress(i, p))
+            except OSError as exc:
+                self._fail(f"Could not start {self.tool}: {exc}")
+                return
+            with self._lock:
+                self._speed.pop(i, None)
+            if self.cancelled:
+                _discard(ws.partial(i))     # finished segments stay for the resume
+                return
+            if code != 0:
+                self._fail(f"Segment {i + 1}/{len(self.plan)}: "
+                           + _failure(code, parser, self.tool))
+                return
+            try:
+                ws.commit(i)
+            except OSError as exc:
+                self._fail(f"Could not keep segment {i + 1}: {exc.strerror or exc}")
+                return
+            self._segment_progress(i, None, 1.0)
+
+    def _fail(self, msg: str):
+        """Stop the other segments; the ones already finished are kept."""
+        with self._lock:
+            self._error = self._error or msg
+            procs = list(self._procs)
+        for proc in procs:
+            if proc.poll() is None:
+                proc.terminate()
+
+    def _fraction(self) -> float:
+        return sum(d * w for d, w in zip(self._done, self._weights))
+
+    def _segment_progress(self, i: int, p: Progress | None, done: float | None = None):
+        with self._lock:
+            if p is not None:
+                self._done[i]  = p.fraction
+                self._speed[i] = p
+            elif done is not None:
+                self._done[i] = done
+            frac = self._fraction()
+            fps  = sum(x.fps for x in self._speed.values())
+            avg  = sum(x.avg_fps for x in self._speed.values())
+        # Whole-job ETA from this run's pace — segment ETAs don't add up
+        gained = frac - self._resumed_at
+        eta = None
+        if gained > 0.01:
+            elapsed = time.monotonic() - self._t0
+            eta = int(elapsed * (1.0 - frac) / gained)
+        self.bus.post(self.entry, progress=frac, fps=fps, avg_fps=avg, eta_s=eta)
+
+
+def build_job(entry: QueueEntry, tool_args: list[str], output: str, bus, on_exit,
+              remuxing: bool = False, **cached) -> _Job:
+    """
+    A whole-file job: tool_args are HandBrake's (or, remuxing, ffmpeg's)
+    options without input and output. bus needs post() and call(), as
+    UpdateBus has; cached is cache/recipe/planned for the result cache.
+    """
+    if remuxing:
+        return _RemuxJob(entry, [segments.FFMPEG, "-i", entry.path] + tool_args + [output],
+                         output, bus, on_exit, **cached)
+    return _Job(entry, [HANDBRAKE_CLI, "-i", entry.path, "-o", output] + tool_args,
+                output, bus, on_exit, **cached)
+
+
+def _policy(label: str) -> Policy:
+    try:
+        return Policy(label)
+    except ValueError:
+        return Policy.FIFO
+
+
+def _failure(code: int, parser: ProgressParser, tool: str) -> str:
+    msg = parser.tail[-1] if parser.tail else ""
+    return f"{tool} exited with code {code}" + (f": {msg}" if msg else "")
+
+
+def _discard(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class EncodeScheduler:
+    """
+    Keeps up to max_jobs HandBrakeCLI processes running until no READY
+    entries remain. Call start() from the thread that owns the QueueManager
+    and keep draining the bus there; finished jobs free their slot through it.
+
+    Without an explicit max_jobs a ConcurrencyTuner sets it, and the threads
+    per job, from the throughput it measures.
+    """
+
+    def __init__(self, queue: QueueManager, bus: UpdateBus,
+                 max_jobs: int | None = None):
+        self.queue    = queue
+        self.bus      = bus
+        self.tuner    = None if max_jobs else ConcurrencyTuner(default_concurrency())
+        self.max_jobs = max_jobs or self.tuner.jobs
+        self.settings = EncodeSettings()
+        self._jobs:    dict[int, _Job] = {}          # id(entry) → job
+        self._ready    = ReadyQueue(queue)
+        self.results:  ResultCache | None = None
+        self._running  = False
+        self._paused   = False
+        if self.tuner:
+            queue.add_listener(self._on_queue_change)
+
+    # ── Control ───────────────────────────────────────────────────────────────
+
+    @property
+    def running(self) -> bool:
+        return self._running or bool(self._jobs)
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def start(self, settings: EncodeSettings | None = None):
+        if settings is not None:
+            self.settings = settings
+        self._ready.set_policy(_policy(self.settings.order))
+        if self.settings.reuse_results and self.results is None:
+            self.results = ResultCache.default()
+        self._running = True
+        self._paused  = False
+        self._fill_slots()
+
+    def pause(self):
+        """Stop dispatching and suspend running processes where supported."""
+        self._paused = True
+        for job in self._jobs.values():
+            job.hold(True)
+        self._signal_all(getattr(signal, "SIGSTOP", None))
+
+    def resume(self):
+        self._paused = False
+        self._signal_all(getattr(signal, "SIGCONT", None))
+        for job in self._jobs.values():
+            job.hold(False)
+        self._fill_slots()
+
+    def cancel(self):
+        """Kill every running job; their entries go back to READY."""
+        self._running = False
+        for job in self._jobs.values():
+            job.cancel()
+        if self._paused:
+            # Stopped processes only act on SIGTERM once continued
+            self._signal_all(getattr(signal, "SIGCONT", None))
+        self._paused = False
+
+    def shutdown(self, timeout: float = 5.0):
+        """
+        cancel(), then wait up to timeout for the jobs' processes to exit and
+        their half-written outputs to be removed — for when the app closes.
+        """
+        self.cancel()
+        deadline = time.monotonic() + timeout
+        for job in list(self._jobs.values()):
+            job.thread.join(max(0.0, deadline - time.monotonic()))
+
+    def _signal_all(self, sig):
+        if sig is None:
+            return
+        for job in self._jobs.values():
+            for proc in job.processes():
+                if proc.poll() is None:
+                    proc.send_signal(sig)
+
+    # ── Tuning (UI thread) ────────────────────────────────────────────────────
+
+    @property
+    def threads(self) -> int | None:
+        """Encoder threads per job, when the tuner is choosing them."""
+        return self.tuner.threads if self.tuner else None
+
+    def _on_queue_change(self, event: QueueEvent):
+        if event.kind != Change.UPDATED or "progress" not in event.fields:
+            return
+        if not self._jobs or self._paused:
+            return
+        source_s = 0.0
+        for e in event.entries:
+            job = self._jobs.get(id(e))
+            if job and job.duration and e.status == FileStatus.ENCODING:
+                source_s += max(0.0, e.progress - job.seen) * job.duration
+                job.seen = e.progress
+        # Negative once the tuner has lowered max_jobs below what's running
+        busy = self._free_slots() <= 0
+        if self.tuner.record(source_s, busy, time.monotonic()):
+            self.max_jobs = self.tuner.jobs
+            self._fill_slots()
+
+    # ── Dispatch (UI thread) ──────────────────────────────────────────────────
+
+    def _job_exited(self, job: _Job):
+        self._jobs.pop(id(job.entry), None)
+        self._fill_slots()
+        if not self._jobs and not self._paused:
+            self._running = False
+
+    def _next_ready(self) -> QueueEntry | None:
+        return self._ready.pop(skip=lambda e: id(e) in self._jobs)
+
+    def _free_slots(self) -> int:
+        return self.max_jobs - sum(job.width for job in self._jobs.values())
+
+    def _fill_slots(self):
+        if not self._running or self._paused:
+            return
+        with self.queue.batch():
+            while self._free_slots() > 0:
+                entry = self._next_ready()
+                if entry is None:
+                    # Nothing left to start; with nothing running either
+                    # (e.g. every file was skipped) the run is over
+                    self._running = bool(self._jobs)
+                    return
+                reason = preflight.check(entry, self.settings)
+                if reason:
+                    self.queue.update(entry, status=FileStatus.SKIPPED,
+                                      progress=0.0, error_msg=reason)
+                    continue
+                self._launch(entry)
+
+    def _launch(self, entry: QueueEntry):
+        try:
+            copy = remux.plan(entry, self.settings)
+        except ValueError as exc:
+            self.queue.update(entry, status=FileStatus.ERROR, error_msg=str(exc))
+            return
+        dst  = output_path(entry, self.settings)
+        args = copy if copy is not None else self.settings.handbrake_args(self.threads)
+        cached = {}
+        if self.results is not None:
+            # Thread counts don't change the result, so they're left out
+            recipe = copy if copy is not None else self.settings.handbrake_args()
+            cached = dict(cache=self.results, planned=planned_path(entry, self.settings),
+                          recipe=" ".join(recipe))
+        plan, duration = [], None
+        if self.settings.segmented and copy is None:
+            duration = entry.duration_s
+            plan = segments.plan(duration, entry.media.chapters if entry.media else (),
+                                 self.settings.segment_s)
+        if len(plan) > 1:
+            width = min(self._free_slots(), len(plan))
+            job = _SegmentedJob(entry, args, self.settings.handbrake_args(), dst, plan,
+                                duration, width, self.bus, self._job_exited, **cached)
+        else:
+            job = build_job(entry, args, dst,
+                            self.bus, self._job_exited, remuxing=copy is not None,
+                            **cached)
+        self._jobs[id(entry)] = job
+        self.queue.update(entry, status=FileStatus.ENCODING, progress=0.0,
+                          fps=0.0, avg_fps=0.0, eta_s=None, error_msg="")
+        job.thread.start()
@@ -0,0 +1,619 @@
+"""
+Codex — Encode Farm
+Spreads a queue over several machines. A FarmCoordinator owns the queue and
+listens on a TCP port (or a Unix socket); FarmWorkers on the render nodes
+connect to it, say how many jobs they take at once, and run the jobs they
+are handed with the same job classes a local EncodeScheduler uses. Sources
+and outputs live on storage every node can reach, so only paths travel.
+
+The protocol is one JSON object per line, each with an "op":
+
+    worker → coordinator   hello {name, slots, token}
+                           beat {leases}      every HEARTBEAT_S
+                           progress {lease, progress, fps, avg_fps, eta_s}
+                           done {lease, note} · failed {lease, error}
+                           released {lease}   (cancelled on the worker)
+    coordinator → worker   job {lease, path, output, settings, remux, …}
+                           cancel {lease} · beat · bye
+
+Every job is a lease that lasts LEASE_S and is renewed by the worker's
+messages about it. A worker that disconnects, or lets a lease run out, is
+taken for dead: it is dropped and its entries go back to READY for the
+other workers. An entry that loses MAX_ATTEMPTS leases is failed rather
+than passed round forever. Messages about a lease that has since moved on
+are ignored.
+
+As with EncodeScheduler, the coordinator changes the queue only on the
+thread that drains the bus; its socket threads hand messages over with
+bus.call(). CODEX_FARM_TOKEN, when set, must match on both ends.
+"""
+
+import dataclasses
+import itertools
+import json
+import os
+import socket
+import threading
+import time
+
+from src.core.queue_manager import QueueManager, QueueEntry, FileStatus
+from src.core.encode_settings import EncodeSettings
+from src.core.encoder import build_job, default_concurrency, output_path, planned_path
+from src.core.scheduling import ReadyQueue, Policy
+from src.core.result_cache import ResultCache
+from src.core.update_bus import UpdateBus
+from src.core import preflight, remux
+
+DEFAULT_PORT = 7717
+LEASE_S      = 30.0     # a job outlives its worker's silence by this long
+HEARTBEAT_S  = 5.0
+SWEEP_S      = 1.0      # how often expired leases are looked for
+RECONNECT_S  = 5.0
+PROGRESS_S   = 0.25     # progress messages per job, at most one per this
+MAX_ATTEMPTS = 3        # leases lost before an entry is failed
+MAX_LINE     = 1 << 20
+
+TOKEN = os.environ.get("CODEX_FARM_TOKEN", "")
+
+PROGRESS_FIELDS = ("progress", "fps", "avg_fps", "eta_s")
+
+
+# ── Wire ──────────────────────────────────────────────────────────────────────
+
+def parse_address(text: str) -> tuple[int, object]:
+    """
+    "host:port", a bare host (DEFAULT_PORT), a bare port (on 127.0.0.1) or
+    a Unix socket path ("unix:/run/codex.sock", or anything with a slash)
+    → (family, address).
+    """
+    if text.startswith("unix:") or "/" in text:
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix sockets aren't available on this system")
+        return socket.AF_UNIX, text.removeprefix("unix:")
+    host, sep, port = text.rpartition(":")
+    if not sep and not text.isdigit():
+        host, port = text, DEFAULT_PORT
+    try:
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    except ValueError:
+        raise ValueError(f"not host:port or a socket path: {text!r}") from None
+
+
+def _listen(address: str) -> socket.socket:
+    family, addr = parse_address(address)
+    if family == socket.AF_INET:
+        return socket.create_server(addr)
+    if os.path.exists(addr):
+        os.remove(addr)             # left by a coordinator that didn't close
+    server = socket.socket(family)
+    server.bind(addr)
+    server.listen()
+    return server
+
+
+def _connect(address: str) -> socket.socket:
+    family, addr = parse_address(address)
+    if family == socket.AF_INET:
+        return socket.create_connection(addr, timeout=LEASE_S)
+    sock = socket.socket(family)
+    sock.settimeout(LEASE_S)
+    sock.connect(addr)
+    return sock
+
+
+class _Link:
+    """One connection: JSON lines each way. send() may be called from any thread."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock  = sock
+        self._lock = threading.Lock()
+        self._file = sock.makefile("rb")
+        self.closed = False
+
+    def send(self, op: str, **fields) -> bool:
+        data = (json.dumps({"op": op, **fields}) + "\n").encode()
+        with self._lock:
+            if self.closed:
+                return False
+            try:
+                self.sock.sendall(data)
+                return True
+            except OSError:
+                return False
+
+    def messages(self):
+        """
+        Messages until the peer hangs up or close() is called. Timeouts
+        raise, as OSError.
+        """
+        while True:
+            try:
+                line = self._file.readline(MAX_LINE)
+            except (OSError, ValueError):
+                if self.closed:
+                    return              # closed from another thread mid-read
+                raise
+            if not line:
+                return
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(msg, dict):
+                yield msg
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._file.close()
+        self.sock.close()
+
+
+# ── Coordinator ───────────────────────────────────────────────────────────────
+
+class _Worker:
+    """A connected worker, as the coordinator sees it."""
+
+    def __init__(self, link: _Link, name: str, slots: int):
+        self.link   = link
+        self.name   = name
+        self.slots  = slots
+        self.leases: dict[int, "_Lease"] = {}
+
+    @property
+    def free(self) -> int:
+        return self.slots - len(self.leases)
+
+
+@dataclasses.dataclass(eq=False)
+class _Lease:
+    id:      int
+    entry:   QueueEntry
+    worker:  _Worker
+    expires: float
+
+
+class FarmCoordinator:
+    """
+    Hands READY entries to connected workers, one lease per job, until
+    none are left. Used like EncodeScheduler: start(), then keep draining
+    the bus on the queue's thread; running is False once everything is
+    done. Entries are dispatched in the settings' order, after the same
+    pre-flight check; segmented encoding is a local-only mode, so each
+    worker gets whole files. log(event, **fields) hears about workers.
+    """
+
+    tuner   = None
+    threads = None
+
+    def __init__(self, queue: QueueManager, bus: UpdateBus, address: str,
+                 log=None):
+        self.queue    = queue
+        self.bus      = bus
+        self.log      = log or (lambda event, **fields: None)
+        self.settings = EncodeSettings()
+        self._ready   = ReadyQueue(queue)
+        self._workers:  list[_Worker]     = []
+        self._leases:   dict[int, _Lease] = {}      # lease id → lease
+        self._by_entry: dict[int, _Lease] = {}      # id(entry) → lease
+        self._attempts: dict[int, int]    = {}      # id(entry) → leases lost
+        self._pending:  dict[int, tuple]  = {}      # lease id → (entry, progress)
+        self._ids     = itertools.count(1)
+        self._running = False
+        self._closed  = False
+        self._server  = _listen(address)
+        self.address  = address
+        if self._server.family == socket.AF_INET:
+            host, port = self._server.getsockname()[:2]
+            self.address = f"{host}:{port}"         # the real port, if 0 was asked
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        threading.Thread(target=self._sweep_loop, daemon=True).start()
+
+    # ── Control ───────────────────────────────────────────────────────────────
+
+    @property
+    def running(self) -> bool:
+        return self._running or bool(self._leases)
+
+    @property
+    def max_jobs(self) -> int:
+        """Slots across the connected workers."""
+        return sum(w.slots for w in self._workers)
+
+    @property
+    def workers(self) -> list[tuple[str, int, int]]:
+        """(name, slots, jobs running) per connected worker."""
+        return [(w.name, w.slots, len(w.leases)) for w in self._workers]
+
+    def start(self, settings: EncodeSettings | None = None):
+        if settings is not None:
+            self.settings = settings
+        try:
+            self._ready.set_policy(Policy(self.settings.order))
+        except ValueError:
+            self._ready.set_policy(Policy.FIFO)
+        self._running = True
+        self._fill_slots()
+
+    def cancel(self):
+        """Call every job back; their entries return to READY now."""
+        self._running = False
+        with self.queue.batch():
+            for lease in list(self._leases.values()):
+                lease.worker.link.send("cancel", lease=lease.id)
+                self._drop(lease)
+                self.queue.update(lease.entry, status=FileStatus.READY, progress=0.0,
+                                  fps=0.0, avg_fps=0.0, eta_s=None)
+
+    def close(self):
+        """Stop listening and disconnect every worker."""
+        self._closed = True
+        self._server.close()
+        if self._server.family != socket.AF_INET:
+            try:
+                os.remove(parse_address(self.address)[1])
+            except OSError:
+                pass
+        for w in list(self._workers):
+            w.link.send("bye")
+            w.link.close()
+
+    # ── Socket threads ────────────────────────────────────────────────────────
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return                          # closed
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _serve(self, sock: socket.socket):
+        # A worker that says nothing for LEASE_S — not even a beat — is gone
+        sock.settimeout(LEASE_S)
+        link = _Link(sock)
+        worker = None
+        try:
+            for msg in link.messages():
+                if worker is not None:
+                    self.bus.call(self._on_message, worker, msg)
+                elif msg.get("op") != "hello" or msg.get("token", "") != TOKEN:
+                    link.send("bye", reason="bad hello or token")
+                    return
+                else:
+                    worker = _Worker(link, str(msg.get("name") or "worker"),
+                                     max(1, int(msg.get("slots") or 1)))
+                    self.bus.call(self._joined, worker)
+        except (OSError, ValueError):
+            pass
+        finally:
+            link.close()
+            if worker is not None:
+                self.bus.call(self._left, worker, "disconnected")
+
+    def _sweep_loop(self):
+        while not self._closed:
+            time.sleep(SWEEP_S)
+            self.bus.call(self._sweep)
+
+    # ── Bookkeeping (queue thread) ────────────────────────────────────────────
+
+    def _joined(self, worker: _Worker):
+        if self._closed:
+            worker.link.close()
+            return
+        self._workers.append(worker)
+        self.log("worker", name=worker.name, slots=worker.slots, state="joined")
+        self._fill_slots()
+
+    def _left(self, worker: _Worker, reason: str):
+        if worker not in self._workers:
+            return
+        self._workers.remove(worker)
+        worker.link.close()
+        self.log("worker", name=worker.name, state="left", reason=reason,
+                 requeued=len(worker.leases))
+        with self.queue.batch():
+            for lease in list(worker.leases.values()):
+                self._lost(lease, f"{worker.name} {reason}")
+        self._fill_slots()
+
+    def _sweep(self):
+        now = time.monotonic()
+        for lease in [l for l in self._leases.values() if l.expires < now]:
+            if lease.id in self._leases:        # not gone with an earlier worker
+                lease.worker.link.send("bye", reason=f"lease {lease.id} expired")
+                self._left(lease.worker, "let a lease expire")
+
+    def _on_message(self, worker: _Worker, msg: dict):
+        if worker not in self._workers:
+            return
+        op, now = msg.get("op"), time.monotonic()
+        if op == "beat":
+            for n in msg.get("leases") or ():
+                lease = self._leases.get(n)
+                if lease is not None and lease.worker is worker:
+                    lease.expires = now + LEASE_S
+            worker.link.send("beat")
+            return
+
+        lease = self._leases.get(msg.get("lease"))
+        if lease is None or lease.worker is not worker:
+            if op == "progress":
+                # Reassigned while this worker was out of touch
+                worker.link.send("cancel", lease=msg.get("lease"))
+            return
+        lease.expires = now + LEASE_S
+        entry = lease.entry
+        if op == "progress":
+            if not self._pending:
+                self.bus.call(self._flush)      # after this frame's messages
+            self._pending[lease.id] = (entry, {k: msg[k] for k in PROGRESS_FIELDS
+                                               if k in msg})
+            return
+        if op == "done":
+            self._drop(lease)
+            self.queue.update(entry, status=FileStatus.DONE, progress=1.0, fps=0.0,
+                              eta_s=None, error_msg=msg.get("note") or "")
+        elif op == "failed":
+            self._drop(lease)
+            self.queue.update(entry, status=FileStatus.ERROR, fps=0.0, eta_s=None,
+                              error_msg=msg.get("error") or f"Failed on {worker.name}")
+        elif op == "released":
+            self._lost(lease, f"released by {worker.name}")
+        self._fill_slots()
+
+    def _flush(self):
+        pending, self._pending = self._pending, {}
+        if pending:
+            self.queue.update_many(list(pending.values()))
+
+    def _drop(self, lease: _Lease):
+        self._leases.pop(lease.id, None)
+        self._by_entry.pop(id(lease.entry), None)
+        self._pending.pop(lease.id, None)
+        lease.worker.leases.pop(lease.id, None)
+
+    def _lost(self, lease: _Lease, reason: str):
+        """Put a lease's entry back in line, or fail it after MAX_ATTEMPTS."""
+        self._drop(lease)
+        e = lease.entry
+        attempts = self._attempts[id(e)] = self._attempts.get(id(e), 0) + 1
+        if attempts >= MAX_ATTEMPTS:
+            self.queue.update(e, status=FileStatus.ERROR, fps=0.0, eta_s=None,
+                              error_msg=f"Lost {attempts} workers while encoding "
+                                        f"(last: {reason})")
+        else:
+            self.queue.update(e, status=FileStatus.READY, progress=0.0,
+                              fps=0.0, avg_fps=0.0, eta_s=None)
+
+    # ── Dispatch (queue thread) ───────────────────────────────────────────────
+
+    def _fill_slots(self):
+        if not self._running:
+            return
+        with self.queue.batch():
+            while True:
+                worker = max(self._workers, key=lambda w: w.free, default=None)
+                if worker is None or worker.free <= 0:
+                    return                      # wait for a slot or a worker
+                entry = self._ready.pop(skip=lambda e: id(e) in self._by_entry)
+                if entry is None:
+                    self._running = bool(self._leases)
+                    return
+                reason = preflight.check(entry, self.settings)
+                if reason:
+                    self.queue.update(entry, status=FileStatus.SKIPPED,
+                                      progress=0.0, error_msg=reason)
+                    continue
+                self._assign(entry, worker)
+
+    def _assign(self, entry: QueueEntry, worker: _Worker):
+        try:
+            copy = remux.plan(entry, self.settings)
+        except ValueError as exc:
+            self.queue.update(entry, status=FileStatus.ERROR, error_msg=str(exc))
+            return
+        lease = _Lease(next(self._ids), entry, worker, time.monotonic() + LEASE_S)
+        job = dict(lease=lease.id, path=entry.path, size=entry.size,
+                   duration=entry.duration_s, output=output_path(entry, self.settings),
+                   settings=dataclasses.asdict(self.settings), remux=copy)
+        if self.settings.reuse_results:
+            recipe = copy if copy is not None else self.settings.handbrake_args()
+            job.update(recipe=" ".join(recipe), planned=planned_path(entry, self.settings))
+        if not worker.link.send("job", **job):
+            # Back in the ready heap. Give this worker nothing more; its
+            # reader thread is about to report the hang-up
+            self.queue.update(entry, status=FileStatus.READY)
+            worker.slots = len(worker.leases)
+            return
+        self._leases[lease.id] = lease
+        self._by_entry[id(entry)] = lease
+        worker.leases[lease.id] = lease
+        self.queue.update(entry, status=FileStatus.ENCODING, progress=0.0,
+                          fps=0.0, avg_fps=0.0, eta_s=None, error_msg="")
+
+
+# ── Worker ────────────────────────────────────────────────────────────────────
+
+class _LeaseBus:
+    """
+    What a job on a worker posts to in place of an UpdateBus: progress and
+    the final status go to the coordinator as messages about its lease.
+    """
+
+    def __init__(self, link: _Link, lease: int):
+        self.link  = link
+        self.lease = lease
+        self._last = 0.0
+
+    def post(self, entry: QueueEntry, **fields):
+        status = fields.get("status")
+        if status is None:
+            now = time.monotonic()
+            if now - self._last >= PROGRESS_S:
+                self._last = now
+                self.link.send("progress", lease=self.lease,
+                               **{k: fields[k] for k in PROGRESS_FIELDS if k in fields})
+        elif status == FileStatus.DONE:
+            self.link.send("done", lease=self.lease, note=fields.get("error_msg", ""))
+        elif status == FileStatus.ERROR:
+            self.link.send("failed", lease=self.lease, error=fields.get("error_msg", ""))
+        else:
+            self.link.send("released", lease=self.lease)
+
+    def call(self, fn, *args):
+        fn(*args)
+
+
+class FarmWorker:
+    """
+    Connects to a coordinator and runs up to slots jobs at a time, each with
+    a fair share of this machine's cores. Reconnects after losing the
+    coordinator; jobs running then are cancelled, as the coordinator will
+    have handed them to someone else. path_map rewrites path prefixes for
+    nodes that mount the shared storage elsewhere.
+    """
+
+    def __init__(self, address: str, slots: int | None = None,
+                 path_map: list[tuple[str, str]] = (), name: str | None = None,
+                 log=None):
+        parse_address(address)                  # fail now on a bad address
+        self.address  = address
+        self.slots    = max(1, slots or default_concurrency())
+        self.threads  = max(1, (os.cpu_count() or 1) // self.slots)
+        self.path_map = list(path_map)
+        self.name     = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.log      = log or (lambda event, **fields: None)
+        self.results: ResultCache | None = None
+        self._jobs:   dict[int, object] = {}    # lease → job
+        self._lock    = threading.Lock()
+        self._link:   _Link | None = None
+        self._stop    = threading.Event()
+
+    def run(self, reconnect: bool = True):
+        """Serve until stop() — or until the first disconnect, without reconnect."""
+        while not self._stop.is_set():
+            try:
+                link = _Link(_connect(self.address))
+            except OSError as exc:
+                self.log("unreachable", address=self.address, error=str(exc))
+            else:
+                self._serve(link)
+            if not reconnect:
+                return
+            self._stop.wait(RECONNECT_S)
+
+    def stop(self):
+        self._stop.set()
+        if self._link is not None:
+            self._link.close()
+
+    def _serve(self, link: _Link):
+        self._link = link
+        link.send("hello", name=self.name, slots=self.slots, token=TOKEN)
+        self.log("connected", address=self.address, slots=self.slots)
+        threading.Thread(target=self._beat, args=(link,), daemon=True).start()
+        reason = "coordinator closed the connection"
+        try:
+            for msg in link.messages():
+                op = msg.get("op")
+                if op == "job":
+                    self._start(link, msg)
+                elif op == "cancel":
+                    self._cancel(msg.get("lease"))
+                elif op == "bye":
+                    reason = msg.get("reason") or "coordinator finished"
+                    break
+        except (OSError, ValueError) as exc:
+            reason = f"lost the coordinator: {exc}"
+        finally:
+            if self._stop.is_set():
+                reason = "stopped"
+            link.close()
+            with self._lock:
+                leases = list(self._jobs)
+            for lease in leases:
+                self._cancel(lease)
+            self.log("disconnected", reason=reason, cancelled=len(leases))
+
+    def _beat(self, link: _Link):
+        while not link.closed:
+            with self._lock:
+                leases = list(self._jobs)
+            if not link.send("beat", leases=leases):
+                return
+            self._stop.wait(HEARTBEAT_S)
+            if self._stop.is_set():
+                return
+
+    def _map(self, path: str) -> str:
+        for prefix, local in self.path_map:
+            if path.startswith(prefix):
+                return local + path[len(prefix):]
+        return path
+
+    def _start(self, link: _Link, msg: dict):
+        lease = msg.get("lease")
+        try:
+            entry, args, output, copy, recipe = self._job_fields(msg)
+        except (ValueError, TypeError) as exc:
+            # Refuse this one job; the coordinator fails its entry
+            link.send("failed", lease=lease, error=f"Bad job from the coordinator: {exc}")
+            self.log("rejected", lease=lease, error=str(exc))
+            return
+        cached = {}
+        if recipe:
+            if self.results is None:
+                self.results = ResultCache.default()
+            if self.results is not None:
+                cached = dict(cache=self.results, recipe=recipe,
+                              planned=self._map(msg.get("planned") or ""))
+        job = build_job(entry, args, output, _LeaseBus(link, lease),
+                        lambda job: self._exited(lease), remuxing=copy is not None,
+                        **cached)
+        with self._lock:
+            self._jobs[lease] = job
+        self.log("job", lease=lease, path=entry.path)
+        job.thread.start()
+
+    def _job_fields(self, msg: dict) -> tuple:
+        """
+        (entry, tool args, output, remux args, recipe) from a "job" message.
+        Raises ValueError or TypeError when it is malformed.
+        """
+        lease, path, output = msg.get("lease"), msg.get("path"), msg.get("output")
+        if not isinstance(lease, int) or isinstance(lease, bool):
+            raise ValueError("no lease id")
+        if not isinstance(path, str) or not path or not isinstance(output, str) or not output:
+            raise ValueError("no source or output path")
+        copy, recipe = msg.get("remux"), msg.get("recipe")
+        if copy is not None and not (isinstance(copy, list)
+                                     and all(isinstance(a, str) for a in copy)):
+            raise ValueError("remux arguments aren't a list of strings")
+        if recipe is not None and not isinstance(recipe, str):
+            raise ValueError("recipe isn't a string")
+        known = {f.name for f in dataclasses.fields(EncodeSettings)}
+        settings = EncodeSettings(**{k: v for k, v in dict(msg.get("settings") or {}).items()
+                                     if k in known})
+        duration = msg.get("duration")
+        entry = QueueEntry(self._map(path), int(msg.get("size", -1)),
+                           None if duration is None else float(duration))
+        args = copy if copy is not None else settings.handbrake_args(self.threads)
+        return entry, args, self._map(output), copy, recipe
+
+    def _cancel(self, lease):
+        with self._lock:
+            job = self._jobs.get(lease)
+        if job is not None:
+            job.cancel()
+
+    def _exited(self, lease: int):
+        with self._lock:
+            self._jobs.pop(lease, None)
@@ -0,0 +1,190 @@
+"""
+Codex — Queue Journal
+Append-only log of queue mutations and status transitions, so a crash or
+reboot mid-batch loses nothing. One JSON object per line:
+
+    {"op": "add", "path": …, "size": …}
+    {"op": "rm",  "path": …}
+    {"op": "st",  "path": …, "s": "DONE", "err": ""}
+    {"op": "pr",  "path": …, "p": 1}
+
+Progress ticks are not journalled — only status and priority changes — so a busy run
+writes a handful of short lines per job. On startup the journal is
+replayed: DONE/ERROR/SKIPPED entries keep their status, anything that was
+ENCODING goes back to READY. When the log grows well past the size of the
+queue it is compacted into a fresh snapshot (written aside, then renamed).
+"""
+
+import json
+import os
+import time
+
+from src.core.queue_manager import (
+    QueueManager, QueueEntry, QueueEvent, Change, FileStatus,
+)
+from src.utils.file_utils import data_dir
+
+FSYNC_INTERVAL_S = 1.0       # status changes reach the disk at least this often
+COMPACT_MIN_LINES = 10_000
+
+
+def default_path() -> str:
+    return os.path.join(data_dir(), "queue.journal")
+
+
+def replay(path: str) -> list[QueueEntry]:
+    """
+    Rebuild queue entries from a journal. A torn last line is ignored, as
+    is any record that doesn't parse as one this module writes.
+    """
+    entries: dict[str, QueueEntry] = {}
+    try:
+        f = open(path, encoding="utf-8")
+    except FileNotFoundError:
+        return []
+    with f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+                _apply(entries, rec)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue
+
+    for e in entries.values():
+        if e.status == FileStatus.ENCODING:      # interrupted mid-encode
+            e.status = FileStatus.READY
+        if e.status == FileStatus.DONE:
+            e.progress = 1.0
+    return list(entries.values())
+
+
+def _apply(entries: dict[str, QueueEntry], rec: dict):
+    """Replay one record. Raises on a malformed one, before changing anything."""
+    op, p = rec.get("op"), rec.get("path")
+    if not isinstance(p, str):
+        raise ValueError("record without a path")
+    if op == "add":
+        entries.pop(p, None)                # re-added goes to the back
+        size = rec.get("size")
+        # Journals before sizes were numbers hold e.g. "2.1 GB"
+        entries[p] = QueueEntry(p, size if isinstance(size, int) else -1)
+    elif op == "rm":
+        entries.pop(p, None)
+    elif op == "st" and p in entries:
+        status = FileStatus[rec["s"]]
+        entries[p].status    = status
+        entries[p].error_msg = str(rec.get("err") or "")
+    elif op == "pr" and p in entries:
+        entries[p].priority  = int(rec["p"])
+
+
+def _add(e: QueueEntry) -> dict:
+    return {"op": "add", "path": e.path, "size": e.size}
+
+
+def _status(e: QueueEntry) -> dict:
+    return {"op": "st", "path": e.path, "s": e.status.name, "err": e.error_msg}
+
+
+def _priority(e: QueueEntry) -> dict:
+    return {"op": "pr", "path": e.path, "p": e.priority}
+
+
+def _snapshot(e: QueueEntry) -> list[dict]:
+    recs = [_add(e)]
+    if e.status != FileStatus.READY:
+        recs.append(_status(e))
+    if e.priority:
+        recs.append(_priority(e))
+    return recs
+
+
+class QueueJournal:
+
+    def __init__(self, queue: QueueManager, path: str):
+        self.queue = queue
+        self.path  = path
+        self._file       = None
+        self._lines      = 0
+        self._last_sync  = 0.0
+        self._statuses: dict[int, FileStatus] = {}      # id(entry) → last written
+        self._compact()
+        queue.add_listener(self._on_queue_change)
+
+    @classmethod
+    def restore(cls, queue: QueueManager, path: str | None = None) -> "QueueJournal":
+        """Load a previous session's queue into queue, then keep journalling."""
+        path = path or default_path()
+        queue.add_many(replay(path))
+        return cls(queue, path)
+
+    # ── Writing ───────────────────────────────────────────────────────────────
+
+    def _on_queue_change(self, event: QueueEvent):
+        if event.kind == Change.INSERTED:
+            recs = []
+            for e in event.entries:
+                recs += _snapshot(e)
+                self._statuses[id(e)] = e.status
+            self._write(recs)
+        elif event.kind == Change.REMOVED:
+            for e in event.entries:
+                self._statuses.pop(id(e), None)
+            self._write([{"op": "rm", "path": e.path} for e in event.entries])
+        elif event.kind == Change.UPDATED:
+            if "status" in event.fields:
+                recs = []
+                for e in event.entries:
+                    if self._statuses.get(id(e)) != e.status:
+                        self._statuses[id(e)] = e.status
+                        recs.append(_status(e))
+                self._write(recs, sync=True)
+            if "priority" in event.fields:
+                self._write([_priority(e) for e in event.entries])
+        elif event.kind == Change.RESET:
+            try:
+                self._compact()
+            except OSError:
+                pass
+
+    def _write(self, recs: list[dict], sync: bool = False):
+        if not recs or self._file is None:
+            return
+        try:
+            self._file.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in recs))
+            self._file.flush()                  # survives a process crash
+            self._lines += len(recs)
+            now = time.monotonic()
+            if sync and now - self._last_sync >= FSYNC_INTERVAL_S:
+                os.fsync(self._file.fileno())   # survives a power cut
+                self._last_sync = now
+            if self._lines > max(COMPACT_MIN_LINES, 4 * len(self.queue)):
+                self._compact()
+        except OSError:
+            pass        # journalling is a safety net — never break the queue over it
+
+    def _compact(self):
+        """Replace the log with a snapshot of the current queue."""
+        if self._file:
+            self._file.close()
+            self._file = None
+        tmp = self.path + ".tmp"
+        recs = []
+        self._statuses.clear()
+        for e in self.queue.entries:
+            recs += _snapshot(e)
+            self._statuses[id(e)] = e.status
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in recs))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._lines = len(recs)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        if self._file:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
@@ -0,0 +1,223 @@
+"""
+Codex — Media Info
+Boils raw ffprobe JSON down to a MediaSummary — the handful of typed values
+the rest of Codex uses, a few hundred bytes instead of the several
+kilobytes of parsed JSON — and turns that into the display strings the
+Media Info tab shows.
+"""
+
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+
+from src.utils.file_utils import friendly_bytes, friendly_duration
+
+_CODEC_NAMES = {
+    "hevc": "H.265 / HEVC", "h264": "H.264 / AVC", "av1": "AV1",
+    "vp9": "VP9", "vp8": "VP8", "mpeg2video": "MPEG-2", "mpeg4": "MPEG-4",
+}
+
+_PRIMARIES = {"bt2020": "BT.2020", "bt709": "BT.709", "bt470bg": "BT.601",
+              "smpte170m": "BT.601"}
+
+FIELDS = ("Codec", "Resolution", "Frame Rate", "Bit Rate", "Bit Depth",
+          "Colour Space", "HDR Format", "Scan Type",
+          "Format", "Duration", "File Size", "Chapters")
+
+
+def video_stream(info: dict) -> dict | None:
+    for s in info.get("streams", []):
+        if s.get("codec_type") == "video" and not s.get("disposition", {}).get("attached_pic"):
+            return s
+    return None
+
+
+# ── Summary ───────────────────────────────────────────────────────────────────
+
+@dataclass(slots=True, frozen=True)
+class Stream:
+    index: int
+    kind:  str          # ffprobe codec_type: "video", "audio", "subtitle", …
+    codec: str
+
+
+@dataclass(slots=True, frozen=True)
+class VideoInfo:
+    index:     int
+    codec:     str      # ffprobe codec_name, e.g. "hevc"
+    width:     int
+    height:    int
+    fps:       float    # 0.0 when unknown
+    bit_rate:  int      # stream bits/s, 0 when the container doesn't say
+    bit_depth: int      # 0 when unknown
+    primaries: str      # e.g. "bt2020"
+    hdr:       str      # "SDR", "HDR10", "HLG" or "Dolby Vision"
+    scan:      str      # "progressive", "interlaced" or ""
+
+
+@dataclass(slots=True, frozen=True)
+class MediaSummary:
+    format:     str                     # display name, e.g. "Matroska"
+    duration_s: float | None
+    size:       int                     # bytes, 0 when unknown
+    bit_rate:   int                     # whole file bits/s, 0 when unknown
+    video:      VideoInfo | None
+    streams:    tuple[Stream, ...]      # every stream, in file order
+    chapters:   tuple[float, ...]       # chapter start times, seconds
+
+    @property
+    def video_bit_rate(self) -> int:
+        """The video stream's bits/s, else the container's, else size/duration."""
+        if self.video and self.video.bit_rate:
+            return self.video.bit_rate
+        if self.bit_rate:
+            return self.bit_rate
+        if self.size and self.duration_s:
+            return int(self.size * 8 / self.duration_s)
+        return 0
+
+    @classmethod
+    def from_probe(cls, info: dict) -> "MediaSummary":
+        fmt = info.get("format", {})
+        v = video_stream(info)
+        video = None
+        if v:
+            video = VideoInfo(
+                index=_int(v.get("index")),
+                codec=sys.intern(v.get("codec_name", "")),
+                width=_int(v.get("width")),
+                height=_int(v.get("height")),
+                fps=_fps(v.get("avg_frame_rate") or v.get("r_frame_rate")),
+                bit_rate=_int(v.get("bit_rate")),
+                bit_depth=_bit_depth(v),
+                primaries=sys.intern(v.get("color_primaries", "")),
+                hdr=_hdr(v),
+                scan=_scan(v.get("field_order")),
+            )
+        chapters = []
+        for ch in info.get("chapters", []):
+            try:
+                chapters.append(float(ch["start_time"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return cls(
+            format=sys.intern(_format(fmt)),
+            duration_s=_float(fmt.get("duration")),
+            size=_int(fmt.get("size")),
+            bit_rate=_int(fmt.get("bit_rate")),
+            video=video,
+            streams=tuple(_stream(_int(s.get("index")), s.get("codec_type", ""),
+                                  s.get("codec_name", ""))
+                          for s in info.get("streams", [])),
+            chapters=tuple(chapters),
+        )
+
+
+@lru_cache(maxsize=4096)
+def _stream(index: int, kind: str, codec: str) -> Stream:
+    # Most files share their stream layouts, so most queues need only a few
+    # hundred distinct Stream objects between them
+    return Stream(index, sys.intern(kind), sys.intern(codec))
+
+
+def _int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _float(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fps(r: str | None) -> float:
+    try:
+        num, den = (int(x) for x in (r or "").split("/"))
+    except ValueError:
+        return 0.0
+    return num / den if num and den else 0.0
+
+
+def _bit_depth(v: dict) -> int:
+    raw = v.get("bits_per_raw_sample")
+    if raw and str(raw).isdigit():
+        return int(raw)
+    pix = v.get("pix_fmt", "")
+    if "10" in pix:
+        return 10
+    if "12" in pix:
+        return 12
+    return 8 if pix else 0
+
+
+def _scan(order: str | None) -> str:
+    if not order:
+        return ""
+    return "progressive" if order == "progressive" else "interlaced"
+
+
+def _format(fmt: dict) -> str:
+    name = fmt.get("format_name", "")
+    return ("Matroska" if name.startswith("matroska")
+            else "MP4 / QuickTime" if name.startswith("mov")
+            else fmt.get("format_long_name") or name)
+
+
+def _hdr(v: dict) -> str:
+    if any("DOVI" in sd.get("side_data_type", "") or "Dolby Vision" in sd.get("side_data_type", "")
+           for sd in v.get("side_data_list", [])):
+        return "Dolby Vision"
+    transfer = v.get("color_transfer", "")
+    if transfer == "smpte2084":
+        return "HDR10"
+    if transfer == "arib-std-b67":
+        return "HLG"
+    return "SDR"
+
+
+# ── Display ───────────────────────────────────────────────────────────────────
+
+def _rate(fps: float) -> str:
+    if not fps:
+        return "—"
+    return f"{fps:.3f}".rstrip("0").rstrip(".") + " fps"
+
+
+def _bitrate(bps: int) -> str:
+    if not bps:
+        return "—"
+    return f"{bps / 1e6:.1f} Mbps" if bps >= 1e6 else f"{bps / 1e3:.0f} kbps"
+
+
+def summarize(media: MediaSummary | None) -> dict[str, str]:
+    """Display value for every label in FIELDS ("—" when unknown)."""
+    out = dict.fromkeys(FIELDS, "—")
+    if media is None:
+        return out
+
+    v = media.video
+    if v:
+        out["Codec"]        = _CODEC_NAMES.get(v.codec, v.codec.upper() or "—")
+        if v.width and v.height:
+            out["Resolution"] = f"{v.width}×{v.height}"
+        out["Frame Rate"]   = _rate(v.fps)
+        out["Bit Rate"]     = _bitrate(v.bit_rate)
+        out["Bit Depth"]    = f"{v.bit_depth}-bit" if v.bit_depth else "—"
+        out["Colour Space"] = _PRIMARIES.get(v.primaries, "—")
+        out["HDR Format"]   = v.hdr
+        if v.scan:
+            out["Scan Type"] = v.scan.capitalize()
+
+    if out["Bit Rate"] == "—":
+        out["Bit Rate"] = _bitrate(media.bit_rate)
+    out["Format"] = media.format or "—"
+    if media.duration_s is not None:
+        out["Duration"] = friendly_duration(media.duration_s)
+    if media.size:
+        out["File Size"] = friendly_bytes(media.size)
+    out["Chapters"]  = str(len(media.chapters))
+    return out
@@ -0,0 +1,127 @@
+"""
+Codex — Pre-flight
+Rules run on a file's probe data just before it is dispatched, so files
+that are already efficient are marked SKIPPED instead of spending hours
+being re-encoded for nothing. check() returns the reason, which the
+scheduler puts in the entry's error_msg.
+
+A file is skipped when it already meets the target — same codec, fits
+the output resolution, video bitrate under the ceiling — or when the
+expected output would not be enough smaller than it. A file that meets
+the target in the wrong container is left for the remux fast path.
+Unprobed files are never skipped; there is nothing to judge them by.
+"""
+
+import os
+
+from src.core.queue_manager import QueueEntry
+from src.core.encode_settings import (
+    EncodeSettings, CODEC_TOKENS, RESOLUTIONS, MATCH_SOURCE, KEEP_VIDEO,
+)
+from src.core.media_info import VideoInfo
+from src.utils.file_utils import friendly_bytes
+
+# Bits per pixel per frame each encoder typically lands on at CRF_REF.
+# Rough, but the same order of error as any per-title guess without
+# actually encoding a sample.
+BPP = {
+    "hevc": 0.09,
+    "h264": 0.14,
+    "av1":  0.07,
+    "vp9":  0.09,
+}
+CRF_REF     = 22
+CRF_HALVING = 6         # +6 CRF ≈ half the bitrate for x264/x265/svt-av1
+HW_PENALTY  = 1.3       # hardware encoders need more bits for the same quality
+
+
+def _output_size(v: VideoInfo, settings: EncodeSettings) -> tuple[int, int]:
+    w, h = v.width, v.height
+    if settings.resolution in RESOLUTIONS:
+        mw, mh = RESOLUTIONS[settings.resolution]
+        scale = min(1.0, mw / w, mh / h)
+        w, h = int(w * scale), int(h * scale)
+    return w, h
+
+
+def expected_bitrate(v: VideoInfo, settings: EncodeSettings) -> float | None:
+    """Rough output video bits per second for these settings."""
+    if not settings.rate_control.startswith("CRF"):
+        return settings.bitrate_kbps * 1000.0
+    fps = v.fps
+    if settings.frame_rate != MATCH_SOURCE:
+        try:
+            fps = float(settings.frame_rate)
+        except ValueError:
+            pass
+    if not fps:
+        return None
+    w, h = _output_size(v, settings)
+    bpp = BPP.get(CODEC_TOKENS.get(settings.codec, ""), BPP["hevc"])
+    bpp *= 2 ** ((CRF_REF - settings.crf) / CRF_HALVING)
+    if settings.hw_accel:
+        bpp *= HW_PENALTY
+    return w * h * fps * bpp
+
+
+def _mbps(bps: float) -> str:
+    return f"{bps / 1e6:.1f} Mbps"
+
+
+def _judgeable(entry: QueueEntry, settings: EncodeSettings):
+    """(video stream, source bitrate), or None if there's nothing to go on."""
+    if settings.codec == KEEP_VIDEO or entry.media is None:
+        return None
+    v = entry.media.video
+    rate = entry.media.video_bit_rate
+    if not v or not rate or not v.width or not v.height:
+        return None
+    return v, rate
+
+
+def meets_target(entry: QueueEntry, settings: EncodeSettings) -> str | None:
+    """
+    Description of how entry already matches the target codec, resolution
+    and bitrate ceiling, or None if it doesn't. Ignores the container.
+    """
+    judged = _judgeable(entry, settings)
+    if judged is None:
+        return None
+    v, rate = judged
+    same_codec = v.codec == CODEC_TOKENS.get(settings.codec)
+    fits = _output_size(v, settings) == (v.width, v.height)
+    same_rate = settings.frame_rate == MATCH_SOURCE
+    ceiling = settings.max_bitrate_kbps * 1000.0 or expected_bitrate(v, settings)
+    if same_codec and fits and same_rate and ceiling and rate <= ceiling:
+        return (f"already {settings.codec} at {v.width}×{v.height}, "
+                f"{_mbps(rate)} (ceiling {_mbps(ceiling)})")
+    return None
+
+
+def check(entry: QueueEntry, settings: EncodeSettings) -> str | None:
+    """Why entry should be skipped under settings, or None to encode it."""
+    if not settings.skip_efficient:
+        return None
+    judged = _judgeable(entry, settings)
+    if judged is None:
+        return None
+    v, rate = judged
+
+    met = meets_target(entry, settings)
+    if met:
+        if os.path.splitext(entry.path)[1].lower() != settings.extension:
+            return None                 # only the container changes — remux
+        return f"Skipped: {met}"
+
+    expected = expected_bitrate(v, settings)
+    if expected and settings.min_savings > 0:
+        savings = 1 - expected / rate
+        if savings <= 0:
+            return (f"Skipped: output would be no smaller "
+                    f"(~{_mbps(expected)} vs {_mbps(rate)} now)")
+        if savings < settings.min_savings:
+            secs = entry.duration_s or 0
+            saved = (rate - expected) * secs / 8
+            return (f"Skipped: expected savings {savings:.0%} "
+                    f"(~{friendly_bytes(saved)}), below {settings.min_savings:.0%}")
+    return None
@@ -0,0 +1,133 @@
+"""
+Codex — Probe Cache
+SQLite store of ffprobe results keyed by (path, size, mtime_ns), so files
+that haven't changed since the last time they were queued skip ffprobe.
+Bounded by total stored bytes; the least recently used rows go first.
+Safe to share between the probe worker threads. Best-effort: database
+errors count as misses and failed writes are dropped.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from src.utils.file_utils import cache_dir
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024     # compressed JSON, ~100k typical files
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    path      TEXT    NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    data      BLOB    NOT NULL,
+    last_used REAL    NOT NULL,
+    PRIMARY KEY (path, size, mtime_ns)
+);
+CREATE INDEX IF NOT EXISTS probes_lru ON probes (last_used);
+"""
+
+
+class ProbeCache:
+
+    def __init__(self, db_path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.db_path   = db_path
+        self.max_bytes = max_bytes
+        self.hits      = 0
+        self.misses    = 0
+        self._lock = threading.Lock()
+        self._db   = sqlite3.connect(db_path, check_same_thread=False,
+                                     isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._total = self._db.execute(
+            "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM probes").fetchone()[0]
+
+    @classmethod
+    def default(cls) -> "ProbeCache | None":
+        """Cache in the user cache folder, or None if it can't be opened."""
+        try:
+            return cls(os.path.join(cache_dir(), "probe_cache.sqlite3"))
+        except (OSError, sqlite3.Error):
+            return None
+
+    # ── Lookup / store ────────────────────────────────────────────────────────
+
+    def get(self, path: str, size: int, mtime_ns: int) -> dict | None:
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT data FROM probes WHERE path=? AND size=? AND mtime_ns=?",
+                    (path, size, mtime_ns)).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE probes SET last_used=? WHERE path=? AND size=? AND mtime_ns=?",
+                        (time.time(), path, size, mtime_ns))
+            except sqlite3.Error:
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, path: str, size: int, mtime_ns: int, info: dict):
+        blob = zlib.compress(json.dumps(info, separators=(",", ":")).encode(), 6)
+        with self._lock:
+            try:
+                self._db.execute("BEGIN")
+                # A changed file leaves its old (path, …) row behind — replace it
+                old = self._db.execute(
+                    "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM probes WHERE path=?",
+                    (path,)).fetchone()[0]
+                self._db.execute("DELETE FROM probes WHERE path=?", (path,))
+                self._db.execute(
+                    "INSERT INTO probes VALUES (?, ?, ?, ?, ?)",
+                    (path, size, mtime_ns, blob, time.time()))
+                total = self._total + len(blob) - old
+                if total > self.max_bytes:
+                    total = self._evict(total)
+                self._db.execute("COMMIT")
+                self._total = total
+            except sqlite3.Error:
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+
+    def _evict(self, total: int) -> int:
+        # Drop oldest rows until we're 10% under the cap, so eviction is rare
+        target = int(self.max_bytes * 0.9)
+        doomed = []
+        for rowid, n in self._db.execute(
+                "SELECT rowid, LENGTH(data) FROM probes ORDER BY last_used"):
+            if total <= target:
+                break
+            doomed.append((rowid,))
+            total -= n
+        self._db.executemany("DELETE FROM probes WHERE rowid=?", doomed)
+        return total
+
+    # ── Stats ─────────────────────────────────────────────────────────────────
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT COUNT(*) FROM probes").fetchone()[0]
+        return {
+            "hits":     self.hits,
+            "misses":   self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "rows":     rows,
+            "bytes":    self._total,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,125 @@
+"""
+Codex — Prober
+Background FFprobe pool. Entries are submitted as they are added to the
+queue; a fixed number of worker threads run ffprobe (with a per-file
+timeout) and post a MediaSummary of the result to the UpdateBus, same as
+the encoder. An optional ProbeCache is checked first, so unchanged files
+skip ffprobe.
+"""
+
+import json
+import os
+import queue as _queue
+import subprocess
+import threading
+
+from src.core.queue_manager import QueueEntry
+from src.core.media_info import MediaSummary
+from src.core.probe_cache import ProbeCache
+from src.core.update_bus import UpdateBus
+
+FFPROBE = os.environ.get("CODEX_FFPROBE", "ffprobe")
+
+PROBE_TIMEOUT_S = 30
+
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+def default_workers(cpu_count: int | None = None) -> int:
+    # ffprobe is mostly waiting on disk/network, not CPU
+    cores = cpu_count or os.cpu_count() or 1
+    return max(2, min(cores, 8))
+
+
+def probe(path: str, timeout: float = PROBE_TIMEOUT_S) -> dict:
+    """Run ffprobe on one file. Raises RuntimeError with a short reason."""
+    try:
+        proc = subprocess.run(
+            [FFPROBE, "-v", "error", "-print_format", "json",
+             "-show_format", "-show_streams", "-show_chapters", path],
+            stdin=subprocess.DEVNULL, capture_output=True,
+            timeout=timeout, creationflags=_NO_WINDOW,
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"ffprobe timed out after {timeout:g}s")
+    except OSError as exc:
+        raise RuntimeError(f"could not run ffprobe: {exc}")
+    if proc.returncode != 0:
+        err = proc.stderr.decode(errors="replace").strip().splitlines()
+        raise RuntimeError(err[-1] if err else f"ffprobe exited with code {proc.returncode}")
+    try:
+        return json.loads(proc.stdout)
+    except ValueError:
+        raise RuntimeError("ffprobe returned invalid JSON")
+
+
+class ProbePool:
+
+    def __init__(self, bus: UpdateBus, workers: int | None = None,
+                 timeout: float = PROBE_TIMEOUT_S, cache: ProbeCache | None = None):
+        self.bus      = bus
+        self.timeout  = timeout
+        self.cache    = cache
+        self._n       = workers or default_workers()
+        self._todo:    _queue.Queue = _queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock     = threading.Lock()
+        self._pending  = 0          # submitted but not yet posted
+        self._closed   = False
+
+    # ── Submission ────────────────────────────────────────────────────────────
+
+    def submit(self, entry: QueueEntry):
+        if not self._threads:
+            for _ in range(self._n):
+                t = threading.Thread(target=self._worker, daemon=True)
+                t.start()
+                self._threads.append(t)
+        with self._lock:
+            self._pending += 1
+        self._todo.put(entry)
+
+    @property
+    def busy(self) -> bool:
+        return self._pending > 0
+
+    def close(self):
+        """Drop the probes not yet started; running ones finish on their own."""
+        self._closed = True
+        while True:
+            try:
+                self._todo.get_nowait()
+            except _queue.Empty:
+                break
+            with self._lock:
+                self._pending -= 1
+
+    def _worker(self):
+        while True:
+            entry = self._todo.get()
+            try:
+                if self._closed:
+                    continue
+                media = MediaSummary.from_probe(self._probe_cached(entry.path))
+                fields = {"media": media, "duration_s": media.duration_s}
+                if media.size and entry.size < 0:
+                    fields["size"] = media.size
+                self.bus.post(entry, **fields)
+            except RuntimeError as exc:
+                self.bus.post(entry, error_msg=f"Probe failed: {exc}")
+            finally:
+                with self._lock:
+                    self._pending -= 1
+
+    def _probe_cached(self, path: str) -> dict:
+        if self.cache is None:
+            return probe(path, self.timeout)
+        try:
+            st = os.stat(path)
+        except OSError as exc:
+            raise RuntimeError(exc.strerror or str(exc))
+        info = self.cache.get(path, st.st_size, st.st_mtime_ns)
+        if info is None:
+            info = probe(path, self.timeout)
+            self.cache.put(path, st.st_size, st.st_mtime_ns, info)
+        return info
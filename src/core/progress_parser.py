@@ -0,0 +1,82 @@
+"""
+Codex — HandBrake Progress Parser
+Incremental parser for HandBrakeCLI's console output. Feed it raw chunks as
+they arrive from the pipe; it keeps only the unfinished tail of the current
+line, so memory stays flat however long the encode runs.
+
+HandBrakeCLI rewrites one status line with carriage returns:
+    Encoding: task 1 of 2, 45.23 % (120.34 fps, avg 118.20 fps, ETA 00h03m12s)
+The part in brackets only appears once the encoder has a speed estimate.
+"""
+
+import re
+from collections import deque
+from dataclasses import dataclass
+
+_STATUS_RE = re.compile(
+    r"Encoding: task (\d+) of (\d+), (\d+(?:\.\d+)?) %"
+    r"(?: \((\d+(?:\.\d+)?) fps, avg (\d+(?:\.\d+)?) fps, "
+    r"ETA (\d+)h(\d+)m(\d+)s\))?"
+)
+_SPLIT_RE = re.compile(r"[\r\n]")
+
+MAX_CARRY = 4096        # a status line is ~80 bytes; anything longer is noise
+
+
+@dataclass
+class Progress:
+    task:     int
+    tasks:    int
+    percent:  float                 # of the current task
+    fps:      float = 0.0
+    avg_fps:  float = 0.0
+    eta_s:    int | None = None     # for the current task
+
+    @property
+    def fraction(self) -> float:
+        """Whole-job progress 0.0 – 1.0 across all passes."""
+        return min(1.0, ((self.task - 1) + self.percent / 100) / max(1, self.tasks))
+
+
+class ProgressParser:
+
+    def __init__(self, keep_lines: int = 5):
+        self._carry = ""
+        self.latest: Progress | None = None
+        self.tail: deque[str] = deque(maxlen=keep_lines)   # last log lines
+
+    def feed(self, chunk: str) -> Progress | None:
+        """
+        Consume a chunk of output. Returns the newest status seen in it, or
+        None if the chunk held no complete status line.
+        """
+        parts = _SPLIT_RE.split(self._carry + chunk)
+        self._carry = parts.pop()[-MAX_CARRY:]
+        newest = None
+        for line in parts:
+            p = self._parse(line)
+            if p:
+                newest = p
+            elif line.strip():
+                self.tail.append(line.strip())
+        if newest:
+            self.latest = newest
+        return newest
+
+    def close(self) -> Progress | None:
+        """Flush whatever is left once the stream ends."""
+        rest, self._carry = self._carry, ""
+        return self.feed(rest + "\n") if rest else None
+
+    @staticmethod
+    def _parse(line: str) -> Progress | None:
+        m = _STATUS_RE.search(line)
+        if not m:
+            return None
+        task, tasks, pct, fps, avg, h, mi, s = m.groups()
+        p = Progress(int(task), int(tasks), float(pct))
+        if fps is not None:
+            p.fps     = float(fps)
+            p.avg_fps = float(avg)
+            p.eta_s   = int(h) * 3600 + int(mi) * 60 + int(s)
+        return p
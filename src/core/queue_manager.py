@@ -2,11 +2,26 @@
 Codex — Queue Manager
 Holds the list of queued files and their encode state.
 UI components observe this; encode workers will read from it.
+Every mutation is reported to listeners as a QueueEvent describing what
+changed, so they can patch just that instead of redrawing everything.
+Running totals — counts per status, bytes and seconds of source left,
+recent throughput — are kept in QueueStats, and secondary indexes for
+filtering in QueueIndex; both are updated as each change is applied, so
+nothing has to scan the queue to summarise or search it.
 """
 
+import itertools
+import os
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Callable
+from typing import Callable, Iterable
+
+from src.core.media_info import MediaSummary
+from src.utils.file_utils import normalize_path, friendly_bytes, friendly_duration
 
 
 class FileStatus(Enum):
@@ -17,76 +32,465 @@ class FileStatus(Enum):
     SKIPPED  = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class QueueEntry:
-    path:     str
-    name:     str
-    size_str: str       # e.g. "2.1 GB"
-    duration: str       # e.g. "47m 12s"
-    status:   FileStatus = FileStatus.READY
-    progress: float      = 0.0          # 0.0 – 1.0
-    error_msg: str       = ""
-    media_info: dict     = field(default_factory=dict)
+    """
+    One queued file. Kept small — queues run to six figures — so values are
+    stored as numbers and only formatted for display, and probe data is a
+    MediaSummary rather than ffprobe's JSON (which stays in ProbeCache).
+    """
+    path:       str
+    size:       int = -1                # bytes, -1 when unknown
+    duration_s: float | None = None     # known once probed
+    media:      MediaSummary | None = None
+    status:     FileStatus = FileStatus.READY
+    progress:   float      = 0.0        # 0.0 – 1.0
+    fps:        float      = 0.0        # current encode speed
+    avg_fps:    float      = 0.0
+    eta_s:      int | None = None       # seconds left, once HandBrake estimates it
+    error_msg:  str        = ""
+    priority:   int        = 0          # higher runs sooner under Policy.PRIORITY
+    # Set while the entry is in a QueueManager, so late updates to a
+    # removed entry leave the queue's totals alone
+    queued:     bool = field(default=False, init=False, repr=False, compare=False)
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def size_str(self) -> str:
+        """e.g. "2.1 GB"."""
+        return friendly_bytes(self.size) if self.size >= 0 else "? MB"
+
+    @property
+    def duration_str(self) -> str:
+        """e.g. "47m 12s"; "?" if probing failed, "—" until it finishes."""
+        if self.duration_s is not None:
+            return friendly_duration(self.duration_s)
+        return "?" if self.error_msg and self.media is None else "—"
+
+
+class Change(Enum):
+    INSERTED = auto()   # `entries` inserted starting at `index`
+    REMOVED  = auto()   # `entries` removed; `index` is where the first one was
+    UPDATED  = auto()   # `fields` changed on `entries` (positions unchanged)
+    SELECTED = auto()   # selection moved from `previous` to `index`
+    RESET    = auto()   # anything else — listeners should redraw fully
+
+
+# Entry fields QueueStats totals up
+STAT_FIELDS = frozenset({"status", "progress", "fps", "size", "duration_s"})
+
+THROUGHPUT_WINDOW_S = 30.0
+_BUCKET_S = 1.0
+
+_PENDING = (FileStatus.READY, FileStatus.ENCODING)
+
+
+class QueueStats:
+    """
+    Aggregates over the queue, kept current in O(1) per changed entry.
+    "Left" figures cover READY and ENCODING entries, counting the unencoded
+    part of each. Throughput is source bytes and seconds encoded per wall
+    second over the last THROUGHPUT_WINDOW_S.
+    """
+
+    def __init__(self):
+        self.counts       = {s: 0 for s in FileStatus}
+        self.bytes_total  = 0
+        self.seconds_total = 0.0
+        self.bytes_left   = 0.0
+        self.seconds_left = 0.0
+        self.unknown_left = 0           # pending entries with no duration yet
+        self.fps          = 0.0         # summed over ENCODING entries
+        self.progress_sum = 0.0         # of ENCODING entries
+        self.encoding: dict[int, QueueEntry] = {}   # id → entry, start order
+        self._samples: deque[list] = deque()        # [t, bytes, seconds] per bucket
+        self._window  = [0.0, 0.0]                  # sums over _samples
+
+    def reset(self, entries: Iterable[QueueEntry]):
+        self.__init__()
+        for e in entries:
+            self._apply(e, 1)
+
+    def _apply(self, e: QueueEntry, sign: int):
+        self.counts[e.status] += sign
+        size = max(e.size, 0)
+        self.bytes_total += sign * size
+        if e.duration_s:
+            self.seconds_total += sign * e.duration_s
+        if e.status in _PENDING:
+            left = 1.0 - e.progress
+            self.bytes_left += sign * size * left
+            if e.duration_s is None:
+                self.unknown_left += sign
+            else:
+                self.seconds_left += sign * e.duration_s * left
+        if e.status == FileStatus.ENCODING:
+            self.fps          += sign * e.fps
+            self.progress_sum += sign * e.progress
+            if sign > 0:
+                self.encoding[id(e)] = e
+            else:
+                self.encoding.pop(id(e), None)
+
+    def _progressed(self, e: QueueEntry, before: float, now: float):
+        """Count an encoding entry's progress from before to e.progress."""
+        gained = e.progress - before
+        if gained <= 0:
+            return
+        b, s = gained * max(e.size, 0), gained * (e.duration_s or 0.0)
+        if self._samples and now - self._samples[-1][0] < _BUCKET_S:
+            bucket = self._samples[-1]
+            bucket[1] += b
+            bucket[2] += s
+        else:
+            self._samples.append([now, b, s])
+        self._window[0] += b
+        self._window[1] += s
+
+    def throughput(self, now: float | None = None) -> tuple[float, float]:
+        """(source bytes/s, source seconds/s) over the recent window."""
+        now = time.monotonic() if now is None else now
+        while self._samples and now - self._samples[0][0] > THROUGHPUT_WINDOW_S:
+            _, b, s = self._samples.popleft()
+            self._window[0] -= b
+            self._window[1] -= s
+        if not self._samples:
+            return 0.0, 0.0
+        span = max(now - self._samples[0][0], _BUCKET_S)
+        return max(self._window[0], 0.0) / span, max(self._window[1], 0.0) / span
+
+    def eta_s(self, now: float | None = None) -> int | None:
+        """Whole-queue time left at the recent throughput, or None."""
+        bps, sps = self.throughput(now)
+        if not self.unknown_left and sps > 0:
+            return int(max(self.seconds_left, 0.0) / sps)
+        if bps > 0:
+            return int(max(self.bytes_left, 0.0) / bps)
+        return None
+
+
+# Entry fields QueueIndex files entries under
+INDEX_FIELDS = frozenset({"path", "status", "media", "size"})
+
+# Resolution class → fewest 16:9-equivalent lines, so 1920×800 is "1080p"
+RESOLUTIONS = (("8K", 3600), ("4K", 1800), ("1440p", 1300), ("1080p", 900),
+               ("720p", 600), ("SD", 1))
+
+_STATUS, _EXT, _CODEC, _RES, _SIZE, _NAME = range(6)
+_BUCKETED = (_STATUS, _EXT, _CODEC, _RES)
+
+
+def resolution_class(entry: QueueEntry) -> str:
+    """e.g. "4K" or "1080p"; "" until the entry is probed."""
+    v = entry.media.video if entry.media else None
+    if v is None or not v.width or not v.height:
+        return ""
+    lines = max(v.height, v.width * 9 // 16)
+    return next(name for name, least in RESOLUTIONS if lines >= least)
+
+
+def _index_keys(e: QueueEntry) -> tuple:
+    base = os.path.basename(e.path)
+    v = e.media.video if e.media else None
+    return (e.status, os.path.splitext(base)[1].lower(), v.codec if v else "",
+            resolution_class(e), e.size, base.lower())
+
+
+class QueueIndex:
+    """
+    Secondary indexes over the queue: entries bucketed by status, extension,
+    video codec and resolution class, plus a size-ordered list, so a filter
+    reads a few buckets rather than testing every entry. Entries are
+    numbered on arrival; since the queue only ever appends, that number
+    order is queue order, and a result sorts back into it as plain ints.
+    The size list is re-sorted lazily, on the first size query after
+    entries come, go or change size — so adding 100k files doesn't pay for
+    an insort each.
+    """
+
+    def __init__(self):
+        self._count   = itertools.count()
+        self._number: dict[int, int]        = {}    # id(entry) → arrival number
+        self._entries: dict[int, QueueEntry] = {}   # arrival number → entry
+        self._keys:   dict[int, tuple]      = {}    # arrival number → _index_keys()
+        self._buckets = {f: {} for f in _BUCKETED}  # field → value → numbers
+        self._sizes:  list[tuple[int, int]] | None = []     # (size, number), sorted
+
+    def reset(self, entries: Iterable[QueueEntry]):
+        self.__init__()
+        for e in entries:
+            self.add(e)
+
+    def add(self, e: QueueEntry):
+        n = next(self._count)
+        keys = _index_keys(e)
+        self._number[id(e)] = n
+        self._entries[n] = e
+        self._keys[n] = keys
+        for f in _BUCKETED:
+            self._buckets[f].setdefault(keys[f], set()).add(n)
+        self._sizes = None
+
+    def discard(self, e: QueueEntry):
+        n = self._number.pop(id(e), None)
+        if n is None:
+            return
+        del self._entries[n]
+        keys = self._keys.pop(n)
+        for f in _BUCKETED:
+            self._unfile(f, keys[f], n)
+        self._sizes = None
+
+    def refresh(self, e: QueueEntry):
+        """Re-file an entry after its INDEX_FIELDS changed."""
+        n = self._number.get(id(e))
+        if n is None:
+            return
+        old, new = self._keys[n], _index_keys(e)
+        if old == new:
+            return
+        self._keys[n] = new
+        for f in _BUCKETED:
+            if old[f] != new[f]:
+                self._unfile(f, old[f], n)
+                self._buckets[f].setdefault(new[f], set()).add(n)
+        if old[_SIZE] != new[_SIZE]:
+            self._sizes = None
+
+    def _unfile(self, f: int, value, n: int):
+        bucket = self._buckets[f][value]
+        bucket.discard(n)
+        if not bucket:
+            del self._buckets[f][value]
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ── Lookup ────────────────────────────────────────────────────────────────
+
+    def select(self, statuses: Iterable[FileStatus] = (), extensions: Iterable[str] = (),
+               codecs: Iterable[str] = (), resolutions: Iterable[str] = (),
+               min_size: int | None = None, max_size: int | None = None,
+               text: str = "", by_size: bool = False) -> list[QueueEntry]:
+        """
+        Entries matching every given constraint — any of the values within
+        one — in queue order, or ascending size order if by_size. text is
+        a case-insensitive substring of the file name. Extensions are
+        lower case with the dot, codecs ffprobe names ("hevc").
+        """
+        sets = []
+        for f, wanted in zip(_BUCKETED, (statuses, extensions, codecs, resolutions)):
+            if wanted:
+                buckets = self._buckets[f]
+                found = [buckets[v] for v in wanted if v in buckets]
+                if not found:
+                    return []
+                sets.append(found[0] if len(found) == 1 else set().union(*found))
+
+        keys = self._keys
+        ranged = min_size is not None or max_size is not None
+        lo = -1 if min_size is None else min_size
+        hi = float("inf") if max_size is None else max_size
+        in_size_order = False
+        if sets:
+            sets.sort(key=len)
+            numbers = sets[0].intersection(*sets[1:])
+            if ranged:
+                numbers = [n for n in numbers if lo <= keys[n][_SIZE] <= hi]
+        elif ranged or by_size:
+            sizes = self._sorted_sizes()
+            pairs = sizes[bisect_left(sizes, (lo, -1)):bisect_right(sizes, (hi, float("inf")))]
+            numbers = [n for _, n in pairs]
+            in_size_order = True
+        else:
+            numbers = list(self._entries)       # already in arrival order
+        if text:
+            text = text.lower()
+            numbers = [n for n in numbers if text in keys[n][_NAME]]
+
+        if by_size != in_size_order:
+            numbers = (sorted(numbers, key=lambda n: (keys[n][_SIZE], n)) if by_size
+                       else sorted(numbers))
+        elif sets:
+            numbers = sorted(numbers)
+        entries = self._entries
+        return [entries[n] for n in numbers]
+
+    def _sorted_sizes(self) -> list[tuple[int, int]]:
+        if self._sizes is None:
+            self._sizes = sorted((k[_SIZE], n) for n, k in self._keys.items())
+        return self._sizes
+
+
+@dataclass(frozen=True)
+class QueueEvent:
+    kind:     Change
+    index:    int | None = None
+    previous: int | None = None
+    entries:  tuple      = ()
+    fields:   frozenset  = frozenset()
 
 
 class QueueManager:
     """
     Central state for the file queue.
     Observers (UI components) register via add_listener() and
-    are called whenever the queue changes.
+    are called with a QueueEvent whenever the queue changes.
     """
 
     def __init__(self):
-        self._entries:   list[QueueEntry] = []
-        self._listeners: list[Callable]   = []
-        self._selected:  int | None       = None
+        self._entries:   list[QueueEntry]       = []
+        self._by_path:   dict[str, QueueEntry]  = {}    # normalize_path() → entry
+        self._listeners: list[Callable]         = []
+        self._selected:  int | None             = None
+        self._batch_depth = 0
+        self._held:      list[QueueEvent]       = []
+        self.stats = QueueStats()
+        self.index = QueueIndex()
 
     # ── Listeners ─────────────────────────────────────────────────────────────
 
-    def add_listener(self, fn: Callable):
+    def add_listener(self, fn: Callable[[QueueEvent], None]):
         self._listeners.append(fn)
 
-    def _notify(self):
+    def _notify(self, kind: Change, **details):
+        event = QueueEvent(kind, **details)
+        if self._batch_depth:
+            self._held.append(event)
+            return
         for fn in self._listeners:
-            fn()
+            fn(event)
+
+    @contextmanager
+    def batch(self):
+        """
+        Group several mutations; listeners hear about them once, when the
+        outermost batch ends.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._held:
+                held, self._held = self._held, []
+                for event in _coalesce(held):
+                    for fn in self._listeners:
+                        fn(event)
+
+    def _set_selected(self, index: int | None):
+        if index != self._selected:
+            previous, self._selected = self._selected, index
+            self._notify(Change.SELECTED, index=index, previous=previous)
 
     # ── Queue operations ──────────────────────────────────────────────────────
 
-    def add(self, entry: QueueEntry):
-        # Avoid exact duplicates
-        if any(e.path == entry.path for e in self._entries):
-            return
+    def add(self, entry: QueueEntry, key: str | None = None) -> bool:
+        """
+        Append entry unless its file is already queued. key is the entry's
+        normalize_path(), if the caller has already computed it.
+        """
+        # Avoid duplicates, including the same file reached by another spelling
+        key = key or normalize_path(entry.path)
+        if key in self._by_path:
+            return False
+        self._by_path[key] = entry
         self._entries.append(entry)
+        entry.queued = True
+        self.stats._apply(entry, 1)
+        self.index.add(entry)
+        self._notify(Change.INSERTED, index=len(self._entries) - 1,
+                     entries=(entry,))
         if self._selected is None:
-            self._selected = 0
-        self._notify()
+            self._set_selected(0)
+        return True
+
+    def add_many(self, entries: Iterable[QueueEntry],
+                 keys: Iterable[str] | None = None) -> list[QueueEntry]:
+        """Add a batch with a single notification. Returns the entries added."""
+        if keys is None:
+            pairs = ((e, None) for e in entries)
+        else:
+            pairs = zip(entries, keys)
+        with self.batch():
+            return [e for e, k in pairs if self.add(e, k)]
 
     def remove(self, index: int):
         if 0 <= index < len(self._entries):
-            self._entries.pop(index)
+            entry = self._entries.pop(index)
+            self._by_path.pop(normalize_path(entry.path), None)
+            entry.queued = False
+            self.stats._apply(entry, -1)
+            self.index.discard(entry)
+            self._notify(Change.REMOVED, index=index, entries=(entry,))
             # Clamp selection
             if self._entries:
-                self._selected = min(self._selected or 0, len(self._entries) - 1)
+                self._set_selected(min(self._selected or 0, len(self._entries) - 1))
             else:
-                self._selected = None
-            self._notify()
+                self._set_selected(None)
 
     def clear(self):
+        for e in self._entries:
+            e.queued = False
         self._entries.clear()
+        self._by_path.clear()
         self._selected = None
-        self._notify()
+        self.stats.reset(())
+        self.index.reset(())
+        self._notify(Change.RESET)
 
     def clear_done(self):
+        for e in self._entries:
+            if e.status == FileStatus.DONE:
+                e.queued = False
         self._entries = [e for e in self._entries if e.status != FileStatus.DONE]
+        self._by_path = {k: e for k, e in self._by_path.items()
+                         if e.status != FileStatus.DONE}
         self._selected = 0 if self._entries else None
-        self._notify()
+        self.stats.reset(self._entries)
+        self.index.reset(self._entries)
+        self._notify(Change.RESET)
+
+    def update(self, entry: QueueEntry, **fields):
+        """Set encode-state fields (status, progress, error_msg, …) on an entry."""
+        self._set(entry, fields, time.monotonic())
+        self._notify(Change.UPDATED, entries=(entry,), fields=frozenset(fields))
+
+    def update_many(self, changes: list[tuple[QueueEntry, dict]]):
+        """Apply several update()s and notify once."""
+        names: set[str] = set()
+        now = time.monotonic()
+        for entry, fields in changes:
+            self._set(entry, fields, now)
+            names.update(fields)
+        if changes:
+            self._notify(Change.UPDATED, entries=tuple(e for e, _ in changes),
+                         fields=frozenset(names))
+
+    def _set(self, entry: QueueEntry, fields: dict, now: float):
+        if not entry.queued or (STAT_FIELDS.isdisjoint(fields)
+                                and INDEX_FIELDS.isdisjoint(fields)):
+            for name, value in fields.items():
+                setattr(entry, name, value)
+            return
+        was_encoding, before = entry.status == FileStatus.ENCODING, entry.progress
+        self.stats._apply(entry, -1)
+        for name, value in fields.items():
+            setattr(entry, name, value)
+        self.stats._apply(entry, 1)
+        if was_encoding and entry.status == FileStatus.ENCODING:
+            self.stats._progressed(entry, before, now)
+        if not INDEX_FIELDS.isdisjoint(fields):
+            self.index.refresh(entry)
 
     # ── Selection ─────────────────────────────────────────────────────────────
 
     def select(self, index: int):
         if 0 <= index < len(self._entries):
-            self._selected = index
-            self._notify()
+            self._set_selected(index)
 
     @property
     def selected_index(self) -> int | None:
@@ -107,8 +511,47 @@ class QueueManager:
     def __len__(self):
         return len(self._entries)
 
+    def find(self, path: str) -> QueueEntry | None:
+        return self._by_path.get(normalize_path(path))
+
+    def index_of(self, entry: QueueEntry) -> int | None:
+        """Position of entry in the queue — a scan, for occasional use."""
+        return next((i for i, e in enumerate(self._entries) if e is entry), None)
+
     def ready_count(self) -> int:
-        return sum(1 for e in self._entries if e.status == FileStatus.READY)
+        return self.stats.counts[FileStatus.READY]
 
     def done_count(self) -> int:
-        return sum(1 for e in self._entries if e.status == FileStatus.DONE)
+        return self.stats.counts[FileStatus.DONE]
+
+
+def _coalesce(events: list[QueueEvent]) -> list[QueueEvent]:
+    """Merge the events held during a batch into as few as possible."""
+    if len(events) == 1:
+        return events
+    kinds = {e.kind for e in events}
+
+    if kinds == {Change.UPDATED}:
+        entries, fields = [], set()
+        for e in events:
+            entries.extend(e.entries)
+            fields |= e.fields
+        return [QueueEvent(Change.UPDATED, entries=tuple(entries),
+                           fields=frozenset(fields))]
+
+    if kinds <= {Change.INSERTED, Change.SELECTED}:
+        inserts = [e for e in events if e.kind == Change.INSERTED]
+        selects = [e for e in events if e.kind == Change.SELECTED]
+        if all(b.index == a.index + len(a.entries)
+               for a, b in zip(inserts, inserts[1:])):
+            out = []
+            if inserts:
+                out.append(QueueEvent(
+                    Change.INSERTED, index=inserts[0].index,
+                    entries=tuple(x for e in inserts for x in e.entries)))
+            if selects and selects[-1].index != selects[0].previous:
+                out.append(QueueEvent(Change.SELECTED, index=selects[-1].index,
+                                      previous=selects[0].previous))
+            return out
+
+    return [QueueEvent(Change.RESET)]
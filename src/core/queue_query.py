@@ -0,0 +1,175 @@
+"""
+Codex — Queue Query
+Filtering and sorting for the queue list. parse() reads what is typed in
+the filter bar — plain words match the file name, and key:value terms
+narrow by the queue's indexes:
+
+    status:error            status:ready,encoding
+    codec:hevc res:4k size>20GB
+    ext:mkv sort:-size      (newest first: sort:-added)
+
+run() answers a Query from QueueManager.index and returns a QueueView —
+the matching entries themselves, not copies, in the order asked for.
+"""
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+
+from src.core.queue_manager import QueueManager, QueueEntry, FileStatus, RESOLUTIONS
+
+# Entry fields that can change which entries a query matches, or their order
+QUERY_FIELDS = frozenset({"path", "status", "media", "size", "duration_s"})
+
+
+class SortBy(Enum):
+    ADDED    = "added"
+    NAME     = "name"
+    SIZE     = "size"
+    DURATION = "duration"
+    STATUS   = "status"
+
+
+_SORT_KEYS = {
+    SortBy.NAME:     lambda e: e.name.lower(),
+    SortBy.DURATION: lambda e: -1.0 if e.duration_s is None else e.duration_s,
+    SortBy.STATUS:   lambda e: e.status.value,
+}
+
+CODEC_ALIASES = {"h265": "hevc", "x265": "hevc", "h.265": "hevc",
+                 "avc": "h264", "x264": "h264", "h.264": "h264"}
+RES_ALIASES = {name.lower(): name for name, _ in RESOLUTIONS} | {
+    "2160p": "4K", "uhd": "4K", "4320p": "8K", "2k": "1440p", "fhd": "1080p",
+    "hd": "720p"}
+
+_SIZE_RE = re.compile(r"size(<=|>=|<|>)(\d+(?:\.\d+)?)([kmgt]?)i?b?", re.I)
+_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+
+@dataclass(frozen=True)
+class Query:
+    statuses:    frozenset = frozenset()    # FileStatus; empty matches any
+    extensions:  frozenset = frozenset()    # ".mkv"
+    codecs:      frozenset = frozenset()    # ffprobe names, "hevc"
+    resolutions: frozenset = frozenset()    # RESOLUTIONS names, "4K"
+    min_size:    int | None = None          # bytes, inclusive
+    max_size:    int | None = None
+    text:        str = ""                   # file name substring, any case
+    sort:        SortBy = SortBy.ADDED
+    descending:  bool = False
+
+    @property
+    def filtered(self) -> bool:
+        return bool(self.statuses or self.extensions or self.codecs or self.resolutions
+                    or self.text or self.min_size is not None or self.max_size is not None)
+
+    @property
+    def trivial(self) -> bool:
+        """Matches the whole queue in queue order."""
+        return not self.filtered and self.sort == SortBy.ADDED and not self.descending
+
+
+class QueueView:
+    """
+    Entries matching a query, in its order. Holds references to the queue's
+    own entries, so their state is always current; which entries are in it
+    is fixed until the query is run again.
+    """
+
+    __slots__ = ("query", "total", "_entries")
+
+    def __init__(self, query: Query, entries: list[QueueEntry], total: int):
+        self.query    = query
+        self.total    = total           # queue length when it was run
+        self._entries = entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getitem__(self, i):
+        return self._entries[i]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+
+def run(queue: QueueManager, query: Query) -> QueueView:
+    if query.trivial:
+        return QueueView(query, queue.entries, len(queue))
+    entries = queue.index.select(
+        query.statuses, query.extensions, query.codecs, query.resolutions,
+        query.min_size, query.max_size, query.text,
+        by_size=query.sort == SortBy.SIZE,
+    )
+    key = _SORT_KEYS.get(query.sort)
+    if key is not None:
+        entries.sort(key=key)
+    if query.descending:
+        entries.reverse()
+    return QueueView(query, entries, len(queue))
+
+
+# ── Parsing ───────────────────────────────────────────────────────────────────
+
+def parse(text: str) -> Query:
+    """Query for filter-bar text. Raises ValueError naming a bad term."""
+    fields: dict = {"statuses": set(), "extensions": set(), "codecs": set(),
+                    "resolutions": set()}
+    words = []
+    for term in text.split():
+        m = _SIZE_RE.fullmatch(term)
+        if m:
+            op, number, unit = m.groups()
+            limit = int(float(number) * _UNITS[unit.lower()])
+            if op[0] == ">":
+                fields["min_size"] = limit + (op == ">")
+            else:
+                fields["max_size"] = limit - (op == "<")
+            continue
+        key, sep, value = term.partition(":")
+        key = key.lower()
+        if not sep or key not in _TERMS:
+            words.append(term)
+            continue
+        if not value:
+            raise ValueError(f"{key}: needs a value")
+        if key == "sort":
+            fields["descending"] = value.startswith("-")
+            try:
+                fields["sort"] = SortBy(value.lstrip("-").lower())
+            except ValueError:
+                raise ValueError(f"can't sort by {value.lstrip('-')!r} — try "
+                                 + ", ".join(s.value for s in SortBy)) from None
+            continue
+        name, convert = _TERMS[key]
+        for v in value.lower().split(","):
+            fields[name].add(convert(v))
+    for name in ("statuses", "extensions", "codecs", "resolutions"):
+        fields[name] = frozenset(fields[name])
+    return Query(text=" ".join(words), **fields)
+
+
+def _status(value: str) -> FileStatus:
+    try:
+        return FileStatus[value.upper()]
+    except KeyError:
+        raise ValueError(f"no status {value!r} — try "
+                         + ", ".join(s.name.lower() for s in FileStatus)) from None
+
+
+def _resolution(value: str) -> str:
+    try:
+        return RES_ALIASES[value]
+    except KeyError:
+        raise ValueError(f"no resolution {value!r} — try "
+                         + ", ".join(name for name, _ in RESOLUTIONS)) from None
+
+
+_TERMS = {
+    "status": ("statuses",    _status),
+    "is":     ("statuses",    _status),
+    "ext":    ("extensions",  lambda v: "." + v.lstrip(".")),
+    "codec":  ("codecs",      lambda v: CODEC_ALIASES.get(v, v)),
+    "res":    ("resolutions", _resolution),
+    "sort":   (None,          None),
+}
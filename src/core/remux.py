@@ -0,0 +1,149 @@
+"""
+Codex — Remux
+Fast path for jobs that only need a new container: ffmpeg copies the
+streams as they are (-c copy) instead of HandBrakeCLI re-encoding them,
+which takes seconds instead of hours.
+
+plan() decides, from the probe data and EncodeSettings, whether a job can
+be a remux and returns the ffmpeg arguments for it. That is the case when
+the video codec is "Keep Original", or when pre-flight finds the source
+already at the target and only the container differs. Audio the target
+container can't carry is converted (cheap next to video); text subtitles
+are converted to the container's own format and picture-based ones are
+dropped where they can't go.
+"""
+
+import os
+import re
+from collections import deque
+
+from src.core.encode_settings import EncodeSettings, KEEP_VIDEO
+from src.core.progress_parser import Progress
+from src.core import preflight
+
+# Target container → codecs it can carry as they are (None: anything)
+VIDEO_OK = {
+    "MKV":  None,
+    "MP4":  {"h264", "hevc", "av1", "vp9", "mpeg4", "mpeg2video"},
+    "WebM": {"vp8", "vp9", "av1"},
+}
+AUDIO_OK = {
+    "MKV":  None,
+    "MP4":  {"aac", "ac3", "eac3", "mp3", "alac", "flac", "opus"},
+    "WebM": {"opus", "vorbis"},
+}
+# Target container → (audio fallback encoder, text subtitle format)
+CONVERT = {
+    "MKV":  (None,      None),
+    "MP4":  ("aac",     "mov_text"),
+    "WebM": ("libopus", "webvtt"),
+}
+TEXT_SUBS = {"subrip", "ass", "ssa", "mov_text", "webvtt", "text"}
+
+
+def wanted(entry, settings: EncodeSettings) -> bool:
+    """True when settings leave the video stream as it is."""
+    if settings.codec == KEEP_VIDEO:
+        return True
+    # Already at the target; only the wrapper is wrong
+    ext = os.path.splitext(entry.path)[1].lower()
+    return (settings.skip_efficient and ext != settings.extension
+            and preflight.meets_target(entry, settings) is not None)
+
+
+def plan(entry, settings: EncodeSettings) -> list[str] | None:
+    """
+    ffmpeg arguments (everything except input and output) for a stream-copy
+    remux, or None when the job needs an encode. Raises ValueError when
+    the video is to be kept but can't be: the source was never probed, or
+    the target container can't hold it.
+    """
+    media = entry.media
+    if media is None:
+        if settings.codec == KEEP_VIDEO:
+            raise ValueError("Not probed — can't keep a video stream of unknown "
+                             "codec; re-add the file or choose an output codec")
+        return None
+    if not wanted(entry, settings):
+        return None
+    container = settings.container if settings.container in VIDEO_OK else "MKV"
+    v = media.video
+    if v is None:
+        raise ValueError("No video stream to keep")
+    ok = VIDEO_OK[container]
+    if ok is not None and v.codec not in ok:
+        raise ValueError(f"{container} can't hold {v.codec or 'this'} video "
+                         f"without re-encoding — choose MKV or an output codec")
+
+    args = ["-map_metadata", "0", "-map_chapters", "0"]
+    if ok is None:
+        args += ["-map", "0", "-c", "copy"]
+    else:
+        audio_enc, sub_fmt = CONVERT[container]
+        args += ["-map", f"0:{v.index}", "-c", "copy"]
+        out = 1
+        for s in media.streams:
+            if s.kind == "audio":
+                args += ["-map", f"0:{s.index}"]
+                if s.codec not in AUDIO_OK[container]:
+                    args += [f"-c:{out}", audio_enc]
+                out += 1
+            elif s.kind == "subtitle" and s.codec in TEXT_SUBS:
+                args += ["-map", f"0:{s.index}", f"-c:{out}", sub_fmt]
+                out += 1
+        if container == "MP4":
+            args += ["-movflags", "+faststart"]
+    return args + ["-progress", "pipe:1", "-nostats", "-v", "error", "-y"]
+
+
+class RemuxProgress:
+    """
+    Reads ffmpeg's -progress key=value blocks; same interface as
+    ProgressParser, so a job can run either tool the same way.
+    """
+
+    _KV_RE = re.compile(r"^(\w+)=(.*)$")
+
+    def __init__(self, duration: float | None, keep_lines: int = 5):
+        self.duration = duration
+        self._carry   = ""
+        self._fps     = 0.0
+        self._done    = 0.0         # source seconds written so far
+        self.latest:  Progress | None = None
+        self.tail:    deque[str] = deque(maxlen=keep_lines)
+
+    def feed(self, chunk: str) -> Progress | None:
+        lines = (self._carry + chunk).split("\n")
+        self._carry = lines.pop()[-4096:]
+        newest = None
+        for line in lines:
+            m = self._KV_RE.match(line.strip())
+            if not m:
+                if line.strip():
+                    self.tail.append(line.strip())
+                continue
+            key, value = m.groups()
+            if key == "fps":
+                self._fps = _float(value)
+            elif key == "out_time_us" and self.duration:
+                self._done = min(self.duration, _float(value) / 1e6)
+                newest = Progress(1, 1, 100 * self._done / self.duration,
+                                  self._fps, self._fps)
+            elif key == "speed" and newest is not None:
+                speed = _float(value.rstrip("x"))       # e.g. "48.3x"
+                if speed > 0:
+                    newest.eta_s = int((self.duration - self._done) / speed)
+        if newest:
+            self.latest = newest
+        return newest
+
+    def close(self) -> Progress | None:
+        rest, self._carry = self._carry, ""
+        return self.feed(rest + "\n") if rest else None
+
+
+def _float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
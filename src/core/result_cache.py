@@ -0,0 +1,184 @@
+"""
+Codex — Result Cache
+Remembers which output file each (input content, encode settings) pair
+produced, so re-queuing the same source under the same settings — after a
+restart, or as a duplicate copy on another share — links or copies the
+earlier output instead of encoding it again.
+
+Inputs are identified by a fingerprint, not their path: the file size plus
+a hash of evenly spaced blocks read through mmap, which costs a few
+megabytes of I/O however large the file is. Outputs are not copied into
+the cache — a row just points at the output; if that file is gone or has
+changed since, the row is dropped and the source is encoded as usual.
+
+Bounded by row count and age (CODEX_RESULT_CACHE_ENTRIES and
+CODEX_RESULT_CACHE_DAYS); the least recently used rows go first. Like
+ProbeCache it is thread-safe and best-effort.
+"""
+
+import hashlib
+import mmap
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from src.utils.file_utils import cache_dir
+
+SAMPLE_BLOCKS = 32
+SAMPLE_BYTES  = 64 * 1024
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get("CODEX_RESULT_CACHE_ENTRIES", 50_000))
+DEFAULT_MAX_AGE_S   = float(os.environ.get("CODEX_RESULT_CACHE_DAYS", 90)) * 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key       TEXT    PRIMARY KEY,
+    output    TEXT    NOT NULL,
+    size      INTEGER NOT NULL,
+    mtime_ns  INTEGER NOT NULL,
+    created   REAL    NOT NULL,
+    last_used REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_lru ON results (last_used);
+"""
+
+
+def fingerprint(path: str) -> str:
+    """Size plus sampled-block hash of a file's content."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        h = hashlib.blake2b(str(size).encode(), digest_size=20)
+        if size <= SAMPLE_BLOCKS * SAMPLE_BYTES:
+            h.update(f.read())
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                last = size - SAMPLE_BYTES
+                for i in range(SAMPLE_BLOCKS):
+                    off = last * i // (SAMPLE_BLOCKS - 1)
+                    h.update(m[off:off + SAMPLE_BYTES])
+    return h.hexdigest()
+
+
+def result_key(path: str, recipe: str) -> str:
+    """Cache key for encoding path's content with recipe (normalized settings)."""
+    return hashlib.blake2b(f"{fingerprint(path)}\0{recipe}".encode(),
+                           digest_size=20).hexdigest()
+
+
+def materialize(src: str, dst: str):
+    """Make dst a copy of src — a hard link where possible, else a real copy."""
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return
+    tmp = dst + ".partial"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+class ResultCache:
+
+    def __init__(self, db_path: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_age_s: float = DEFAULT_MAX_AGE_S):
+        self.db_path     = db_path
+        self.max_entries = max_entries
+        self.max_age_s   = max_age_s
+        self.hits        = 0
+        self.misses      = 0
+        self._lock = threading.Lock()
+        self._db   = sqlite3.connect(db_path, check_same_thread=False,
+                                     isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def default(cls) -> "ResultCache | None":
+        """Cache in the user cache folder, or None if it can't be opened."""
+        try:
+            return cls(os.path.join(cache_dir(), "result_cache.sqlite3"))
+        except (OSError, sqlite3.Error):
+            return None
+
+    # ── Lookup / store ────────────────────────────────────────────────────────
+
+    def get(self, key: str) -> str | None:
+        """Path of a still-valid output for key, or None."""
+        with self._lock:
+            try:
+                row = self._db.execute(
+                    "SELECT output, size, mtime_ns, created FROM results WHERE key=?",
+                    (key,)).fetchone()
+                if row is not None and not self._valid(*row):
+                    self._db.execute("DELETE FROM results WHERE key=?", (key,))
+                    row = None
+                if row is not None:
+                    self._db.execute("UPDATE results SET last_used=? WHERE key=?",
+                                     (time.time(), key))
+            except sqlite3.Error:
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def _valid(self, output: str, size: int, mtime_ns: int, created: float) -> bool:
+        if time.time() - created > self.max_age_s:
+            return False
+        try:
+            st = os.stat(output)
+        except OSError:
+            return False
+        return st.st_size == size and st.st_mtime_ns == mtime_ns
+
+    def put(self, key: str, output: str):
+        try:
+            st = os.stat(output)
+        except OSError:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                self._db.execute("BEGIN")
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, output, st.st_size, st.st_mtime_ns, now, now))
+                self._evict(now)
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+
+    def _evict(self, now: float):
+        self._db.execute("DELETE FROM results WHERE created < ?",
+                         (now - self.max_age_s,))
+        count = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        if count > self.max_entries:
+            # Down to 90% of the cap, so eviction is rare
+            self._db.execute(
+                "DELETE FROM results WHERE rowid IN "
+                "(SELECT rowid FROM results ORDER BY last_used LIMIT ?)",
+                (count - int(self.max_entries * 0.9),))
+
+    # ── Stats ─────────────────────────────────────────────────────────────────
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits":     self.hits,
+            "misses":   self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "rows":     rows,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
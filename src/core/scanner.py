@@ -0,0 +1,122 @@
+"""
+Codex — Folder Scanner
+Walks a folder tree on a worker thread with os.scandir and streams the
+supported files it finds back in batches, so huge shares start filling the
+queue straight away instead of freezing the UI until the walk finishes.
+The owner calls poll() on the UI thread to move batches into the queue.
+"""
+
+import os
+import queue as _queue
+import threading
+import time
+
+from src.core.queue_manager import QueueManager, QueueEntry
+from src.utils.file_utils import is_supported, normalize_path
+
+BATCH_SIZE = 500
+BATCH_MAX_AGE_S = 0.25          # flush smaller batches this often
+
+
+class FolderScanner:
+
+    def __init__(self, queue: QueueManager, root: str):
+        self.queue = queue
+        self.root  = root
+        # Live counts — written by the worker, read by the UI
+        self.dirs_scanned = 0
+        self.files_seen   = 0
+        self.matched      = 0
+        self.added        = 0
+        self._finished    = False
+        self._batches: _queue.SimpleQueue = _queue.SimpleQueue()
+        self._cancel  = threading.Event()
+        self._done    = threading.Event()
+        self._thread  = threading.Thread(target=self._walk, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    # ── Worker ────────────────────────────────────────────────────────────────
+
+    def _walk(self):
+        batch: list[tuple[QueueEntry, str]] = []
+        flushed = time.monotonic()
+        # Resolve the root once; below it we never follow directory symlinks,
+        # so child paths are already canonical unless they are links themselves
+        stack = [(self.root, os.path.realpath(self.root))]
+        try:
+            while stack and not self._cancel.is_set():
+                shown, real = stack.pop()
+                try:
+                    with os.scandir(shown) as it:
+                        items = sorted(it, key=lambda d: d.name)
+                except OSError:
+                    continue
+                self.dirs_scanned += 1
+                subdirs = []
+                for d in items:
+                    try:
+                        if d.is_dir(follow_symlinks=False):
+                            subdirs.append((d.path, os.path.join(real, d.name)))
+                            continue
+                    except OSError:
+                        continue
+                    self.files_seen += 1
+                    if not is_supported(d.name):
+                        continue
+                    try:
+                        size = d.stat().st_size      # cached by scandir on Windows
+                    except OSError:
+                        continue
+                    key = (normalize_path(d.path) if d.is_symlink()
+                           else normalize_path(os.path.join(real, d.name), resolved=True))
+                    batch.append((QueueEntry(d.path, size), key))
+                    self.matched += 1
+
+                    if (len(batch) >= BATCH_SIZE
+                            or time.monotonic() - flushed > BATCH_MAX_AGE_S):
+                        self._batches.put(batch)
+                        batch, flushed = [], time.monotonic()
+                # Same visiting order as os.walk: subfolders in name order
+                stack.extend(reversed(subdirs))
+        finally:
+            if batch:
+                self._batches.put(batch)
+            self._done.set()
+
+    # ── Main-thread pump ──────────────────────────────────────────────────────
+
+    def poll(self, max_batches: int = 4) -> list[QueueEntry]:
+        """
+        Move up to max_batches pending batches into the queue (one notify per
+        call). Returns the entries actually added.
+        """
+        # Check before draining so a final batch posted just before _done
+        # is never left behind
+        finished = self._done.is_set()
+        pending = []
+        for _ in range(max_batches):
+            try:
+                pending.extend(self._batches.get_nowait())
+            except _queue.Empty:
+                break
+        self._finished = finished and self._batches.empty()
+        if not pending or self.cancelled:
+            return []
+        entries, keys = zip(*pending)
+        added = self.queue.add_many(entries, keys)
+        self.added += len(added)
+        return added
+
+    @property
+    def finished(self) -> bool:
+        """True once the walk has ended and every batch has been polled."""
+        return self._finished
@@ -0,0 +1,138 @@
+"""
+Codex — Scheduling
+Which READY entry the encoder takes next. A ReadyQueue keeps READY entries
+in a heap ordered by the chosen Policy and follows the queue's events to
+stay current, so picking the next job is O(log n) instead of a scan of the
+whole list on every dispatch.
+
+Entries leave the heap lazily: a removed, re-keyed or no longer READY
+entry stays in the heap until it reaches the top, where pop() discards it.
+"""
+
+import heapq
+import itertools
+from enum import Enum
+
+from src.core.queue_manager import QueueManager, QueueEntry, QueueEvent, Change, FileStatus
+
+BITS_PER_PIXEL = 0.1        # typical source compression, for unprobed files
+
+# Entry fields that can change an entry's place in the order
+KEY_FIELDS = frozenset({"status", "media", "size", "priority"})
+
+
+class Policy(Enum):
+    FIFO     = "Queue order"
+    SHORTEST = "Shortest first"     # lowest mean turnaround
+    LONGEST  = "Longest first"      # shortest total run on a parallel pool
+    PRIORITY = "Priority"           # manual priority, then queue order
+
+
+def estimated_cost(entry: QueueEntry) -> float:
+    """Rough encode work in pixel-frames; scaled file size when unprobed."""
+    v = entry.media.video if entry.media else None
+    if v and entry.duration_s and v.width and v.height:
+        return entry.duration_s * (v.fps or 24.0) * v.width * v.height
+    return max(entry.size, 0) * 8 / BITS_PER_PIXEL
+
+
+class ReadyQueue:
+
+    def __init__(self, queue: QueueManager, policy: Policy = Policy.FIFO):
+        self.queue  = queue
+        self.policy = policy
+        self._heap:  list[tuple] = []
+        self._keys:  dict[int, tuple] = {}      # id(entry) → key while in the heap
+        self._order: dict[int, int]   = {}      # id(entry) → arrival number
+        self._count = itertools.count()
+        self._rebuild()
+        queue.add_listener(self._on_queue_change)
+
+    def set_policy(self, policy: Policy):
+        if policy != self.policy:
+            self.policy = policy
+            self._rebuild()
+
+    def pop(self, skip=None) -> QueueEntry | None:
+        """Best READY entry, or None. skip(entry) → True leaves it in place."""
+        held = []
+        try:
+            while self._heap:
+                item = heapq.heappop(self._heap)
+                key, _, entry = item
+                if self._keys.get(id(entry)) != key or entry.status != FileStatus.READY:
+                    continue                    # stale
+                if skip and skip(entry):
+                    held.append(item)
+                    continue
+                del self._keys[id(entry)]
+                return entry
+            return None
+        finally:
+            for item in held:
+                heapq.heappush(self._heap, item)
+
+    def __len__(self):
+        return len(self._keys)
+
+    # ── Keeping up with the queue ─────────────────────────────────────────────
+
+    def _key(self, entry: QueueEntry) -> tuple:
+        order = self._order.setdefault(id(entry), next(self._count))
+        if self.policy == Policy.SHORTEST:
+            return (estimated_cost(entry), order)
+        if self.policy == Policy.LONGEST:
+            return (-estimated_cost(entry), order)
+        if self.policy == Policy.PRIORITY:
+            return (-entry.priority, order)
+        return (order,)
+
+    def _push(self, entry: QueueEntry):
+        key = self._key(entry)
+        if self._keys.get(id(entry)) != key:
+            self._keys[id(entry)] = key
+            heapq.heappush(self._heap, (key, next(self._count), entry))
+            if len(self._heap) > 2 * len(self._keys) + 64:
+                self._compact()
+
+    def _compact(self):
+        """Drop stale items once they outnumber the live ones."""
+        live, seen = [], set()
+        for item in self._heap:
+            key, _, e = item
+            if self._keys.get(id(e)) == key and id(e) not in seen:
+                seen.add(id(e))
+                live.append(item)
+        heapq.heapify(live)
+        self._heap = live
+
+    def _rebuild(self):
+        self._keys.clear()
+        self._order = {id(e): i for i, e in enumerate(self.queue.entries)}
+        self._count = itertools.count(len(self._order))
+        self._heap = []
+        for e in self.queue.entries:
+            if e.status == FileStatus.READY:
+                key = self._key(e)
+                self._keys[id(e)] = key
+                self._heap.append((key, next(self._count), e))
+        heapq.heapify(self._heap)
+
+    def _on_queue_change(self, event: QueueEvent):
+        if event.kind == Change.INSERTED:
+            for e in event.entries:
+                if e.status == FileStatus.READY:
+                    self._push(e)
+        elif event.kind == Change.REMOVED:
+            for e in event.entries:
+                self._keys.pop(id(e), None)
+                self._order.pop(id(e), None)
+        elif event.kind == Change.UPDATED:
+            if event.fields & KEY_FIELDS:
+                for e in event.entries:
+                    if e.status == FileStatus.READY:
+                        self._push(e)
+                    else:
+                        self._keys.pop(id(e), None)
+        elif event.kind == Change.RESET:
+            self._rebuild()
@@ -0,0 +1,121 @@
+"""
+Codex — Segments
+Support for segmented encoding: one long source is cut into segments that
+HandBrakeCLI encodes in parallel (--start-at / --stop-at), which ffmpeg
+then joins without re-encoding.
+
+Cuts are placed on chapter marks where the source has them — those sit on
+scene changes — and evenly otherwise. Segments are written into a
+workspace folder next to the output; a finished segment is a checkpoint,
+so a cancelled, failed or crashed job picks up where it stopped as long as
+the source and settings are unchanged.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+FFMPEG = os.environ.get("CODEX_FFMPEG", "ffmpeg")
+
+SEGMENT_S = 600             # target segment length
+JOIN_TIMEOUT_S = 3600
+
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+
+def plan(duration: float | None, chapters: tuple[float, ...],
+         target_s: float = SEGMENT_S) -> list[tuple[float, float | None]]:
+    """
+    (start, length) of each segment; the last one's length is None, meaning
+    "to the end". chapters are chapter start times. Sources shorter than two
+    segments get a single segment.
+    """
+    if not duration or duration < 2 * target_s:
+        return [(0.0, None)]
+
+    cuts = _cuts(list(chapters), duration, target_s)
+    bounds = cuts + [duration]
+    if max(b - a for a, b in zip(bounds, bounds[1:])) > 2 * target_s:
+        # Too few chapters to keep segments near the target — cut evenly
+        n = round(duration / target_s)
+        cuts = _cuts([duration * i / n for i in range(n)], duration, target_s)
+    return [(a, b - a) for a, b in zip(cuts, cuts[1:])] + [(cuts[-1], None)]
+
+
+def _cuts(marks: list[float], duration: float, target_s: float) -> list[float]:
+    cuts = [0.0]
+    for t in sorted(marks):
+        # Keep the tail at least half a segment long
+        if t - cuts[-1] >= target_s * 0.9 and duration - t >= target_s / 2:
+            cuts.append(t)
+    return cuts
+
+
+class Workspace:
+    """
+    Folder holding the segments of one output while it is being encoded.
+    A manifest records what the segments were cut from; if it no longer
+    matches, old segments are discarded instead of resumed.
+    """
+
+    def __init__(self, output: str):
+        self.output = output
+        self.path   = output + ".parts"
+        self._ext   = os.path.splitext(output)[1]
+
+    def open(self, source: str, args: list[str],
+             segments: list[tuple[float, float | None]]) -> list[int]:
+        """Prepare the folder. Returns indices of segments already encoded."""
+        st = os.stat(source)
+        manifest = json.dumps({
+            "source": source, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "args": args, "segments": segments,
+        }, sort_keys=True)
+        manifest_path = os.path.join(self.path, "manifest.json")
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                if f.read() != manifest:
+                    raise ValueError
+        except (OSError, ValueError):
+            self.remove()
+            os.makedirs(self.path)
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                f.write(manifest)
+        return [i for i in range(len(segments)) if os.path.exists(self.part(i))]
+
+    def part(self, i: int) -> str:
+        return os.path.join(self.path, f"seg_{i:04d}{self._ext}")
+
+    def partial(self, i: int) -> str:
+        return os.path.join(self.path, f"seg_{i:04d}.partial{self._ext}")
+
+    def commit(self, i: int):
+        """Mark segment i finished — from now on it survives restarts."""
+        os.replace(self.partial(i), self.part(i))
+
+    def join(self, count: int, timeout: float = JOIN_TIMEOUT_S):
+        """Concatenate segments 0..count-1 into the output. Raises RuntimeError."""
+        listing = os.path.join(self.path, "concat.txt")
+        with open(listing, "w", encoding="utf-8") as f:
+            for i in range(count):
+                f.write("file '" + self.part(i).replace("'", "'\\''") + "'\n")
+        tmp = os.path.join(self.path, "joined" + self._ext)
+        try:
+            proc = subprocess.run(
+                [FFMPEG, "-v", "error", "-y", "-f", "concat", "-safe", "0",
+                 "-i", listing, "-map", "0", "-c", "copy", tmp],
+                stdin=subprocess.DEVNULL, capture_output=True,
+                timeout=timeout, creationflags=_NO_WINDOW,
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"ffmpeg timed out after {timeout:g}s")
+        except OSError as exc:
+            raise RuntimeError(f"could not run ffmpeg: {exc}")
+        if proc.returncode != 0:
+            err = proc.stderr.decode(errors="replace").strip().splitlines()
+            raise RuntimeError(err[-1] if err else f"ffmpeg exited with code {proc.returncode}")
+        os.replace(tmp, self.output)
+
+    def remove(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,71 @@
+"""
+Codex — Update Bus
+The one way worker threads (encoders, probes) hand results to the UI thread.
+
+Workers post() field changes for an entry and call() callbacks; both are
+cheap and thread-safe. The UI thread drain()s the bus on a fixed timer:
+field changes posted since the last drain are merged per entry (a hundred
+progress ticks become one) and applied to the QueueManager as a single
+update, then callbacks run until the frame budget is spent. Whatever is
+left waits for the next frame, so a burst never stalls the event loop.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from src.core.queue_manager import QueueManager, QueueEntry
+
+FRAME_MS        = 50        # drain rate cap (20 Hz)
+FRAME_BUDGET_S  = 0.012     # time callbacks may take per frame
+
+
+class UpdateBus:
+
+    def __init__(self, queue: QueueManager):
+        self.queue = queue
+        self._lock = threading.Lock()
+        self._fields: dict[int, tuple[QueueEntry, dict]] = {}   # id(entry) → …
+        self._calls:  deque[tuple[Callable, tuple]] = deque()
+        self.posted   = 0       # field updates received
+        self.applied  = 0       # entries updated after merging
+
+    # ── Worker side ───────────────────────────────────────────────────────────
+
+    def post(self, entry: QueueEntry, **fields):
+        with self._lock:
+            self.posted += 1
+            slot = self._fields.get(id(entry))
+            if slot is None:
+                self._fields[id(entry)] = (entry, fields)
+            else:
+                slot[1].update(fields)
+
+    def call(self, fn: Callable, *args):
+        """Run fn(*args) on the UI thread, after pending field updates."""
+        with self._lock:
+            self._calls.append((fn, args))
+
+    # ── UI side ───────────────────────────────────────────────────────────────
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._fields or self._calls)
+
+    def drain(self, budget_s: float = FRAME_BUDGET_S) -> bool:
+        """Apply one frame's worth of updates. Returns True if work remains."""
+        deadline = time.perf_counter() + budget_s
+        with self._lock:
+            fields, self._fields = self._fields, {}
+        if fields:
+            self.applied += len(fields)
+            self.queue.update_many(list(fields.values()))
+
+        while time.perf_counter() < deadline:
+            with self._lock:
+                if not self._calls:
+                    break
+                fn, args = self._calls.popleft()
+            fn(*args)
+        return self.pending
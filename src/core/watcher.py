@@ -0,0 +1,407 @@
+"""
+Codex — Folder Watcher
+Watches a folder tree for new media files — dropped in by capture machines,
+copied over a share — and hands each one to the queue once it has finished
+arriving, i.e. its size and mtime have not changed for settle_s.
+
+On Linux the worker thread waits on inotify, so only the folders that
+change are looked at. Without inotify (other platforms, the watch limit
+reached, or polling asked for because remote writes to a network mount
+never raise inotify events) it polls: one stat per folder per pass, and
+only folders whose mtime moved are listed again. Either way the files
+already there when the watch begins are listed once, up front, and are
+not queued. The owner calls poll() on the UI thread to move settled files
+into the queue, as with FolderScanner.
+
+Codex's own files are never picked up, or every output written next to
+its source would be encoded again: segment workspaces and .partial files
+are not looked at, and, given the encode settings, neither are the
+outputs planned for what is queued, or anything in an output folder
+inside the watched tree.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import queue as _queue
+import re
+import select
+import stat
+import struct
+import sys
+import threading
+import time
+
+from src.core.encode_settings import EncodeSettings
+from src.core.encoder import planned_path
+from src.core.queue_manager import QueueManager, QueueEntry, FileStatus
+from src.utils.file_utils import is_supported, normalize_path
+
+SETTLE_S = 5.0              # unchanged this long → the copy has finished
+POLL_S   = 2.0              # folder pass interval when polling
+CHECK_S  = 1.0              # arriving files are re-stat'ed this often
+RECENT_S = 3600.0           # folders changed this recently get their files stat'ed up front
+# Coarse mtimes (FAT, many SMB servers) can hide a second change made in the
+# same 2 s tick, so a folder listed that soon after its mtime is listed again
+MTIME_SLACK_NS = 2_000_000_000
+
+# inotify(7)
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_Q_OVERFLOW  = 0x00004000
+IN_IGNORED     = 0x00008000
+IN_ONLYDIR     = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR       = 0x40000000
+IN_NONBLOCK    = 0o4000
+IN_CLOEXEC     = 0o2000000
+
+_ADDED   = IN_CREATE | IN_MOVED_TO
+_REMOVED = IN_DELETE | IN_MOVED_FROM
+_MASK    = _ADDED | _REMOVED | IN_ONLYDIR | IN_DONT_FOLLOW
+_EVENT   = struct.Struct("iIII")        # wd, mask, cookie, len; then the name
+
+_UNSEEN = (-1, -1, 0.0)                 # (size, mtime_ns, since) before the first stat
+
+# Entries whose planned output may be on disk
+_WRITTEN  = (FileStatus.ENCODING, FileStatus.DONE, FileStatus.ERROR)
+_NUMBERED = re.compile(r"_\d+$")        # output_path's collision suffix
+
+
+def _wanted_file(name: str) -> bool:
+    # seg_0003.partial.mkv, out.mkv.partial: still being written by Codex
+    return is_supported(name) and ".partial" not in name
+
+
+def _wanted_dir(name: str) -> bool:
+    return not name.endswith(".parts")  # a segmented encode's workspace
+
+
+class _Folder:
+    """What the watcher knows of one folder: supported files and subfolders."""
+
+    __slots__ = ("mtime_ns", "files", "subdirs")
+
+    def __init__(self, mtime_ns: int, files: set[str], subdirs: set[str]):
+        self.mtime_ns = mtime_ns
+        self.files    = files
+        self.subdirs  = subdirs
+
+
+class FolderWatcher:
+
+    def __init__(self, queue: QueueManager, root: str, settle_s: float = SETTLE_S,
+                 poll_s: float = POLL_S, use_inotify: bool = True, settings=None):
+        self.queue    = queue
+        self.root     = os.path.abspath(root)
+        self.settings = settings            # () -> EncodeSettings, read in poll()
+        self.settle_s = settle_s
+        self.poll_s   = poll_s
+        # Live state — written by the worker, read by the UI
+        self.mode     = "starting"          # then "inotify" or "polling"
+        self.note     = ""                  # why polling, when inotify was wanted
+        self.added    = 0
+        self.ready    = False               # the existing tree has been listed
+        self._use_inotify = use_inotify
+        self._fd: int | None = None
+        self._wds:     dict[int, str]     = {}      # inotify watch → folder
+        self._folders: dict[str, _Folder] = {}
+        self._arriving: dict[str, tuple[int, int, float]] = {}
+        self._batches: _queue.SimpleQueue = _queue.SimpleQueue()
+        self._stop    = threading.Event()
+        self._thread  = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+
+    @property
+    def closed(self) -> bool:
+        return self._stop.is_set()
+
+    @property
+    def folders(self) -> int:
+        return len(self._folders)
+
+    @property
+    def arriving(self) -> int:
+        """New files still being written."""
+        return len(self._arriving)
+
+    # ── Worker ────────────────────────────────────────────────────────────────
+
+    def _run(self):
+        if self._use_inotify:
+            self._fd = _inotify_init()
+            if self._fd is None:
+                self.note = "inotify unavailable"
+        try:
+            self._add_tree(self.root, new=False)
+            self.mode  = "inotify" if self._fd is not None else "polling"
+            self.ready = True
+            tick = min(CHECK_S, self.poll_s)
+            next_pass = time.monotonic() + self.poll_s
+            while not self._stop.is_set():
+                if self._fd is not None:
+                    if select.select([self._fd], [], [], tick)[0]:
+                        self._read_events()
+                else:
+                    self._stop.wait(tick)
+                    if time.monotonic() >= next_pass:
+                        self._pass()
+                        next_pass = time.monotonic() + self.poll_s
+                self._check()
+        finally:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def _list(self, path: str) -> _Folder | None:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                items = list(it)
+        except OSError:
+            return None
+        files, subdirs = set(), set()
+        for d in items:
+            try:
+                if d.is_dir(follow_symlinks=False):
+                    if _wanted_dir(d.name):
+                        subdirs.add(d.name)
+                    continue
+            except OSError:
+                continue
+            if _wanted_file(d.name):
+                files.add(d.name)
+        if time.time_ns() - mtime < MTIME_SLACK_NS:
+            mtime = -1
+        return _Folder(mtime, files, subdirs)
+
+    def _add_tree(self, top: str, new: bool):
+        """
+        List top and every folder below it. Files in a new tree are all
+        arriving; in the one there at the start only those still being
+        written are.
+        """
+        stack = [top]
+        while stack and not self._stop.is_set():
+            path = stack.pop()
+            self._watch(path)                   # before listing, so nothing slips between
+            folder = self._list(path)
+            if folder is None:
+                continue
+            self._folders[path] = folder
+            if new:
+                for name in folder.files:
+                    self._seen(os.path.join(path, name))
+            elif folder.files and self._recent(folder):
+                self._still_written(path, folder)
+            stack.extend(os.path.join(path, name) for name in folder.subdirs)
+
+    def _recent(self, folder: _Folder) -> bool:
+        return folder.mtime_ns < 0 or time.time_ns() - folder.mtime_ns < RECENT_S * 1e9
+
+    def _still_written(self, path: str, folder: _Folder):
+        # A file mid-copy when the watch starts has an mtime of about now
+        cutoff = time.time_ns() - int(self.settle_s * 1e9)
+        for name in folder.files:
+            full = os.path.join(path, name)
+            try:
+                if os.stat(full).st_mtime_ns >= cutoff:
+                    self._seen(full)
+            except OSError:
+                continue
+
+    def _drop_tree(self, top: str):
+        stack = [top]
+        while stack:
+            path = stack.pop()
+            folder = self._folders.pop(path, None)
+            if folder is not None:
+                stack.extend(os.path.join(path, name) for name in folder.subdirs)
+        # Their inotify watches go when the kernel sends IN_IGNORED
+        prefix = top + os.sep
+        for path in [p for p in self._arriving if p.startswith(prefix)]:
+            del self._arriving[path]
+
+    def _seen(self, path: str):
+        self._arriving.setdefault(path, _UNSEEN)
+
+    def _check(self):
+        """Queue the arriving files that have settled."""
+        now, settled = time.monotonic(), []
+        for path, (size, mtime, since) in list(self._arriving.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self._arriving[path]
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                del self._arriving[path]
+            elif (st.st_size, st.st_mtime_ns) != (size, mtime):
+                self._arriving[path] = (st.st_size, st.st_mtime_ns, now)
+            elif size > 0 and now - since >= self.settle_s:
+                # Empty files are usually placeholders for a copy yet to start
+                del self._arriving[path]
+                settled.append((QueueEntry(path, size), normalize_path(path)))
+        if settled:
+            self._batches.put(settled)
+
+    # ── Polling ───────────────────────────────────────────────────────────────
+
+    def _pass(self):
+        """One stat per folder; list again only those whose mtime moved."""
+        for path in list(self._folders):
+            if self._stop.is_set():
+                return
+            folder = self._folders.get(path)
+            if folder is None:
+                continue                        # dropped with its parent
+            try:
+                if os.stat(path).st_mtime_ns == folder.mtime_ns:
+                    continue
+            except OSError:
+                continue                        # the parent's listing will drop it
+            fresh = self._list(path)
+            if fresh is None:
+                continue
+            for name in fresh.files - folder.files:
+                self._seen(os.path.join(path, name))
+            for name in folder.files - fresh.files:
+                self._arriving.pop(os.path.join(path, name), None)
+            for name in folder.subdirs - fresh.subdirs:
+                self._drop_tree(os.path.join(path, name))
+            new_dirs = fresh.subdirs - folder.subdirs
+            folder.mtime_ns, folder.files, folder.subdirs = (
+                fresh.mtime_ns, fresh.files, fresh.subdirs)
+            for name in new_dirs:
+                self._add_tree(os.path.join(path, name), new=True)
+
+    # ── inotify ───────────────────────────────────────────────────────────────
+
+    def _watch(self, path: str):
+        if self._fd is None:
+            return
+        wd = _libc().inotify_add_watch(self._fd, os.fsencode(path), _MASK)
+        if wd >= 0:
+            self._wds[wd] = path
+            return
+        err = ctypes.get_errno()
+        if err in (errno.ENOSPC, errno.ENOMEM):
+            # Folders watched so far were listed, and polling compares
+            # against those listings, so nothing that arrived is lost
+            os.close(self._fd)
+            self._fd = None
+            self._wds.clear()
+            self.mode = "polling"
+            self.note = ("inotify watch limit reached — raise "
+                         "fs.inotify.max_user_watches to avoid polling")
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                self._pass()                    # events were lost; catch up by mtime
+                continue
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                continue
+            parent = self._wds.get(wd)
+            folder = self._folders.get(parent) if parent else None
+            if folder is None:
+                continue
+            path = os.path.join(parent, name)
+            if mask & IN_ISDIR:
+                if not _wanted_dir(name):
+                    continue
+                if mask & _ADDED and name not in folder.subdirs:
+                    folder.subdirs.add(name)
+                    self._add_tree(path, new=True)
+                elif mask & _REMOVED:
+                    folder.subdirs.discard(name)
+                    self._drop_tree(path)
+            elif _wanted_file(name):
+                if mask & _ADDED:
+                    folder.files.add(name)
+                    self._seen(path)
+                elif mask & _REMOVED:
+                    folder.files.discard(name)
+                    self._arriving.pop(path, None)
+
+    # ── Main-thread pump ──────────────────────────────────────────────────────
+
+    def poll(self) -> list[QueueEntry]:
+        """Move settled files into the queue. Returns the entries added."""
+        pending = []
+        while True:
+            try:
+                pending.extend(self._batches.get_nowait())
+            except _queue.Empty:
+                break
+        if self.settings is not None and pending:
+            ours = self._outputs(self.settings())
+            pending = [(e, key) for e, key in pending if not ours(e.path)]
+        if not pending or self.closed:
+            return []
+        entries, keys = zip(*pending)
+        added = self.queue.add_many(entries, keys)
+        self.added += len(added)
+        return added
+
+    def _outputs(self, settings: EncodeSettings):
+        """Predicate for paths Codex writes with settings, given what is queued."""
+        def norm(path: str) -> str:
+            return normalize_path(os.path.abspath(path), resolved=True)
+
+        inside = ""
+        if settings.output_folder:
+            folder = norm(settings.output_folder)
+            if folder.startswith(norm(self.root) + os.sep):
+                inside = folder + os.sep        # all of it is ours
+        planned = {norm(planned_path(e, settings))
+                   for e in self.queue.index.select(statuses=_WRITTEN)}
+
+        def ours(path: str) -> bool:
+            path = norm(path)
+            if inside and path.startswith(inside):
+                return True
+            root, ext = os.path.splitext(path)
+            return path in planned or _NUMBERED.sub("", root) + ext in planned
+        return ours
+
+
+# ── libc ──────────────────────────────────────────────────────────────────────
+
+_LIBC = None
+
+
+def _libc():
+    global _LIBC
+    if _LIBC is None:
+        _LIBC = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _LIBC.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+    return _LIBC
+
+
+def _inotify_init() -> int | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        fd = _libc().inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    return fd if fd >= 0 else None
@@ -0,0 +1,259 @@
+"""
+Codex — Headless batch mode
+Runs the same QueueManager and encode engine as the GUI, with no Tk or
+customtkinter imports, for encode servers without a display:
+
+    python main.py --headless jobs.json
+    python main.py --headless /mnt/media/incoming --jobs 6
+    python main.py --headless /mnt/media/incoming --serve 0.0.0.0:7717
+    python main.py --headless --watch /mnt/capture
+
+Sources may be files, folders (scanned recursively) or a jobs file:
+
+    {"settings": {"codec": "H.265 / HEVC", "crf": 20, "container": "MP4"},
+     "files": ["/mnt/a.mkv", "/mnt/b.mkv"]}
+
+Settings keys are the EncodeSettings field names. Progress goes to stdout
+as one JSON object per line; the exit code is 0 only if every job finished.
+With --serve the jobs run on farm workers (main.py --worker) instead of
+here; see src/core/farm.py. With --watch it keeps running until
+interrupted, queueing and encoding each new file that lands in the
+watched folders once it has finished copying; see src/core/watcher.py.
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import time
+
+from src.core.queue_manager import (
+    QueueManager, QueueEntry, QueueEvent, Change, FileStatus,
+)
+from src.core.encode_settings import EncodeSettings
+from src.core.encoder import EncodeScheduler
+from src.core.farm import FarmCoordinator
+from src.core.scheduling import Policy
+from src.core.prober import ProbePool
+from src.core.probe_cache import ProbeCache
+from src.core.scanner import FolderScanner
+from src.core.update_bus import UpdateBus, FRAME_MS
+from src.core.watcher import FolderWatcher, SETTLE_S
+from src.utils.file_utils import is_supported, file_size
+
+
+def _emit(event: str, **fields):
+    fields = {"event": event, "t": round(time.time(), 3), **fields}
+    sys.stdout.write(json.dumps(fields, ensure_ascii=False) + "\n")
+    sys.stdout.flush()
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(
+        prog="main.py --headless",
+        description="Encode files with HandBrakeCLI without the GUI.",
+    )
+    ap.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("sources", nargs="*",
+                    help="media files, folders, or a .json jobs file")
+    ap.add_argument("--jobs", type=int, default=None,
+                    help="parallel HandBrakeCLI processes (default: tuned automatically)")
+    ap.add_argument("--output", default=None,
+                    help="output folder (default: next to each source)")
+    ap.add_argument("--order", choices=[p.name.lower() for p in Policy], default=None,
+                    help="which file to encode next (default: fifo, i.e. queue order)")
+    ap.add_argument("--no-skip", action="store_true",
+                    help="encode every file, even ones already at the target")
+    ap.add_argument("--no-reuse", action="store_true",
+                    help="re-encode even when an identical input was encoded before")
+    ap.add_argument("--serve", metavar="ADDRESS", default=None,
+                    help="hand the jobs to farm workers connecting to HOST:PORT "
+                         "or a Unix socket path, instead of encoding here")
+    ap.add_argument("--watch", metavar="FOLDER", action="append", default=[],
+                    help="keep running and encode new files that arrive in FOLDER "
+                         "(files already there are left alone; repeatable)")
+    ap.add_argument("--settle", type=float, default=SETTLE_S,
+                    help="seconds a new file's size must hold still before it is "
+                         "queued (default: %(default)s)")
+    ap.add_argument("--watch-poll", action="store_true",
+                    help="poll watched folders instead of using inotify — for "
+                         "network mounts written to by other machines")
+    ap.add_argument("--interval", type=float, default=1.0,
+                    help="seconds between progress lines per job (default: 1)")
+    args = ap.parse_args(argv)
+    if not args.sources and not args.watch:
+        ap.error("give at least one source or --watch folder")
+    return args
+
+
+def _load_jobs(path: str, settings: dict) -> list[str]:
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    if isinstance(spec, list):
+        return spec
+    settings.update(spec.get("settings", {}))
+    return spec.get("files", [])
+
+
+def _collect(queue: QueueManager, sources: list[str], settings: dict):
+    files = []
+    for src in sources:
+        if src.lower().endswith(".json") and os.path.isfile(src):
+            files += _load_jobs(src, settings)
+        elif os.path.isdir(src):
+            scanner = FolderScanner(queue, src)
+            scanner.start()
+            while not scanner.finished:
+                scanner.poll(max_batches=64)
+                time.sleep(0.01)
+        else:
+            files.append(src)
+    queue.add_many(QueueEntry(p, file_size(p)) for p in files if is_supported(p))
+
+
+def _pump(bus: UpdateBus, busy):
+    """
+    Drain the bus at frame rate while busy(), then until it is empty: a
+    worker posts its last update before it stops counting as busy, so that
+    update can land between a drain and the check that ends the loop.
+    """
+    while busy():
+        bus.drain()
+        time.sleep(FRAME_MS / 1000)
+    while bus.drain():
+        pass
+
+
+class _Reporter:
+    """Turns queue events into JSON lines, throttling progress per job."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._last:   dict[int, float]      = {}
+        self._status: dict[int, FileStatus] = {}
+
+    def __call__(self, event: QueueEvent):
+        if event.kind != Change.UPDATED:
+            return
+        now = time.monotonic()
+        for e in event.entries:
+            # A coalesced update lists every entry under the union of fields
+            if "status" in event.fields and self._status.get(id(e)) != e.status:
+                self._status[id(e)] = e.status
+                if e.status == FileStatus.ENCODING:
+                    _emit("start", path=e.path)
+                elif e.status == FileStatus.DONE:
+                    _emit("done", path=e.path, **({"note": e.error_msg} if e.error_msg else {}))
+                elif e.status == FileStatus.ERROR:
+                    _emit("error", path=e.path, error=e.error_msg)
+                elif e.status == FileStatus.SKIPPED:
+                    _emit("skipped", path=e.path, reason=e.error_msg)
+            if (e.status == FileStatus.ENCODING and "progress" in event.fields
+                    and now - self._last.get(id(e), 0) >= self.interval):
+                self._last[id(e)] = now
+                _emit("progress", path=e.path, progress=round(e.progress, 4),
+                      fps=e.fps, eta_s=e.eta_s)
+
+
+def run(argv: list[str]) -> int:
+    args = _parse_args(argv)
+    started = time.monotonic()
+
+    queue = QueueManager()
+    fields: dict = {}
+    _collect(queue, args.sources, fields)
+    if args.output:
+        fields["output_folder"] = args.output
+    if args.order:
+        fields["order"] = Policy[args.order.upper()].value
+    if args.no_skip:
+        fields["skip_efficient"] = False
+    if args.no_reuse:
+        fields["reuse_results"] = False
+    known = {f.name for f in dataclasses.fields(EncodeSettings)}
+    unknown = set(fields) - known
+    if unknown:
+        print(f"unknown settings: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    settings = EncodeSettings(**fields)
+
+    _emit("queued", count=len(queue))
+    if not len(queue) and not args.watch:
+        return 1
+
+    bus = UpdateBus(queue)
+    # Durations and chapters feed the tuner and segmented mode
+    cache  = ProbeCache.default()
+    prober = ProbePool(bus, cache=cache)
+    for e in queue.entries:
+        if e.media is None:
+            prober.submit(e)
+    _pump(bus, lambda: prober.busy)
+    _emit("probed", count=len(queue),
+          failed=sum(1 for e in queue.entries if e.media is None),
+          **({"cache": cache.stats()} if cache else {}))
+
+    if args.serve:
+        try:
+            scheduler = FarmCoordinator(queue, bus, args.serve, log=_emit)
+        except (OSError, ValueError) as exc:
+            print(f"can't listen on {args.serve}: {exc}", file=sys.stderr)
+            return 2
+        _emit("config", serve=scheduler.address, settings=dataclasses.asdict(settings))
+    else:
+        scheduler = EncodeScheduler(queue, bus, max_jobs=args.jobs)
+        _emit("config", jobs=scheduler.max_jobs, threads=scheduler.threads,
+              auto=scheduler.tuner is not None, settings=dataclasses.asdict(settings))
+    queue.add_listener(_Reporter(args.interval))
+
+    watchers = [FolderWatcher(queue, folder, settle_s=args.settle,
+                              use_inotify=not args.watch_poll, settings=lambda: settings)
+                for folder in args.watch]
+    for w in watchers:
+        w.start()
+    scheduler.start(settings)
+    jobs, announced, arrived = scheduler.max_jobs, set(), False
+    try:
+        while scheduler.running or watchers:
+            bus.drain()
+            if scheduler.tuner and scheduler.max_jobs != jobs:
+                jobs = scheduler.max_jobs
+                _emit("tune", jobs=jobs, threads=scheduler.threads,
+                      throughput=round(scheduler.tuner.throughput, 2))
+            for w in watchers:
+                if w.ready and w not in announced:
+                    announced.add(w)
+                    _emit("watching", path=w.root, mode=w.mode, folders=w.folders,
+                          **({"note": w.note} if w.note else {}))
+                for e in w.poll():
+                    _emit("found", path=e.path, size=e.size)
+                    prober.submit(e)
+                    arrived = True
+            # New files start once probed, so pre-flight can judge them
+            if arrived and not prober.busy:
+                arrived = False
+                while bus.drain():      # the last probe's result, posted as busy cleared
+                    pass
+                scheduler.start()
+            time.sleep(FRAME_MS / 1000)
+        while bus.drain():
+            pass
+    except KeyboardInterrupt:
+        # A watch only ever ends this way; between jobs it's a clean stop
+        if scheduler.running or not watchers:
+            scheduler.cancel()
+            _pump(bus, lambda: scheduler.running)
+            _emit("cancelled")
+            return 130
+    finally:
+        for w in watchers:
+            w.close()
+        if args.serve:
+            scheduler.close()
+
+    counts = {s.name.lower(): 0 for s in FileStatus}
+    for e in queue.entries:
+        counts[e.status.name.lower()] += 1
+    _emit("summary", elapsed_s=round(time.monotonic() - started, 1), **counts)
+    return 0 if counts["done"] + counts["skipped"] == len(queue) else 1
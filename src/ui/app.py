@@ -1,16 +1,17 @@
 """
 Codex — App Shell
+Pages are imported and constructed on first navigation, so launch only
+pays for the page that is actually shown.
 """
 
+import importlib
 import customtkinter as ctk
 from src.utils import theme as T
+from src.utils import startup_profile
 from src.ui.sidebar import Sidebar
 from src.ui.topbar  import Topbar
-from src.ui.pages.convert   import ConvertPage
-from src.ui.pages.inspector import InspectorPage
-from src.ui.pages.presets   import PresetsPage
-from src.ui.pages.settings  import SettingsPage
 from src.core.queue_manager import QueueManager
+from src.core.journal import QueueJournal
 
 
 class CodexApp(ctk.CTk):
@@ -28,6 +29,7 @@ class CodexApp(ctk.CTk):
 
         self._build()
         self._navigate("convert")
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def _build(self):
         self.grid_rowconfigure(0, weight=1)
@@ -51,19 +53,42 @@ class CodexApp(ctk.CTk):
         self._page_container.grid_rowconfigure(0, weight=1)
         self._page_container.grid_columnconfigure(0, weight=1)
 
-        # Shared queue — injected into ConvertPage
+        # Shared queue — injected into ConvertPage. The journal brings back
+        # whatever was queued when the app last exited (or crashed).
         self._queue = QueueManager()
+        try:
+            self._journal = QueueJournal.restore(self._queue)
+        except OSError:
+            self._journal = None
 
-        self._pages: dict[str, object] = {
-            "convert":   ConvertPage(self._page_container, self._topbar, self._queue),
-            "inspector": InspectorPage(self._page_container, self._topbar),
-            "presets":   PresetsPage(self._page_container,  self._topbar),
-            "settings":  SettingsPage(self._page_container, self._topbar),
+        # key → (module, class, extra constructor args)
+        self._page_specs: dict[str, tuple] = {
+            "convert":   ("src.ui.pages.convert",   "ConvertPage",   (self._queue,)),
+            "inspector": ("src.ui.pages.inspector", "InspectorPage", ()),
+            "presets":   ("src.ui.pages.presets",   "PresetsPage",   ()),
+            "settings":  ("src.ui.pages.settings",  "SettingsPage",  ()),
         }
+        self._pages: dict[str, object] = {}
+
+    def _on_close(self):
         for page in self._pages.values():
+            page.shutdown()
+        if self._journal:
+            self._journal.close()
+        self.destroy()
+
+    def _page(self, key: str):
+        page = self._pages.get(key)
+        if page is None and key in self._page_specs:
+            module, cls_name, args = self._page_specs[key]
+            cls = getattr(importlib.import_module(module), cls_name)
+            page = cls(self._page_container, self._topbar, *args)
             page.grid(row=0, column=0, sticky="nsew")
+            self._pages[key] = page
+        return page
 
     def _navigate(self, key: str):
-        page = self._pages.get(key)
+        page = self._page(key)
         if page:
             page.show()
+            startup_profile.mark(f"{key} page shown")
@@ -29,3 +29,6 @@ class BasePage(ctk.CTkFrame):
 
     def get_topbar(self) -> tuple:
         return ("Page", "", [])
+
+    def shutdown(self):
+        """Called by the app shell before the window closes."""
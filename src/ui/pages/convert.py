@@ -6,22 +6,43 @@ import customtkinter as ctk
 from src.ui.pages.base import BasePage
 from src.utils import theme as T
 from src.core.queue_manager import QueueManager
+from src.core.encoder import EncodeScheduler
+from src.core.prober import ProbePool
+from src.core.probe_cache import ProbeCache
+from src.core.update_bus import UpdateBus, FRAME_MS
 from src.ui.widgets.file_queue_panel import FileQueuePanel
 from src.ui.widgets.detail_panel     import DetailPanel
+from src.ui.widgets.progress_footer  import ProgressFooter
 
 
 class ConvertPage(BasePage):
 
     def __init__(self, master, topbar, queue: QueueManager, **kwargs):
         super().__init__(master, topbar, **kwargs)
-        self._queue = queue
+        self._queue     = queue
+        self._bus       = UpdateBus(queue)
+        self._scheduler = EncodeScheduler(queue, self._bus)
+        self._prober    = ProbePool(self._bus, cache=ProbeCache.default())
+        self._polling   = False
+        self._autostart = False     # watched files arrived; start once probed
+        # Entries restored from the journal still need their probe data
+        for entry in queue.entries:
+            if entry.media is None:
+                self._prober.submit(entry)
+        if self._prober.busy:
+            self._ensure_polling()
 
     def build(self):
         self.grid_rowconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=0)
         self.grid_columnconfigure(0, weight=0)
         self.grid_columnconfigure(1, weight=1)
 
-        self._file_panel = FileQueuePanel(self, self._queue)
+        self._file_panel = FileQueuePanel(
+            self, self._queue, self._prober, on_added=self._ensure_polling,
+            on_watched=self._watched,
+            settings=lambda: self._detail_panel.encode_settings(),
+        )
         self._file_panel.grid(row=0, column=0, sticky="nsew")
 
         ctk.CTkFrame(self, width=1, fg_color=T.BORDER2, corner_radius=0).grid(
@@ -31,6 +52,12 @@ class ConvertPage(BasePage):
         self._detail_panel = DetailPanel(self, self._queue)
         self._detail_panel.grid(row=0, column=1, sticky="nsew")
 
+        self._footer = ProgressFooter(
+            self, self._queue,
+            on_pause=self._toggle_pause, on_cancel=self._cancel_queue,
+        )
+        self._footer.grid(row=1, column=0, columnspan=2, sticky="ew")
+
         self._add_btn = ctk.CTkButton(
             self._topbar.btn_container,
             text="＋  Add Files",
@@ -55,5 +82,69 @@ class ConvertPage(BasePage):
         return ("Convert", "— batch re-encode media files",
                 [self._add_btn, self._start_btn])
 
+    # ── Encoding ──────────────────────────────────────────────────────────────
+
     def _start_queue(self):
-        pass
+        self._scheduler.start(self._detail_panel.encode_settings())
+        self._footer.set_paused(False)
+        self._ensure_polling()
+
+    def _watched(self, added):
+        self._autostart = True
+        self._ensure_polling()
+
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.after(FRAME_MS, self._poll)
+
+    def _poll(self):
+        # Fixed-rate pump: worker updates reach Tk at most once per frame
+        self._bus.drain()
+        self._footer.set_tuning(self._tuning_text() or self._cache_text())
+        # busy before pending: a probe posts its result before it stops being busy
+        if self._autostart and not self._prober.busy and not self._bus.pending:
+            self._autostart = False
+            if not self._scheduler.paused:      # resume() picks them up anyway
+                self._start_queue()
+        if self._prober.busy or self._bus.pending or self._scheduler.running:
+            self.after(FRAME_MS, self._poll)
+        else:
+            self._polling = False
+
+    def _tuning_text(self) -> str:
+        s = self._scheduler
+        if not s.tuner or not s.running:
+            return ""
+        text = f"{s.max_jobs} jobs × {s.threads} threads"
+        if s.tuner.throughput:
+            text += f"  ·  {s.tuner.throughput:.0f}× real time"
+        return text if s.tuner.settled else text + "  ·  tuning"
+
+    def _cache_text(self) -> str:
+        cache = self._prober.cache
+        if not cache or not cache.hits + cache.misses:
+            return ""
+        return (f"Probe cache  ·  {cache.hits:,} hits  ·  {cache.misses:,} misses"
+                f"  ·  {cache.hit_rate:.0%}")
+
+    def shutdown(self):
+        """Stop encodes and probes before the window closes, so no tool outlives it."""
+        if self._built:
+            self._file_panel.shutdown()
+        self._prober.close()
+        self._scheduler.shutdown()
+        self._bus.drain()               # the journal records them as READY again
+
+    def _toggle_pause(self):
+        if not self._scheduler.running:
+            return
+        if self._scheduler.paused:
+            self._scheduler.resume()
+        else:
+            self._scheduler.pause()
+        self._footer.set_paused(self._scheduler.paused)
+
+    def _cancel_queue(self):
+        self._scheduler.cancel()
+        self._footer.set_paused(False)
@@ -5,8 +5,12 @@ Tabs: Media Info | Encode Settings | Tracks | Output
 """
 
 import customtkinter as ctk
+import tkinter.filedialog as fd
 from src.utils import theme as T
-from src.core.queue_manager import QueueManager
+from src.core.queue_manager import QueueManager, QueueEvent, Change
+from src.core.encode_settings import EncodeSettings, KEEP_VIDEO
+from src.core.scheduling import Policy
+from src.core.media_info import summarize
 from src.ui.widgets.tooltip import Tooltip
 
 TABS     = ["Media Info", "Encode Settings", "Tracks", "Output"]
@@ -20,6 +24,8 @@ class DetailPanel(ctk.CTkFrame):
         self.queue = queue
         self._tab_frames: dict[str, ctk.CTkScrollableFrame] = {}
         self._tab_btns:   dict[str, ctk.CTkButton]          = {}
+        self._info_values: dict[str, ctk.CTkLabel]          = {}
+        self._shown_info: tuple | None = None
 
         self.grid_rowconfigure(0, weight=0)   # tab bar
         self.grid_rowconfigure(1, weight=0)   # divider
@@ -162,11 +168,13 @@ class DetailPanel(ctk.CTkFrame):
         ).grid(row=0, column=0, sticky="w")
         Tooltip(lbl_frame, tip).grid(row=0, column=1, padx=(5, 0), sticky="w")
 
-        ctk.CTkLabel(
+        value_lbl = ctk.CTkLabel(
             cell, text=value,
             font=ctk.CTkFont(size=12, family="Courier New"),
             text_color=T.TEXT, anchor="w",
-        ).grid(row=1, column=0, sticky="w", pady=(3, 0))
+        )
+        value_lbl.grid(row=1, column=0, sticky="w", pady=(3, 0))
+        return value_lbl
 
     def _setting_row(self, parent, grid_row: int,
                      label: str, tip: str, control):
@@ -218,19 +226,62 @@ class DetailPanel(ctk.CTkFrame):
             sw.select()
         return sw
 
-    def _on_queue_change(self):
-        pass
+    def _on_queue_change(self, event: QueueEvent):
+        # Only the selected entry's probe data is shown here
+        if event.kind == Change.INSERTED:
+            return
+        if event.kind == Change.UPDATED and not event.fields & {"media", "error_msg"}:
+            return
+        entry = self.queue.selected
+        key = (id(entry), id(entry.media), entry.error_msg) if entry else None
+        if key == self._shown_info:
+            return
+        self._shown_info = key
+
+        if entry is None:
+            self._media_hint.configure(text="Select a file from the queue to inspect it")
+        elif entry.media is None:
+            state = entry.error_msg or "probing…"
+            self._media_hint.configure(text=f"{entry.name}  —  {state}")
+        elif entry.error_msg:
+            self._media_hint.configure(text=f"{entry.name}  —  {entry.error_msg}")
+        else:
+            self._media_hint.configure(text=entry.name)
+        values = summarize(entry.media if entry else None)
+        for label, widget in self._info_values.items():
+            widget.configure(text=values[label])
+
+    def encode_settings(self) -> EncodeSettings:
+        """Snapshot of the Encode Settings and Output tabs."""
+        return EncodeSettings(
+            codec=self._codec_opt.get(),
+            preset=self._preset_opt.get(),
+            rate_control=self._rate_opt.get(),
+            crf=int(self._crf_slider.get()),
+            hw_accel=bool(self._hw_toggle.get()),
+            resolution=self._res_opt.get(),
+            frame_rate=self._fps_opt.get(),
+            output_folder=self._output_folder,
+            container=self._container_opt.get(),
+            naming=self._naming_opt.get(),
+            overwrite=bool(self._overwrite_toggle.get()),
+            segmented=bool(self._segment_toggle.get()),
+            skip_efficient=bool(self._skip_toggle.get()),
+            order=self._order_opt.get(),
+            reuse_results=bool(self._reuse_toggle.get()),
+        )
 
     # ── Media Info ────────────────────────────────────────────────────────────
 
     def _build_media_info(self, parent):
         parent.grid_columnconfigure(0, weight=1)
 
-        ctk.CTkLabel(
+        self._media_hint = ctk.CTkLabel(
             parent,
             text="Select a file from the queue to inspect it",
             font=ctk.CTkFont(size=13), text_color=T.TEXT3,
-        ).grid(row=0, column=0, pady=(40, 16))
+        )
+        self._media_hint.grid(row=0, column=0, pady=(40, 16))
 
         vbody = self._card(parent, "VIDEO STREAM", grid_row=1, first=False)
         vbody.grid_columnconfigure((0, 1), weight=1)
@@ -244,7 +295,7 @@ class DetailPanel(ctk.CTkFrame):
             ("HDR Format",   "—", "High Dynamic Range flavour. HDR10 is the open baseline. Dolby Vision / HDR10+ add dynamic per-scene metadata."),
             ("Scan Type",    "—", "Progressive = complete frames. Interlaced = alternating lines (older broadcast technique, can cause combing artefacts)."),
         ]):
-            self._info_field(vbody, i // 2, i % 2, lbl, val, tip)
+            self._info_values[lbl] = self._info_field(vbody, i // 2, i % 2, lbl, val, tip)
 
         cbody = self._card(parent, "CONTAINER", grid_row=2)
         cbody.grid_columnconfigure((0, 1), weight=1)
@@ -254,7 +305,7 @@ class DetailPanel(ctk.CTkFrame):
             ("File Size", "—", "Total size on disk, including all audio, video, and subtitle streams."),
             ("Chapters",  "—", "Named scene markers embedded in the file. Media players use these for chapter navigation."),
         ]):
-            self._info_field(cbody, i // 2, i % 2, lbl, val, tip)
+            self._info_values[lbl] = self._info_field(cbody, i // 2, i % 2, lbl, val, tip)
 
     # ── Encode Settings ───────────────────────────────────────────────────────
 
@@ -264,17 +315,20 @@ class DetailPanel(ctk.CTkFrame):
         vbody = self._card(parent, "VIDEO ENCODER", grid_row=0, first=True)
         vbody.grid_columnconfigure(0, weight=1)
 
+        self._codec_opt = self._make_option(vbody, ["H.265 / HEVC", "H.264 / AVC", "AV1", "VP9", KEEP_VIDEO], "H.265 / HEVC")
         self._setting_row(vbody, 0, "Output Codec",
-            "The format your output video will be compressed in. H.265 offers the best size-to-quality ratio for modern devices. AV1 is more efficient but much slower to encode.",
-            self._make_option(vbody, ["H.265 / HEVC", "H.264 / AVC", "AV1", "VP9"], "H.265 / HEVC"))
+            "The format your output video will be compressed in. H.265 offers the best size-to-quality ratio for modern devices. AV1 is more efficient but much slower to encode. 'Keep Original' copies the video as it is into the chosen container — seconds instead of hours.",
+            self._codec_opt)
 
+        self._preset_opt = self._make_option(vbody, ["ultrafast","veryfast","fast","medium","slow","veryslow"], "medium")
         self._setting_row(vbody, 1, "Encoder Preset",
             "Speed vs compression trade-off. Slower presets take longer but produce smaller, better-quality files at the same CRF value. Medium is a sensible default.",
-            self._make_option(vbody, ["ultrafast","veryfast","fast","medium","slow","veryslow"], "medium"))
+            self._preset_opt)
 
+        self._rate_opt = self._make_option(vbody, ["CRF (Quality)", "ABR (Bitrate)", "2-Pass ABR"], "CRF (Quality)")
         self._setting_row(vbody, 2, "Rate Control",
             "CRF targets consistent visual quality and lets file size vary. ABR targets a fixed average bitrate. 2-Pass ABR is most accurate for size-constrained encodes.",
-            self._make_option(vbody, ["CRF (Quality)", "ABR (Bitrate)", "2-Pass ABR"], "CRF (Quality)"))
+            self._rate_opt)
 
         # CRF slider — custom row with live value readout
         crf_row = ctk.CTkFrame(vbody, fg_color="transparent", corner_radius=0)
@@ -307,28 +361,43 @@ class DetailPanel(ctk.CTkFrame):
         )
         self._crf_val.grid(row=0, column=1, padx=(0, 8), sticky="e")
 
-        ctk.CTkSlider(
+        self._crf_slider = ctk.CTkSlider(
             crf_row, from_=0, to=51, number_of_steps=51,
             width=140, progress_color=T.ACCENT,
             button_color=T.ACCENT, button_hover_color=T.ACCENT_H,
             fg_color=T.SURFACE2,
             command=lambda v: self._crf_val.configure(text=str(int(v))),
-        ).grid(row=0, column=2, sticky="e")
+        )
+        self._crf_slider.grid(row=0, column=2, sticky="e")
+        self._crf_slider.set(22)
 
+        self._hw_toggle = self._make_toggle(vbody, default=False)
         self._setting_row(vbody, 4, "Hardware Acceleration",
             "Uses your GPU (NVENC, VideoToolbox, QSV) instead of the CPU. Much faster, but output quality is usually slightly lower at the same settings.",
-            self._make_toggle(vbody, default=False))
+            self._hw_toggle)
+
+        self._segment_toggle = self._make_toggle(vbody, default=False)
+        self._setting_row(vbody, 5, "Segmented Encoding",
+            "Splits files longer than 20 minutes at chapter marks and encodes the parts in parallel, then joins them. Uses more cores on one long file, and an interrupted encode resumes from the last finished part. Needs ffmpeg.",
+            self._segment_toggle)
+
+        self._skip_toggle = self._make_toggle(vbody, default=True)
+        self._setting_row(vbody, 6, "Skip Efficient Files",
+            "Before encoding, checks each file's probe data and skips it if it is already in the output codec at or below the output resolution and a sensible bitrate, or if the new file would come out less than 15% smaller.",
+            self._skip_toggle)
 
         rbody = self._card(parent, "RESOLUTION & FRAME RATE", grid_row=1)
         rbody.grid_columnconfigure(0, weight=1)
 
+        self._res_opt = self._make_option(rbody, ["Match Source","3840×2160 (4K)","1920×1080 (FHD)","1280×720 (HD)","Custom…"], "Match Source")
         self._setting_row(rbody, 0, "Output Resolution",
             "Pixel dimensions of the output. 'Match Source' keeps the original. Downscaling from 4K to 1080p dramatically reduces file size.",
-            self._make_option(rbody, ["Match Source","3840×2160 (4K)","1920×1080 (FHD)","1280×720 (HD)","Custom…"], "Match Source"))
+            self._res_opt)
 
+        self._fps_opt = self._make_option(rbody, ["Match Source","23.976","24","25","29.97","30","50","59.94","60"], "Match Source")
         self._setting_row(rbody, 1, "Frame Rate",
             "Frames per second of the output. 'Match Source' is almost always correct. Changing this can introduce motion judder if done incorrectly.",
-            self._make_option(rbody, ["Match Source","23.976","24","25","29.97","30","50","59.94","60"], "Match Source"))
+            self._fps_opt)
 
     # ── Tracks ────────────────────────────────────────────────────────────────
 
@@ -357,18 +426,43 @@ class DetailPanel(ctk.CTkFrame):
         obody = self._card(parent, "OUTPUT DESTINATION", grid_row=0, first=True)
         obody.grid_columnconfigure(0, weight=1)
 
+        self._output_folder = ""
+        self._folder_opt = self._make_option(obody, ["Same folder as source","Custom folder…"], "Same folder as source")
+        self._folder_opt.configure(command=self._on_folder_choice)
         self._setting_row(obody, 0, "Output Folder",
             "Where converted files are saved. 'Same folder as source' places them next to the originals.",
-            self._make_option(obody, ["Same folder as source","Custom folder…"], "Same folder as source"))
+            self._folder_opt)
 
+        self._container_opt = self._make_option(obody, ["MKV","MP4","WebM"], "MKV")
         self._setting_row(obody, 1, "Container Format",
             "The wrapper format for your output file. MKV supports the most tracks. MP4 is most compatible with TVs and devices. WebM is for web use.",
-            self._make_option(obody, ["MKV","MP4","WebM"], "MKV"))
+            self._container_opt)
 
+        self._naming_opt = self._make_option(obody, ["{name}_{codec}","{name}_{res}","{name}_converted","Custom…"], "{name}_{codec}")
         self._setting_row(obody, 2, "File Naming Pattern",
             "Template for output filenames. Variables replaced automatically: {name} = original name, {codec} = output codec, {res} = resolution.",
-            self._make_option(obody, ["{name}_{codec}","{name}_{res}","{name}_converted","Custom…"], "{name}_{codec}"))
+            self._naming_opt)
 
+        self._overwrite_toggle = self._make_toggle(obody, default=False)
         self._setting_row(obody, 3, "Overwrite Existing Files",
             "If a file with the same name already exists, overwrite it. When off, Codex appends a number to avoid collision.",
-            self._make_toggle(obody, default=False))
+            self._overwrite_toggle)
+
+        self._order_opt = self._make_option(obody, [p.value for p in Policy], Policy.FIFO.value)
+        self._setting_row(obody, 4, "Queue Order",
+            "Which file the encoder picks next. 'Shortest first' finishes the most files soonest; 'Longest first' gives the shortest total time when several jobs run in parallel; 'Priority' follows the priority set by right-clicking a file.",
+            self._order_opt)
+
+        self._reuse_toggle = self._make_toggle(obody, default=True)
+        self._setting_row(obody, 5, "Reuse Earlier Results",
+            "If the same source (by content, not by name) was already encoded with these exact settings and that output still exists, link or copy it instead of encoding again.",
+            self._reuse_toggle)
+
+    def _on_folder_choice(self, choice: str):
+        if choice == "Same folder as source":
+            self._output_folder = ""
+            return
+        # Cancelling the dialog keeps whatever was chosen before
+        folder = fd.askdirectory(title="Choose output folder") or self._output_folder
+        self._output_folder = folder
+        self._folder_opt.set(folder or "Same folder as source")
@@ -1,17 +1,24 @@
 """
 Codex — File Queue Panel
-Left panel: drop zone + scrollable file list.
+Left panel: drop zone + filter bar + scrollable file list.
 Pure grid layout throughout — no pack() calls anywhere.
 QUEUE_HEADER_H matches TOPBAR_H so the divider underneath is continuous.
 """
 
-import os
+import tkinter as tk
 import customtkinter as ctk
 import tkinter.filedialog as fd
 
 from src.utils import theme as T
-from src.utils.file_utils import is_supported, friendly_size, friendly_ext
-from src.core.queue_manager import QueueManager, QueueEntry, FileStatus
+from src.utils.file_utils import is_supported, file_size, friendly_ext
+from src.core.queue_manager import (
+    QueueManager, QueueEntry, QueueEvent, Change, FileStatus,
+)
+from src.core.prober import ProbePool
+from src.core import queue_query
+from src.core.queue_query import QueueView, QUERY_FIELDS
+from src.core.scanner import FolderScanner
+from src.core.watcher import FolderWatcher
 
 STATUS_COLOURS = {
     FileStatus.READY:    T.TEXT3,
@@ -25,27 +32,50 @@ PANEL_W  = 300
 BTN_SIZE = 28
 DROP_H   = 140
 
+SCAN_POLL_MS  = 100
+WATCH_POLL_MS = 500
+
+FILTER_HINT = "Filter — name, status:error, res:4k, size>20GB, sort:-size"
+
+# Entry fields a row displays — e.g. progress ticks never touch the list
+ROW_FIELDS = frozenset({"path", "size", "duration_s", "error_msg", "status", "priority"})
+
+# Right-click menu label → QueueEntry.priority
+PRIORITIES = {"High priority": 1, "Normal priority": 0, "Low priority": -1}
+PRIORITY_MARKS = {1: "↑ ", -1: "↓ "}
+
 
 class FileQueuePanel(ctk.CTkFrame):
 
-    def __init__(self, master, queue: QueueManager, **kwargs):
+    def __init__(self, master, queue: QueueManager, prober: ProbePool | None = None,
+                 on_added=None, on_watched=None, settings=None, **kwargs):
         super().__init__(
             master, width=PANEL_W, corner_radius=0, fg_color=T.PANEL, **kwargs,
         )
-        self.queue = queue
+        self.queue  = queue
+        self.prober = prober
+        self._on_added   = on_added
+        self._on_watched = on_watched
+        self._settings   = settings         # () -> EncodeSettings, for the watcher
+        self._scanner: FolderScanner | None = None
+        self._watcher: FolderWatcher | None = None
+        self._view: QueueView | None = None     # None: unfiltered, the whole queue
+        self._requery_pending = False
         self.grid_propagate(False)
         self.grid_rowconfigure(0, weight=0)   # header
         self.grid_rowconfigure(1, weight=0)   # drop zone
-        self.grid_rowconfigure(2, weight=1)   # list (expands)
+        self.grid_rowconfigure(2, weight=0)   # filter bar
+        self.grid_rowconfigure(3, weight=1)   # list (expands)
         self.grid_columnconfigure(0, weight=1)
         self._build()
-        self.queue.add_listener(self._refresh)
+        self.queue.add_listener(self._on_queue_change)
 
     # ── Header ────────────────────────────────────────────────────────────────
 
     def _build(self):
         self._build_header()
         self._build_drop_zone()
+        self._build_filter()
         self._build_list()
 
     def _build_header(self):
@@ -58,13 +88,15 @@ class FileQueuePanel(ctk.CTkFrame):
         hdr.grid_columnconfigure(0, weight=1)
         hdr.grid_columnconfigure(1, weight=0)
         hdr.grid_columnconfigure(2, weight=0)
+        hdr.grid_columnconfigure(3, weight=0)
         hdr.grid_rowconfigure(0, weight=1)
 
-        ctk.CTkLabel(
+        self._title_lbl = ctk.CTkLabel(
             hdr, text="QUEUE",
             font=ctk.CTkFont(size=9, weight="bold"),
             text_color=T.TEXT3, anchor="w",
-        ).grid(row=0, column=0, sticky="w", padx=(16, 0))
+        )
+        self._title_lbl.grid(row=0, column=0, sticky="w", padx=(16, 0))
 
         ctk.CTkButton(
             hdr, text="📁", width=BTN_SIZE, height=BTN_SIZE,
@@ -73,12 +105,20 @@ class FileQueuePanel(ctk.CTkFrame):
             font=ctk.CTkFont(size=13), command=self._pick_folder,
         ).grid(row=0, column=1, padx=(0, 4))
 
+        self._watch_btn = ctk.CTkButton(
+            hdr, text="👁", width=BTN_SIZE, height=BTN_SIZE,
+            fg_color="transparent", hover_color=T.SURFACE,
+            text_color=T.TEXT3, corner_radius=T.RADIUS_SM,
+            font=ctk.CTkFont(size=13), command=self._toggle_watch,
+        )
+        self._watch_btn.grid(row=0, column=2, padx=(0, 4))
+
         ctk.CTkButton(
             hdr, text="✕", width=BTN_SIZE, height=BTN_SIZE,
             fg_color="transparent", hover_color=T.SURFACE,
             text_color=T.TEXT3, corner_radius=T.RADIUS_SM,
             font=ctk.CTkFont(size=13), command=self._clear_all,
-        ).grid(row=0, column=2, padx=(0, 10))
+        ).grid(row=0, column=3, padx=(0, 10))
 
         # Divider — sits at the bottom of the header row, continuous with topbar
         ctk.CTkFrame(self, height=1, fg_color=T.BORDER2, corner_radius=0).grid(
@@ -126,69 +166,211 @@ class FileQueuePanel(ctk.CTkFrame):
         outer.bind("<Enter>", lambda e: outer.configure(border_color=T.ACCENT))
         outer.bind("<Leave>", lambda e: outer.configure(border_color=T.BORDER))
 
-    # ── File list ─────────────────────────────────────────────────────────────
-
-    def _build_list(self):
-        self._list_scroll = ctk.CTkScrollableFrame(
-            self, fg_color=T.PANEL, corner_radius=0,
-            scrollbar_button_color=T.BORDER,
-            scrollbar_button_hover_color=T.TEXT3,
-        )
-        self._list_scroll.grid(row=2, column=0, sticky="nsew", padx=0, pady=0)
-        self._list_scroll.grid_columnconfigure(0, weight=1)
-
-    def _refresh(self):
-        for w in self._list_scroll.winfo_children():
-            w.destroy()
-        for i, entry in enumerate(self.queue.entries):
-            self._add_row(i, entry)
-
-    def _add_row(self, index: int, entry: QueueEntry):
-        selected = (index == self.queue.selected_index)
-
-        row = ctk.CTkFrame(
-            self._list_scroll,
-            fg_color=T.ACCENT_SUB if selected else "transparent",
-            corner_radius=T.RADIUS_SM, cursor="hand2",
+    # ── Filter bar ────────────────────────────────────────────────────────────
+    # Filters and sorts what the list shows, through queue_query. The list
+    # then shows a QueueView instead of the queue, re-run whenever a change
+    # could alter which entries match or their order — once per idle pass,
+    # however many such changes arrive together.
+
+    def _build_filter(self):
+        self._filter_text = ""
+        self._filter = ctk.CTkEntry(
+            self, height=26, placeholder_text=FILTER_HINT,
+            fg_color=T.SURFACE, border_color=T.BORDER, border_width=1,
+            text_color=T.TEXT, placeholder_text_color=T.TEXT3,
+            corner_radius=T.RADIUS_SM, font=ctk.CTkFont(size=11),
         )
-        row.grid(row=index, column=0, sticky="ew", padx=6, pady=2)
-        row.grid_columnconfigure(0, weight=0)
-        row.grid_columnconfigure(1, weight=1)
-        row.grid_columnconfigure(2, weight=0)
-        row.grid_rowconfigure(0, weight=0)
-        row.grid_rowconfigure(1, weight=0)
-
-        def on_click(e, i=index):
-            self.queue.select(i)
-
-        ext = ctk.CTkLabel(
-            row, text=friendly_ext(entry.path),
-            width=36, height=26, fg_color=T.SURFACE2, corner_radius=4,
-            font=ctk.CTkFont(size=10, weight="bold"), text_color=T.TEXT3,
-        )
-        ext.grid(row=0, column=0, rowspan=2, padx=(8, 8), pady=10, sticky="w")
+        self._filter.grid(row=2, column=0, sticky="ew", padx=10, pady=(0, 8))
+        self._filter.bind("<KeyRelease>", lambda e: self._apply_filter())
+        self._filter.bind("<Escape>", self._clear_filter)
 
-        name = ctk.CTkLabel(
-            row, text=entry.name,
-            font=ctk.CTkFont(size=12, weight="bold"),
-            text_color=T.TEXT, anchor="w",
-        )
-        name.grid(row=0, column=1, sticky="ew", padx=(0, 6), pady=(10, 1))
+    def _apply_filter(self):
+        text = self._filter.get().strip()
+        if text == self._filter_text:
+            return
+        self._filter_text = text
+        try:
+            query = queue_query.parse(text)
+        except ValueError as e:
+            # Keep showing the last good filter; say what's wrong up top
+            self._filter.configure(border_color=T.RED)
+            if not self._scanner:
+                self._title_lbl.configure(text=str(e), text_color=T.RED)
+            return
+        self._filter.configure(border_color=T.BORDER)
+        self._view = None if query.trivial else queue_query.run(self.queue, query)
+        self._top = 0
+        self._refresh()
+        self._update_title()
+
+    def _clear_filter(self, event=None):
+        self._filter.delete(0, "end")
+        self._apply_filter()
+
+    def _schedule_requery(self):
+        if not self._requery_pending:
+            self._requery_pending = True
+            self.after_idle(self._requery)
+
+    def _requery(self):
+        self._requery_pending = False
+        if self._view is None:
+            return                          # filter cleared meanwhile
+        self._view = queue_query.run(self.queue, self._view.query)
+        self._refresh()
+        self._update_title()
+
+    def _update_title(self):
+        if self._scanner:
+            return                          # _poll_scan is showing progress
+        text = "QUEUE"
+        if self._view is not None:
+            text += f"  ·  {len(self._view):,} OF {self._view.total:,}"
+        watcher = self._watcher
+        if watcher:
+            text += "  ·  WATCHING" if watcher.ready else "  ·  LISTING WATCHED FOLDER"
+            if watcher.arriving:
+                text += f"  ·  {watcher.arriving:,} ARRIVING"
+        self._title_lbl.configure(text=text, text_color=T.TEXT3)
 
-        meta = ctk.CTkLabel(
-            row, text=f"{entry.size_str}  ·  {entry.duration}",
-            font=ctk.CTkFont(size=10), text_color=T.TEXT2, anchor="w",
-        )
-        meta.grid(row=1, column=1, sticky="ew", padx=(0, 6), pady=(1, 10))
+    # ── File list ─────────────────────────────────────────────────────────────
+    # Virtualised: a fixed pool of _Row widgets, sized to the viewport, is
+    # rebound to whichever entries are in view. Scrolling, selecting and
+    # queue changes only touch the visible rows, whatever the queue length.
 
-        dot = ctk.CTkFrame(
-            row, width=8, height=8,
-            fg_color=STATUS_COLOURS.get(entry.status, T.TEXT3), corner_radius=4,
+    def _build_list(self):
+        self._rows: list[_Row] = []
+        self._top  = 0                  # index of the entry in the first row
+
+        frame = ctk.CTkFrame(self, fg_color=T.PANEL, corner_radius=0)
+        frame.grid(row=3, column=0, sticky="nsew", padx=0, pady=0)
+        frame.grid_rowconfigure(0, weight=1)
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_columnconfigure(1, weight=0)
+
+        self._list_body = ctk.CTkFrame(frame, fg_color=T.PANEL, corner_radius=0)
+        self._list_body.grid(row=0, column=0, sticky="nsew")
+        self._list_body.grid_propagate(False)   # size comes from the panel, not the rows
+        self._list_body.grid_columnconfigure(0, weight=1)
+        self._list_body.bind("<Configure>", self._on_list_resize)
+
+        self._scrollbar = ctk.CTkScrollbar(
+            frame, command=self._on_scrollbar,
+            button_color=T.BORDER, button_hover_color=T.TEXT3,
+            fg_color=T.PANEL,
         )
-        dot.grid(row=0, column=2, rowspan=2, padx=(0, 12), sticky="e")
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+        self._bind_wheel(self._list_body)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", lambda e: self._scroll_to(self._top - 3))
+        widget.bind("<Button-5>", lambda e: self._scroll_to(self._top + 3))
+
+    def _on_list_resize(self, event):
+        wanted = max(1, event.height // T.QUEUE_ROW_H + 1)
+        while len(self._rows) < wanted:
+            self._rows.append(_Row(self._list_body, len(self._rows),
+                                   self._select_row, self._bind_wheel,
+                                   self._row_menu))
+        while len(self._rows) > wanted:
+            self._rows.pop().frame.destroy()
+        self._refresh()
+
+    def _shown(self):
+        """What the list displays — the filter's view, or the whole queue."""
+        return self.queue.entries if self._view is None else self._view
+
+    def _visible(self) -> int:
+        """Rows that fit completely — the last pool row may be clipped."""
+        return max(1, len(self._rows) - 1)
+
+    def _on_wheel(self, event):
+        step = -event.delta // 120 if abs(event.delta) >= 120 else -event.delta
+        self._scroll_to(self._top + step * 3)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._scroll_to(int(float(value) * len(self._shown())))
+        elif unit == "pages":
+            self._scroll_to(self._top + int(value) * self._visible())
+        else:
+            self._scroll_to(self._top + int(value))
+
+    def _scroll_to(self, top: int):
+        top = max(0, min(top, len(self._shown()) - self._visible()))
+        if top != self._top:
+            self._top = top
+            self._refresh()
+
+    def _on_queue_change(self, event: QueueEvent):
+        if self._view is not None and _reshapes(event):
+            self._schedule_requery()
+        elif event.kind == Change.SELECTED:
+            if self._view is None:
+                self._rebind(lambda row: row.index in (event.index, event.previous))
+            else:
+                self._rebind(lambda row: True)     # positions aren't queue indices
+        elif event.kind == Change.UPDATED:
+            if event.fields & ROW_FIELDS:
+                changed = {id(e) for e in event.entries}
+                self._rebind(lambda row: id(row.entry) in changed)
+        elif (event.kind == Change.INSERTED
+              and event.index >= self._top + len(self._rows)):
+            self._update_scrollbar()        # landed below the viewport
+        else:
+            self._refresh()
+
+    def _rebind(self, wanted):
+        selected = self.queue.selected
+        for row in self._rows:
+            if row.index >= 0 and wanted(row):
+                row.show(row.index, row.entry, row.entry is selected)
 
-        for w in (row, ext, name, meta, dot):
-            w.bind("<Button-1>", on_click)
+    def _refresh(self):
+        entries = self._shown()
+        total   = len(entries)
+        self._top = max(0, min(self._top, total - self._visible()))
+        selected = self.queue.selected
+
+        for offset, row in enumerate(self._rows):
+            i = self._top + offset
+            if i < total:
+                row.show(i, entries[i], entries[i] is selected)
+            else:
+                row.hide()
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self._shown())
+        if total:
+            self._scrollbar.set(self._top / total,
+                                min(1.0, (self._top + self._visible()) / total))
+        else:
+            self._scrollbar.set(0, 1)
+
+    def _select_row(self, pos: int):
+        entries = self._shown()
+        if 0 <= pos < len(entries):
+            index = pos if self._view is None else self.queue.index_of(entries[pos])
+            if index is not None:
+                self.queue.select(index)
+
+    def _row_menu(self, pos: int, event):
+        entries = self._shown()
+        if not 0 <= pos < len(entries):
+            return
+        entry = entries[pos]
+        self._select_row(pos)
+        menu = tk.Menu(self, tearoff=0, bg=T.SURFACE, fg=T.TEXT,
+                       activebackground=T.ACCENT, activeforeground=T.TEXT,
+                       borderwidth=0)
+        for label, value in PRIORITIES.items():
+            menu.add_command(
+                label=("● " if entry.priority == value else "   ") + label,
+                command=lambda v=value: self.queue.update(entry, priority=v),
+            )
+        menu.tk_popup(event.x_root, event.y_root)
 
     # ── File picking ──────────────────────────────────────────────────────────
 
@@ -200,25 +382,176 @@ class FileQueuePanel(ctk.CTkFrame):
                 ("All files", "*.*"),
             ],
         )
-        for p in paths:
-            self._add_path(p)
+        self._add_paths(paths)
 
     def _pick_folder(self):
         folder = fd.askdirectory(title="Add folder to queue")
-        if folder:
-            for root, _, files in os.walk(folder):
-                for f in sorted(files):
-                    self._add_path(os.path.join(root, f))
-
-    def _add_path(self, path: str):
-        if not is_supported(path):
+        if not folder:
+            return
+        polling = self._scanner is not None     # a loop is already scheduled
+        if polling:
+            self._scanner.cancel()
+        self._scanner = FolderScanner(self.queue, folder)
+        self._scanner.start()
+        if not polling:
+            self.after(SCAN_POLL_MS, self._poll_scan)
+
+    def _poll_scan(self):
+        scanner = self._scanner
+        if scanner is None:
+            return
+        self._submitted(scanner.poll())
+        if scanner.finished or scanner.cancelled:
+            self._scanner = None
+            self._update_title()
             return
-        self.queue.add(QueueEntry(
-            path=path,
-            name=os.path.basename(path),
-            size_str=friendly_size(path),
-            duration="—",
+        self._title_lbl.configure(
+            text=f"SCANNING  ·  {scanner.matched:,} FOUND  ·  {scanner.dirs_scanned:,} FOLDERS")
+        self.after(SCAN_POLL_MS, self._poll_scan)
+
+    # ── Watch folder ──────────────────────────────────────────────────────────
+    # Files that land in the watched folder are queued once their copy has
+    # finished; the page starts them as soon as they are probed.
+
+    def _toggle_watch(self):
+        if self._watcher:
+            self._watcher.close()
+            self._watcher = None
+            self._watch_btn.configure(text_color=T.TEXT3)
+            self._update_title()
+            return
+        folder = fd.askdirectory(title="Watch folder for new files")
+        if not folder:
+            return
+        self._watcher = FolderWatcher(self.queue, folder, settings=self._settings)
+        self._watcher.start()
+        self._watch_btn.configure(text_color=T.ACCENT)
+        self.after(WATCH_POLL_MS, self._poll_watch, self._watcher)
+
+    def _poll_watch(self, watcher: FolderWatcher):
+        if watcher is not self._watcher:
+            return                          # stopped, or replaced by another
+        added = watcher.poll()
+        self._submitted(added)
+        if added and self._on_watched:
+            self._on_watched(added)
+        self._update_title()
+        self.after(WATCH_POLL_MS, self._poll_watch, watcher)
+
+    def _add_paths(self, paths):
+        self._submitted(self.queue.add_many(
+            QueueEntry(p, file_size(p)) for p in paths if is_supported(p)
         ))
 
+    def _submitted(self, added: list[QueueEntry]):
+        if self.prober:
+            for entry in added:
+                self.prober.submit(entry)
+        if added and self._on_added:
+            self._on_added()
+
+    def shutdown(self):
+        if self._scanner:
+            self._scanner.cancel()
+        if self._watcher:
+            self._watcher.close()
+
     def _clear_all(self):
+        # First click stops a running folder scan; the next clears the queue
+        if self._scanner:
+            self._scanner.cancel()
+            return
         self.queue.clear()
+
+
+def _reshapes(event: QueueEvent) -> bool:
+    """Could event change which entries a query matches, or their order?"""
+    if event.kind == Change.SELECTED:
+        return False
+    return event.kind != Change.UPDATED or bool(event.fields & QUERY_FIELDS)
+
+
+class _Row:
+    """
+    One recycled list row. show() rebinds it to an entry and only
+    reconfigures the widgets whose value actually changed.
+    """
+
+    def __init__(self, parent, grid_row: int, on_select, bind_wheel, on_menu):
+        self.index  = -1
+        self.entry: QueueEntry | None = None
+        self._shown = True
+        self._state: dict = {}
+
+        self.frame = ctk.CTkFrame(
+            parent, height=T.QUEUE_ROW_H - 4,
+            fg_color="transparent", corner_radius=T.RADIUS_SM, cursor="hand2",
+        )
+        self.frame.grid(row=grid_row, column=0, sticky="ew", padx=6, pady=2)
+        self.frame.grid_propagate(False)
+        self.frame.grid_columnconfigure(0, weight=0)
+        self.frame.grid_columnconfigure(1, weight=1)
+        self.frame.grid_columnconfigure(2, weight=0)
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_rowconfigure(1, weight=1)
+
+        self.ext = ctk.CTkLabel(
+            self.frame, text="",
+            width=36, height=26, fg_color=T.SURFACE2, corner_radius=4,
+            font=T.font(10, "bold"), text_color=T.TEXT3,
+        )
+        self.ext.grid(row=0, column=0, rowspan=2, padx=(8, 8), sticky="w")
+
+        self.name = ctk.CTkLabel(
+            self.frame, text="", height=18,
+            font=T.font(12, "bold"),
+            text_color=T.TEXT, anchor="w",
+        )
+        self.name.grid(row=0, column=1, sticky="sew", padx=(0, 6), pady=(0, 1))
+
+        self.meta = ctk.CTkLabel(
+            self.frame, text="", height=18,
+            font=T.font(10), text_color=T.TEXT2, anchor="w",
+        )
+        self.meta.grid(row=1, column=1, sticky="new", padx=(0, 6), pady=(1, 0))
+
+        self.dot = ctk.CTkFrame(
+            self.frame, width=8, height=8,
+            fg_color=T.TEXT3, corner_radius=4,
+        )
+        self.dot.grid(row=0, column=2, rowspan=2, padx=(0, 12), sticky="e")
+
+        for w in (self.frame, self.ext, self.name, self.meta, self.dot):
+            w.bind("<Button-1>", lambda e: on_select(self.index))
+            # Right button is <Button-2> on macOS
+            for button in ("<Button-2>", "<Button-3>"):
+                w.bind(button, lambda e: on_menu(self.index, e))
+            bind_wheel(w)
+
+    def show(self, index: int, entry: QueueEntry, selected: bool):
+        self.index = index
+        self.entry = entry
+        if not self._shown:
+            self.frame.grid()
+            self._shown = True
+        self._set(self.frame, "fg_color", T.ACCENT_SUB if selected else "transparent")
+        self._set(self.ext,   "text", friendly_ext(entry.path))
+        self._set(self.name,  "text", PRIORITY_MARKS.get(entry.priority, "") + entry.name)
+        meta = f"{entry.size_str}  ·  {entry.duration_str}"
+        if entry.status == FileStatus.SKIPPED:
+            meta += "  ·  skipped"
+        self._set(self.meta,  "text", meta)
+        self._set(self.dot,   "fg_color", STATUS_COLOURS.get(entry.status, T.TEXT3))
+
+    def hide(self):
+        if self._shown:
+            self.frame.grid_remove()
+            self._shown = False
+            self.index = -1
+            self.entry = None
+
+    def _set(self, widget, option: str, value):
+        key = (id(widget), option)
+        if self._state.get(key) != value:
+            self._state[key] = value
+            widget.configure(**{option: value})
@@ -2,31 +2,39 @@
 Codex — Progress Footer
 Fixed-height bottom bar. Pure grid layout.
 Col 0 = status+bar (expands), Col 1 = percentage, Col 2 = buttons
+Everything shown comes from the queue's running QueueStats — no scans.
 """
 
 import customtkinter as ctk
 from src.utils import theme as T
-from src.core.queue_manager import QueueManager, FileStatus
+from src.core.queue_manager import QueueManager, QueueEvent, Change, FileStatus
+from src.utils.file_utils import friendly_duration, friendly_bytes
 
 FOOTER_H = 54
 BTN_W    = 84
 BTN_H    = 28
 
+# Entry fields the footer summarises
+FOOTER_FIELDS = frozenset({"status", "progress", "fps", "eta_s", "size", "duration_s"})
+
 
 class ProgressFooter(ctk.CTkFrame):
 
-    def __init__(self, master, queue: QueueManager, **kwargs):
+    def __init__(self, master, queue: QueueManager,
+                 on_pause=None, on_cancel=None, **kwargs):
         super().__init__(
             master, height=FOOTER_H, corner_radius=0, fg_color=T.PANEL, **kwargs,
         )
         self.queue = queue
+        self._pause_cb  = on_pause
+        self._cancel_cb = on_cancel
         self.grid_propagate(False)
         self.grid_columnconfigure(0, weight=1)
         self.grid_columnconfigure(1, weight=0)
         self.grid_columnconfigure(2, weight=0)
         self.grid_rowconfigure(0, weight=1)
         self._build()
-        self.queue.add_listener(self._refresh)
+        self.queue.add_listener(self._on_queue_change)
         self._refresh()
 
     def _build(self):
@@ -39,6 +47,7 @@ class ProgressFooter(ctk.CTkFrame):
         status_area = ctk.CTkFrame(self, fg_color="transparent", corner_radius=0)
         status_area.grid(row=0, column=0, sticky="ew", padx=(16, 8), pady=(10, 10))
         status_area.grid_columnconfigure(0, weight=1)
+        status_area.grid_columnconfigure(1, weight=0)
         status_area.grid_rowconfigure(0, weight=0)
         status_area.grid_rowconfigure(1, weight=0)
 
@@ -49,11 +58,19 @@ class ProgressFooter(ctk.CTkFrame):
         )
         self._status_lbl.grid(row=0, column=0, sticky="ew")
 
+        # Concurrency the scheduler is running at, while it auto-tunes
+        self._tune_lbl = ctk.CTkLabel(
+            status_area, text="",
+            font=ctk.CTkFont(size=10, family="Courier New"),
+            text_color=T.TEXT3, anchor="e",
+        )
+        self._tune_lbl.grid(row=0, column=1, sticky="e", padx=(8, 0))
+
         self._progress = ctk.CTkProgressBar(
             status_area, height=3,
             progress_color=T.ACCENT, fg_color=T.SURFACE2, corner_radius=2,
         )
-        self._progress.grid(row=1, column=0, sticky="ew", pady=(5, 0))
+        self._progress.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(5, 0))
         self._progress.set(0)
 
         # ── Percentage ────────────────────────────────────────────────────────
@@ -92,18 +109,30 @@ class ProgressFooter(ctk.CTkFrame):
         )
         self._cancel_btn.grid(row=0, column=1)
 
+    def _on_queue_change(self, event: QueueEvent):
+        # The footer only summarises encode state and queue size
+        if event.kind == Change.SELECTED:
+            return
+        if event.kind == Change.UPDATED and not event.fields & FOOTER_FIELDS:
+            return
+        self._refresh()
+
     def _refresh(self):
-        encoding = [e for e in self.queue.entries if e.status == FileStatus.ENCODING]
-        done  = self.queue.done_count()
+        stats = self.queue.stats
+        running = len(stats.encoding)
+        done  = stats.counts[FileStatus.DONE]
         total = len(self.queue)
 
-        if encoding:
-            e = encoding[0]
-            pct = int(e.progress * 100)
-            self._status_lbl.configure(
-                text=f"Encoding  {e.name}  —  {done}/{total} complete")
-            self._progress.set(e.progress)
-            self._pct_lbl.configure(text=f"{pct}%")
+        if running:
+            e = next(iter(stats.encoding.values()))
+            text = f"Encoding  {e.name}  —  {_speed(e)}"
+            if running > 1:
+                text += f"  ·  +{running - 1} more, {stats.fps:.0f} fps total"
+            text += f"  ·  {done}/{total} complete" + _queue_rate(stats)
+            self._status_lbl.configure(text=text)
+            mean = min(max(stats.progress_sum / running, 0.0), 1.0)
+            self._progress.set(mean)
+            self._pct_lbl.configure(text=f"{int(mean * 100)}%")
         elif total == 0:
             self._status_lbl.configure(text="Ready  —  add files to the queue")
             self._progress.set(0)
@@ -115,12 +144,46 @@ class ProgressFooter(ctk.CTkFrame):
             self._pct_lbl.configure(text="100%")
         else:
             self._status_lbl.configure(
-                text=f"{self.queue.ready_count()} file(s) queued  ·  {done} done")
+                text=f"{stats.counts[FileStatus.READY]} file(s) queued  ·  {done} done")
             self._progress.set(done / total if total else 0)
             self._pct_lbl.configure(text="")
 
+    def set_tuning(self, text: str):
+        """
+        e.g. "6 jobs × 4 threads  ·  38× real time", or the probe cache's
+        hit counts between runs — "" hides it.
+        """
+        if text != self._tune_lbl.cget("text"):
+            self._tune_lbl.configure(text=text)
+
+    def set_paused(self, paused: bool):
+        self._pause_btn.configure(text="▶  Resume" if paused else "⏸  Pause")
+
     def _on_pause(self):
-        pass
+        if self._pause_cb:
+            self._pause_cb()
 
     def _on_cancel(self):
-        pass
+        if self._cancel_cb:
+            self._cancel_cb()
+
+
+def _queue_rate(stats) -> str:
+    """e.g. "  ·  42 MB/s  ·  queue ETA 3h 12m" — "" until there's a measurement."""
+    bps, _ = stats.throughput()
+    if not bps:
+        return ""
+    text = f"  ·  {friendly_bytes(bps)}/s"
+    eta = stats.eta_s()
+    if eta is not None:
+        text += f"  ·  queue ETA {friendly_duration(eta)}"
+    return text
+
+
+def _speed(e) -> str:
+    """e.g. "118 fps  ·  ETA 3m 12s" — or "starting…" before HandBrake reports."""
+    if not e.fps:
+        return "starting…"
+    if e.eta_s is None:
+        return f"{e.fps:.0f} fps"
+    return f"{e.fps:.0f} fps  ·  ETA {friendly_duration(e.eta_s)}"
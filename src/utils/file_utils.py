@@ -1,10 +1,11 @@
 """
 Codex — File Utils
-Helpers for reading basic file info without FFprobe
-(size, extension, duration placeholder until FFprobe is wired in).
+Helpers for basic file info that doesn't need FFprobe (size, extension)
+and for formatting values FFprobe reports.
 """
 
 import os
+import sys
 
 
 SUPPORTED_EXTENSIONS = {
@@ -19,12 +20,39 @@ def is_supported(path: str) -> bool:
     return ext.lower() in SUPPORTED_EXTENSIONS
 
 
+def normalize_path(path: str, resolved: bool = False) -> str:
+    """
+    Identity key for a file: symlinks resolved, and case folded on
+    platforms whose filesystems are case-insensitive by default.
+    Pass resolved=True when the caller already knows the path is canonical
+    (skips realpath's per-component lstat calls).
+    """
+    if not resolved:
+        path = os.path.realpath(path)
+    path = os.path.normcase(path)
+    if sys.platform == "darwin":
+        path = path.casefold()
+    return path
+
+
+def file_size(path: str) -> int:
+    """Size in bytes, or -1 if the file can't be read."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return -1
+
+
 def friendly_size(path: str) -> str:
     """Return human-readable file size string."""
     try:
         b = os.path.getsize(path)
     except OSError:
         return "? MB"
+    return friendly_bytes(b)
+
+
+def friendly_bytes(b: float) -> str:
     for unit in ("B", "KB", "MB", "GB", "TB"):
         if b < 1024:
             return f"{b:.1f} {unit}"
@@ -32,6 +60,44 @@ def friendly_size(path: str) -> str:
     return f"{b:.1f} PB"
 
 
+def friendly_duration(seconds: float) -> str:
+    """Return e.g. "1h 03m", "47m 12s" or "38s"."""
+    s = int(round(seconds))
+    h, rem = divmod(s, 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}h {m:02d}m"
+    if m:
+        return f"{m}m {s:02d}s"
+    return f"{s}s"
+
+
 def friendly_ext(path: str) -> str:
     _, ext = os.path.splitext(path)
     return ext.lstrip(".").upper()[:4]
+
+
+def cache_dir() -> str:
+    """Per-user cache folder for Codex (created on demand)."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    path = os.path.join(base, "Codex")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_dir() -> str:
+    """Per-user folder for state Codex must keep (created on demand)."""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~\\AppData\\Roaming")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    path = os.path.join(base, "Codex")
+    os.makedirs(path, exist_ok=True)
+    return path
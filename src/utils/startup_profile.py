@@ -0,0 +1,71 @@
+"""
+Codex — Startup Profile
+Opt-in cold-start timing: cumulative import cost of each top-level import,
+named milestones, and time to first frame. Turned on with
+--profile-startup (reports, then exits with 1 if over budget — handy for
+checking a PyInstaller build) or CODEX_PROFILE_STARTUP=1 (reports and keeps
+running). The report goes to stderr.
+"""
+
+import builtins
+import os
+import sys
+import time
+
+_T0 = time.perf_counter()
+
+STARTUP_BUDGET_MS = int(os.environ.get("CODEX_STARTUP_BUDGET_MS", "1500"))
+
+enabled = False
+_marks:   list[tuple[str, float]] = []
+_imports: dict[str, float]        = {}
+_depth    = 0
+_real_import = builtins.__import__
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Only the outermost import is charged, so nested imports aren't double counted
+    global _depth
+    if _depth or name in sys.modules:
+        return _real_import(name, globals, locals, fromlist, level)
+    _depth += 1
+    start = time.perf_counter()
+    try:
+        return _real_import(name, globals, locals, fromlist, level)
+    finally:
+        _depth -= 1
+        _imports[name] = _imports.get(name, 0.0) + time.perf_counter() - start
+
+
+def enable():
+    global enabled
+    if not enabled:
+        enabled = True
+        builtins.__import__ = _timed_import
+
+
+def mark(name: str):
+    if enabled:
+        _marks.append((name, time.perf_counter()))
+
+
+def elapsed_ms() -> float:
+    return (time.perf_counter() - _T0) * 1000
+
+
+def report(budget_ms: int = STARTUP_BUDGET_MS, top: int = 12) -> bool:
+    """Print the profile to stderr. Returns True if within budget."""
+    builtins.__import__ = _real_import
+    out = sys.stderr
+    total = elapsed_ms()
+    out.write("── Codex startup profile " + "─" * 40 + "\n")
+    out.write("  imports (cumulative, outermost only)\n")
+    for name, secs in sorted(_imports.items(), key=lambda kv: -kv[1])[:top]:
+        out.write(f"    {secs * 1000:8.1f} ms  {name}\n")
+    out.write("  milestones (since launch)\n")
+    for name, t in _marks:
+        out.write(f"    {(t - _T0) * 1000:8.1f} ms  {name}\n")
+    ok = total <= budget_ms
+    out.write(f"  total {total:.1f} ms / budget {budget_ms} ms — "
+              f"{'OK' if ok else 'OVER BUDGET'}\n")
+    return ok
@@ -29,6 +29,23 @@ AMBER        = "#D4892A"
 FONT_UI      = "Helvetica Neue"
 FONT_MONO    = ("Courier New", 11)
 
+_fonts: dict = {}
+
+
+def font(size: int, weight: str = "normal", family: str | None = None):
+    """
+    Shared CTkFont for (size, weight, family). Fonts are Tk resources, so
+    hot paths reuse one instance instead of building a new one per widget.
+    Needs the Tk root to exist; customtkinter is imported on first use so
+    this module stays importable without a display.
+    """
+    key = (size, weight, family)
+    f = _fonts.get(key)
+    if f is None:
+        import customtkinter as ctk
+        f = _fonts[key] = ctk.CTkFont(size=size, weight=weight, family=family)
+    return f
+
 # ── Sizing ────────────────────────────────────────────────────────────────────
 SIDEBAR_W         = 220
 SIDEBAR_COLLAPSED = 60
@@ -40,6 +57,7 @@ TOPBAR_H          = 56      # matches sidebar logo row height exactly
 LOGO_H            = 56      # sidebar logo row — keep in sync with TOPBAR_H
 
 QUEUE_HEADER_H    = 56      # queue panel header — same band as topbar
+QUEUE_ROW_H       = 52      # pitch of one file row, including the 2px gaps
 
 RADIUS            = 8
 RADIUS_SM         = 5
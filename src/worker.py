@@ -0,0 +1,63 @@
+"""
+Codex — Farm worker
+Runs encode jobs handed out by a coordinator (main.py --headless … --serve)
+on this machine, with no Tk or customtkinter imports:
+
+    python main.py --worker render01.lan:7717 --jobs 4
+    python main.py --worker /tmp/codex.sock
+    python main.py --worker coord:7717 --map /mnt/media=/Volumes/media
+
+HandBrakeCLI and ffmpeg are this machine's own (CODEX_HANDBRAKE and
+CODEX_FFMPEG as usual); sources and outputs must be on storage it shares
+with the coordinator. Events go to stdout as one JSON object per line, as
+in headless mode. Ctrl-C cancels the running jobs, which the coordinator
+then hands to another worker.
+"""
+
+import argparse
+import sys
+
+from src.core.farm import FarmWorker
+from src.headless import _emit
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(
+        prog="main.py --worker",
+        description="Encode jobs for a Codex farm coordinator.",
+    )
+    ap.add_argument("--worker", metavar="ADDRESS", required=True,
+                    help="coordinator HOST:PORT or Unix socket path")
+    ap.add_argument("--jobs", type=int, default=None,
+                    help="jobs run at once (default: one per 4 cores)")
+    ap.add_argument("--name", default=None,
+                    help="how the coordinator reports this worker (default: host:pid)")
+    ap.add_argument("--map", action="append", default=[], metavar="THEIRS=OURS",
+                    help="rewrite a path prefix from the coordinator's view to "
+                         "this machine's; may be repeated")
+    ap.add_argument("--once", action="store_true",
+                    help="exit when the coordinator disconnects instead of reconnecting")
+    return ap.parse_args(argv)
+
+
+def run(argv: list[str]) -> int:
+    args = _parse_args(argv)
+    path_map = []
+    for item in args.map:
+        theirs, sep, ours = item.partition("=")
+        if not sep or not theirs:
+            print(f"--map wants THEIRS=OURS, got {item!r}", file=sys.stderr)
+            return 2
+        path_map.append((theirs, ours))
+    try:
+        worker = FarmWorker(args.worker, args.jobs, path_map, args.name, log=_emit)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    try:
+        worker.run(reconnect=not args.once)
+    except KeyboardInterrupt:
+        worker.stop()
+        _emit("stopped")
+        return 130
+    return 0
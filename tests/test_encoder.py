@@ -0,0 +1,72 @@
+"""
+Codex — Encode Scheduler tests
+Run against the stand-in tools in tools/, so no HandBrakeCLI or media is needed.
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+from src.core import encoder, segments
+from src.core.encode_settings import EncodeSettings
+from src.core.encoder import EncodeScheduler
+from src.core.queue_manager import QueueManager, QueueEntry, FileStatus
+from src.core.result_cache import ResultCache
+from src.core.update_bus import UpdateBus, FRAME_MS
+
+TOOLS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+sys.path.insert(0, TOOLS)
+import fake_media  # noqa: E402
+
+
+@pytest.fixture
+def fake_tools(monkeypatch):
+    monkeypatch.setattr(encoder, "HANDBRAKE_CLI", os.path.join(TOOLS, "fake_handbrake.py"))
+    monkeypatch.setattr(segments, "FFMPEG", os.path.join(TOOLS, "fake_ffmpeg.py"))
+    monkeypatch.setenv("CODEX_FAKE_SPEED", "20000")
+    monkeypatch.setenv("CODEX_FAKE_FAIL_RATE", "0")
+
+
+def _run(scheduler: EncodeScheduler, settings: EncodeSettings, bus: UpdateBus,
+         timeout_s: float = 60.0):
+    scheduler.start(settings)
+    deadline = time.monotonic() + timeout_s
+    while scheduler.running:
+        assert time.monotonic() < deadline, "encode did not finish"
+        bus.drain()
+        time.sleep(FRAME_MS / 1000)
+    while bus.drain():
+        pass
+
+
+def test_segmented_encode_with_result_cache(tmp_path, fake_tools):
+    source = tmp_path / "long.mkv"
+    source.write_bytes(b"segmented source")
+    out = tmp_path / "out"
+    out.mkdir()
+    settings = EncodeSettings(output_folder=str(out), segmented=True, segment_s=600,
+                              skip_efficient=False, reuse_results=True)
+    cache = ResultCache(str(tmp_path / "results.sqlite3"))
+
+    queue = QueueManager()
+    entry = QueueEntry(str(source), source.stat().st_size, fake_media.duration(str(source)))
+    queue.add(entry)
+    bus = UpdateBus(queue)
+    scheduler = EncodeScheduler(queue, bus, max_jobs=4)
+    scheduler.results = cache
+    _run(scheduler, settings, bus)
+
+    assert entry.status == FileStatus.DONE, entry.error_msg
+    output = out / "long_hevc.mkv"
+    assert output.exists()
+    assert not (out / "long_hevc.mkv.parts").exists()
+
+    # The same source and settings again finish from the cache, not an encode
+    again = QueueEntry(str(source), source.stat().st_size, entry.duration_s)
+    queue.clear()
+    queue.add(again)
+    _run(scheduler, settings, bus)
+    assert again.status == FileStatus.DONE
+    assert again.error_msg == f"Already encoded as {output}"
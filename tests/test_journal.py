@@ -0,0 +1,58 @@
+"""
+Codex — Queue Journal tests
+"""
+
+import json
+
+from src.core.journal import replay
+from src.core.queue_manager import FileStatus
+
+
+def _write(path, lines):
+    path.write_text("".join(
+        (line if isinstance(line, str) else json.dumps(line)) + "\n" for line in lines
+    ), encoding="utf-8")
+
+
+def test_replay_restores_status_and_priority(tmp_path):
+    journal = tmp_path / "queue.journal"
+    _write(journal, [
+        {"op": "add", "path": "/a.mkv", "size": 10},
+        {"op": "add", "path": "/b.mkv", "size": 20},
+        {"op": "add", "path": "/c.mkv", "size": 30},
+        {"op": "st", "path": "/a.mkv", "s": "DONE", "err": ""},
+        {"op": "st", "path": "/b.mkv", "s": "ENCODING", "err": ""},
+        {"op": "pr", "path": "/c.mkv", "p": 1},
+        {"op": "rm", "path": "/c.mkv"},
+        {"op": "add", "path": "/c.mkv", "size": 30},
+    ])
+    a, b, c = replay(str(journal))
+    assert (a.status, a.progress) == (FileStatus.DONE, 1.0)
+    assert b.status == FileStatus.READY             # interrupted mid-encode
+    assert (c.path, c.priority) == ("/c.mkv", 0)
+
+
+def test_replay_skips_malformed_records(tmp_path):
+    journal = tmp_path / "queue.journal"
+    _write(journal, [
+        {"op": "add", "path": "/a.mkv", "size": 10},
+        {"op": "st", "path": "/a.mkv", "s": "NO_SUCH_STATUS"},
+        {"op": "st", "path": "/a.mkv"},
+        {"op": "st", "path": "/a.mkv", "s": ["DONE"]},
+        {"op": "pr", "path": "/a.mkv", "p": "high"},
+        {"op": "pr", "path": "/a.mkv"},
+        {"op": "add", "path": None},
+        {"op": "add"},
+        ["not", "a", "record"],
+        "42",
+        {"op": "add", "path": "/b.mkv", "size": "2.1 GB"},
+        {"op": "st", "path": "/b.mkv", "s": "ERROR", "err": "boom"},
+        '{"op": "add", "path": "/torn',
+    ])
+    a, b = replay(str(journal))
+    assert (a.path, a.size, a.status, a.priority) == ("/a.mkv", 10, FileStatus.READY, 0)
+    assert (b.path, b.size, b.status, b.error_msg) == ("/b.mkv", -1, FileStatus.ERROR, "boom")
+
+
+def test_replay_missing_file(tmp_path):
+    assert replay(str(tmp_path / "absent.journal")) == []
@@ -0,0 +1,81 @@
+"""
+Codex — Folder Watcher tests
+"""
+
+import os
+import time
+
+import pytest
+
+from src.core.encode_settings import EncodeSettings
+from src.core.queue_manager import QueueManager, QueueEntry, FileStatus
+from src.core.watcher import FolderWatcher
+
+
+def _write(path, data: bytes = b"media"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _watch_until(watcher: FolderWatcher, done, timeout_s: float = 10.0) -> list[str]:
+    added = []
+    deadline = time.monotonic() + timeout_s
+    while not done(added) and time.monotonic() < deadline:
+        added += [e.path for e in watcher.poll()]
+        time.sleep(0.05)
+    return added
+
+
+@pytest.mark.parametrize("use_inotify", [True, False], ids=["inotify", "polling"])
+def test_own_outputs_are_not_queued(tmp_path, use_inotify):
+    root = str(tmp_path)
+    source = os.path.join(root, "cap2.mkv")
+    _write(source)
+    settings = EncodeSettings()                     # output next to the source
+
+    queue = QueueManager()
+    entry = QueueEntry(source, 5)
+    queue.add(entry)
+    queue.update(entry, status=FileStatus.DONE)
+
+    watcher = FolderWatcher(queue, root, settle_s=0.2, poll_s=0.1,
+                            use_inotify=use_inotify, settings=lambda: settings)
+    watcher.start()
+    try:
+        while not watcher.ready:
+            time.sleep(0.01)
+        _write(os.path.join(root, "cap2_hevc.mkv"))             # its output
+        _write(os.path.join(root, "cap2_hevc_1.mkv"))           # ... renamed on collision
+        _write(os.path.join(root, "cap2_hevc.mkv.parts", "seg_0000.mkv"))
+        _write(os.path.join(root, "seg_0001.partial.mkv"))
+        time.sleep(0.5)                                         # let those settle first
+        _write(os.path.join(root, "cap3.mkv"))                  # a real new capture
+        added = _watch_until(watcher, lambda added: added)
+        time.sleep(0.5)
+        added += [e.path for e in watcher.poll()]
+    finally:
+        watcher.close()
+
+    assert added == [os.path.join(root, "cap3.mkv")]
+
+
+def test_output_folder_inside_watch_is_skipped(tmp_path):
+    root = str(tmp_path)
+    settings = EncodeSettings(output_folder=os.path.join(root, "encoded"))
+    queue = QueueManager()
+    watcher = FolderWatcher(queue, root, settle_s=0.2, poll_s=0.1, use_inotify=False,
+                            settings=lambda: settings)
+    watcher.start()
+    try:
+        while not watcher.ready:
+            time.sleep(0.01)
+        _write(os.path.join(root, "encoded", "anything.mkv"))
+        _write(os.path.join(root, "incoming", "take1.mp4"))
+        added = _watch_until(watcher, lambda added: added)
+        time.sleep(0.5)
+        added += [e.path for e in watcher.poll()]
+    finally:
+        watcher.close()
+
+    assert added == [os.path.join(root, "incoming", "take1.mp4")]
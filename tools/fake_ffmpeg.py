@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Codex — Fake ffmpeg
+Stand-in for the ffmpeg calls Codex makes. Handles the concat demuxer used
+to join segments (-f concat -i list.txt … -c copy out), writing the parts
+back to back into the output; any other call copies the input to the last
+argument. A remux (-progress pipe:1) first prints -progress blocks for the
+input's fake duration, REMUX_SPEEDUP times faster than an encode. Missing
+inputs fail with ffmpeg's message and exit code 1.
+
+    CODEX_FFMPEG=tools/fake_ffmpeg.py python main.py
+"""
+
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fake_media as fm
+
+REMUX_SPEEDUP = 50          # stream copy vs encode
+
+
+def _arg(args: list[str], flag: str) -> str | None:
+    try:
+        return args[args.index(flag) + 1]
+    except (ValueError, IndexError):
+        return None
+
+
+def _missing(path: str) -> int:
+    sys.stderr.write(f"{path}: No such file or directory\n")
+    return 1
+
+
+def main(args: list[str]) -> int:
+    src, dst = _arg(args, "-i"), args[-1] if args else None
+    if not src or not dst or dst == src:
+        sys.stderr.write("At least one output file must be specified\n")
+        return 1
+    if not os.path.exists(src):
+        return _missing(src)
+
+    if _arg(args, "-f") == "concat":
+        parts = []
+        with open(src, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("file "):
+                    parts.append(line[5:].strip("'").replace("'\\''", "'"))
+        with open(dst, "wb") as out:
+            for p in parts:
+                if not os.path.exists(p):
+                    out.close()
+                    os.remove(dst)
+                    return _missing(p)
+                with open(p, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        return 0
+
+    if _arg(args, "-progress") == "pipe:1":
+        _progress(fm.duration(src))
+    shutil.copyfile(src, dst)
+    return 0
+
+
+def _progress(secs: float):
+    speed = fm.SPEED * REMUX_SPEEDUP
+    t0 = time.monotonic()
+    while True:
+        done = min(secs, (time.monotonic() - t0) * speed)
+        end = done >= secs
+        sys.stdout.write(f"fps={speed * 24:.1f}\nout_time_us={int(done * 1e6)}\n"
+                         f"speed={speed:.1f}x\nprogress={'end' if end else 'continue'}\n")
+        sys.stdout.flush()
+        if end:
+            return
+        time.sleep(fm.TICK_S)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
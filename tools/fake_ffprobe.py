@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Codex — Fake ffprobe
+Stand-in for ffprobe that answers Codex's probe call with plausible JSON
+for any existing file — empty placeholders included:
+
+    CODEX_FFPROBE=tools/fake_ffprobe.py python main.py
+
+Each call takes CODEX_FAKE_PROBE_S seconds. Missing files, and files picked
+by CODEX_FAKE_PROBE_FAIL_RATE, fail the way ffprobe does: a one-line reason
+on stderr and exit code 1. See fake_media.py for all knobs.
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fake_media as fm
+
+
+def main(args: list[str]) -> int:
+    if not args or args[-1].startswith("-"):
+        sys.stderr.write("No input specified\n")
+        return 1
+    path = args[-1]
+    time.sleep(fm.PROBE_S)
+    if not os.path.exists(path):
+        sys.stderr.write(f"{path}: No such file or directory\n")
+        return 1
+    if fm.probe_fails(path):
+        sys.stderr.write(f"{path}: Invalid data found when processing input\n")
+        return 1
+    json.dump(fm.probe_json(path), sys.stdout, indent=4)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
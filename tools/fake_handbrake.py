@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Codex — Fake HandBrakeCLI
+Stand-in for HandBrakeCLI that takes the same arguments Codex passes and
+prints the same kind of output — log lines, then carriage-return progress
+lines — without touching any media:
+
+    CODEX_HANDBRAKE=tools/fake_handbrake.py python main.py
+
+The encode takes (fake duration / CODEX_FAKE_SPEED) seconds — just the
+--start-at / --stop-at range when given — writes a small placeholder output
+file, and exits 0; files picked by CODEX_FAKE_FAIL_RATE stop part-way with
+an error and exit 3. See fake_media.py for all knobs.
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fake_media as fm
+
+
+def _log(msg: str):
+    sys.stderr.write(time.strftime("[%H:%M:%S] ") + msg + "\n")
+    sys.stderr.flush()
+
+
+def _arg(args: list[str], flag: str) -> str | None:
+    try:
+        return args[args.index(flag) + 1]
+    except (ValueError, IndexError):
+        return None
+
+
+def _seconds(value: str | None) -> float | None:
+    if not value or not value.startswith("seconds:"):
+        return None
+    return float(value.split(":", 1)[1])
+
+
+def _hms(secs: float) -> str:
+    s = int(secs)
+    return f"{s // 3600:02d}h{s // 60 % 60:02d}m{s % 60:02d}s"
+
+
+def _tick(seconds: float):
+    """Wait one tick, burning CPU for CODEX_FAKE_BUSY of it."""
+    spin_until = time.perf_counter() + seconds * fm.BUSY
+    while time.perf_counter() < spin_until:
+        pass
+    time.sleep(seconds * (1 - fm.BUSY))
+
+
+def main(args: list[str]) -> int:
+    src, dst = _arg(args, "-i"), _arg(args, "-o")
+    if not src or not dst:
+        _log("ERROR: Missing input or output file name")
+        return 1
+    _log("hb_init: starting libhb thread")
+    if not os.path.exists(src):
+        _log(f"hb_stream_open: open {src} failed")
+        _log("No title found.")
+        return 2
+
+    start    = _seconds(_arg(args, "--start-at")) or 0.0
+    length   = _seconds(_arg(args, "--stop-at"))
+    end      = min(fm.duration(src), start + length if length else float("inf"))
+    tasks    = 2 if "--multi-pass" in args else 1
+    wall_s   = max(0.0, end - start) / fm.SPEED / tasks      # per task
+    src_fps  = fm.frame_rate(src)
+    enc_fps  = src_fps * fm.SPEED
+    fails_at = None             # fraction of this range's first pass
+    if fm.encode_fails(src):
+        fail_t = fm.fail_point(src) * fm.duration(src)
+        if start <= fail_t < end:
+            fails_at = (fail_t - start) / (end - start)
+    _log(f"scan: {fm.duration(src):.0f}s, {src_fps:.3f} fps")
+
+    try:
+        with open(dst, "wb") as f:
+            f.write(b"")
+    except OSError as exc:
+        _log(f"ERROR: Failed to open output file {dst}: {exc.strerror}")
+        return 3
+
+    out = sys.stdout
+    for task in range(1, tasks + 1):
+        _log(f"starting job {task} of {tasks}")
+        t0 = time.perf_counter()
+        while True:
+            elapsed = time.perf_counter() - t0
+            frac = min(1.0, elapsed / wall_s) if wall_s else 1.0
+            if task == 1 and fails_at is not None and frac >= fails_at:
+                out.write("\n")
+                out.flush()
+                _log("ERROR: encoder reported a fatal error")
+                return 3
+            line = f"\rEncoding: task {task} of {tasks}, {frac * 100:.2f} %"
+            if elapsed >= 0.5 or frac >= 1.0:     # the real CLI needs a moment to estimate
+                fps = enc_fps * (0.9 + 0.2 * fm.unit(src, f"fps{int(elapsed * 10)}"))
+                line += (f" ({fps:.2f} fps, avg {enc_fps:.2f} fps, "
+                         f"ETA {_hms(wall_s * (1 - frac))})")
+            out.write(line)
+            out.flush()
+            if frac >= 1.0:
+                break
+            _tick(min(fm.TICK_S, wall_s - elapsed))
+
+    out.write("\nEncode done!\n")
+    out.flush()
+    with open(dst, "wb") as f:
+        f.write(f"codex fake encode of {src} [{start:g}s – {end:g}s]\n".encode())
+    _log("HandBrake has exited.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
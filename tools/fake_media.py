@@ -0,0 +1,117 @@
+"""
+Codex — Fake Media
+What the stand-in HandBrakeCLI and ffprobe pretend a file contains. Every
+property is derived from a hash of the path (and CODEX_FAKE_SEED), so a
+given file always has the same duration, codec and fate across runs and
+across both tools — runs are reproducible without any real media.
+
+Knobs, all environment variables:
+    CODEX_FAKE_SEED              reshuffles every derived property
+    CODEX_FAKE_SPEED             encode speed as a multiple of real time (200)
+    CODEX_FAKE_TICK_S            seconds between progress lines (0.1)
+    CODEX_FAKE_BUSY              fraction of each tick spent burning CPU (0)
+    CODEX_FAKE_FAIL_RATE         share of files whose encode fails (0)
+    CODEX_FAKE_PROBE_S           ffprobe latency in seconds (0.05)
+    CODEX_FAKE_PROBE_FAIL_RATE   share of files ffprobe rejects (0)
+"""
+
+import hashlib
+import os
+
+
+def _env(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+SEED            = os.environ.get("CODEX_FAKE_SEED", "0")
+SPEED           = max(0.001, _env("CODEX_FAKE_SPEED", 200))
+TICK_S          = max(0.001, _env("CODEX_FAKE_TICK_S", 0.1))
+BUSY            = min(1.0, max(0.0, _env("CODEX_FAKE_BUSY", 0)))
+FAIL_RATE       = _env("CODEX_FAKE_FAIL_RATE", 0)
+PROBE_S         = _env("CODEX_FAKE_PROBE_S", 0.05)
+PROBE_FAIL_RATE = _env("CODEX_FAKE_PROBE_FAIL_RATE", 0)
+
+_CODECS = (("h264", "yuv420p"), ("hevc", "yuv420p10le"), ("mpeg2video", "yuv420p"))
+_SIZES  = ((1920, 1080), (3840, 2160), (1280, 720), (720, 480))
+_RATES  = ("24000/1001", "25/1", "30000/1001", "60/1")
+
+
+def unit(path: str, salt: str) -> float:
+    """A stable pseudo-random number in [0, 1) for this path and purpose."""
+    h = hashlib.blake2b(f"{SEED}\0{salt}\0{path}".encode(), digest_size=8)
+    return int.from_bytes(h.digest(), "big") / 2 ** 64
+
+
+def pick(path: str, salt: str, options: tuple):
+    return options[int(unit(path, salt) * len(options))]
+
+
+def duration(path: str) -> float:
+    """20 minutes to 2 hours."""
+    return 1200 + unit(path, "duration") * 6000
+
+
+def frame_rate(path: str) -> float:
+    num, den = pick(path, "rate", _RATES).split("/")
+    return int(num) / int(den)
+
+
+def encode_fails(path: str) -> bool:
+    return unit(path, "encode-fail") < FAIL_RATE
+
+
+def fail_point(path: str) -> float:
+    """How far through the encode a failing file gets."""
+    return 0.05 + unit(path, "fail-point") * 0.9
+
+
+def probe_fails(path: str) -> bool:
+    return unit(path, "probe-fail") < PROBE_FAIL_RATE
+
+
+def probe_json(path: str) -> dict:
+    """ffprobe -show_format -show_streams -show_chapters output."""
+    codec, pix_fmt = pick(path, "codec", _CODECS)
+    width, height  = pick(path, "size", _SIZES)
+    rate = pick(path, "rate", _RATES)
+    secs = duration(path)
+    bit_rate = int(2e6 + unit(path, "bitrate") * 18e6)
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        size = 0
+    size = size or int(secs * bit_rate / 8)
+    hdr = codec == "hevc" and unit(path, "hdr") < 0.5
+    video = {
+        "index": 0, "codec_type": "video", "codec_name": codec,
+        "width": width, "height": height, "pix_fmt": pix_fmt,
+        "avg_frame_rate": rate, "r_frame_rate": rate,
+        "bit_rate": str(bit_rate), "field_order": "progressive",
+        "color_primaries": "bt2020" if hdr else "bt709",
+        "color_transfer": "smpte2084" if hdr else "bt709",
+        "disposition": {"default": 1, "attached_pic": 0},
+    }
+    audio = {
+        "index": 1, "codec_type": "audio", "codec_name": "aac",
+        "channels": 2, "sample_rate": "48000", "bit_rate": "192000",
+        "disposition": {"default": 1, "attached_pic": 0},
+    }
+    chapters = [
+        {"id": i, "start_time": f"{i * 600:.6f}",
+         "end_time": f"{min(secs, (i + 1) * 600):.6f}"}
+        for i in range(int(secs // 600))
+    ]
+    return {
+        "streams":  [video, audio],
+        "chapters": chapters,
+        "format": {
+            "filename": path, "nb_streams": 2,
+            "format_name": "matroska,webm" if path.lower().endswith(".mkv")
+                           else "mov,mp4,m4a,3gp,3g2,mj2",
+            "duration": f"{secs:.6f}", "size": str(size),
+            "bit_rate": str(bit_rate),
+        },
+    }